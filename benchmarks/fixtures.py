@@ -0,0 +1,294 @@
+"""
+Offline stand-ins for pro-football-reference: generated player pages for every position and a local
+HTTP server to serve them. Also an in-memory server speaking the Redis protocol, a stand-in for the
+shared cache that kv.RedisStore talks to.
+
+Usage:
+    python -m benchmarks.fixtures DIRECTORY [PORT]
+
+writes the fixture site into DIRECTORY and serves it, point fetch.BASE_URL at the printed url.
+"""
+import contextlib
+import functools
+import random
+import socketserver
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from nfl_stats import gamelog, schema
+
+# position -> (player name, the player id the position classes guess from that name)
+FIXTURE_PLAYERS: Dict[str, Tuple[str, str]] = {
+    "QB": ("Andy Dalton", "DaltAn00"),
+    "WR": ("A.J. Green", "GreeA.00"),
+    "RB": ("Joe Mixon", "MixoJo00"),
+    "K": ("Mike Nugent", "NugeMi00"),
+    "TE": ("Tyler Eifert", "EifeTy00")
+}
+
+FIRST_YEAR = 2005
+LAST_YEAR = 2017
+
+# real player pages are a few hundred KB, mostly markup around the stats tables
+FILLER_BYTES = 200 * 1024
+
+
+def _cell(stat: schema.Stat, position: str, year: int, rng: random.Random) -> str:
+    if stat.data_stat == "pos":
+        return position
+    if stat.data_stat == "team":
+        return '<a href="/teams/cin/{}.htm">CIN</a>'.format(year)
+    if stat.convert is float:
+        return "{:.1f}".format(rng.uniform(0, 100))
+    if stat.convert is int:
+        return str(rng.randint(0, 500))
+    return str(rng.randint(1, 99))
+
+
+def _season_rows(table_id: str, stats, position: str, rng: random.Random) -> str:
+    rows = []
+    for year in range(FIRST_YEAR, LAST_YEAR + 1):
+        cells = ['<th scope="row" class="left" data-stat="year_id"><a href="/years/{0}/">{0}</a></th>'.format(year)]
+        cells.extend('<td class="right" data-stat="{}">{}</td>'.format(stat.data_stat, _cell(stat, position, year, rng))
+                     for stat in stats)
+        rows.append('<tr id="{}.{}" class="full_table">{}</tr>'.format(table_id, year, "".join(cells)))
+    return "".join(rows)
+
+
+def _filler(size: int) -> str:
+    block = ('<div class="section_wrapper"><div class="section_heading"><h2>Links</h2></div>'
+             '<ul><li><a href="/players/">Players</a></li><li><a href="/teams/">Teams</a></li>'
+             '<li><a href="/years/">Seasons</a></li><li><a href="/leaders/">Leaders</a></li></ul></div>\n')
+    return block * (size // len(block) + 1)
+
+
+def player_page(position: str, seed: int = 0) -> str:
+    """
+    Builds a player page shaped like the site's: the position's season table with every stat the
+    position class reads, a comment-wrapped secondary table and a few hundred KB of surrounding markup.
+
+    Parameters:
+        position - one of QB, WR, RB, K, TE
+        seed - seeds the stat values, the same seed gives the same page
+    Returns:
+        - str: the page html
+    """
+    table_id, stats = schema.SCHEMAS[position]
+    rng = random.Random("{}-{}".format(position, seed))
+    name, _ = FIXTURE_PLAYERS[position]
+    rows = _season_rows(table_id, stats, position, rng)
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>{name} Stats</title></head><body>'
+            '<div id="header">{header}</div><div id="info"><h1>{name}</h1></div>'
+            '<div class="table_container" id="div_{table_id}"><table class="stats_table" id="{table_id}">'
+            '<thead><tr><th>Year</th></tr></thead><tbody>{rows}</tbody></table></div>'
+            '<div id="all_advanced"><!--\n<div class="table_container"><table id="advanced"><tbody>{advanced}'
+            '</tbody></table></div>\n--></div>'
+            '<div id="footer">{footer}</div></body></html>').format(
+        name=name, table_id=table_id, rows=rows, advanced=_season_rows("advanced", stats, position, rng),
+        header=_filler(FILLER_BYTES // 4), footer=_filler(FILLER_BYTES * 3 // 4))
+
+
+def gamelog_page(position: str, year: int = LAST_YEAR, seed: int = 0) -> str:
+    """
+    Builds a game log page for the fixture player of a position: 16 regular season games and a bye week.
+
+    Parameters:
+        position - one of QB, WR, RB, K, TE
+        year - the season
+        seed - seeds the stat values, the same seed gives the same page
+    Returns:
+        - str: the page html
+    """
+    _, stats = schema.SCHEMAS[position]
+    rng = random.Random("{}-{}-{}".format(position, year, seed))
+    rows = []
+    for week in range(1, 18):
+        if week == 9:
+            continue
+        cells = ['<th data-stat="ranker">{}</th>'.format(len(rows) + 1),
+                 '<td data-stat="week_num">{}</td>'.format(week),
+                 '<td data-stat="game_date">{}-{:02d}-{:02d}</td>'.format(year, 9 + week // 5, 1 + week % 28),
+                 '<td data-stat="team"><a href="/teams/cin/{}.htm">CIN</a></td>'.format(year),
+                 '<td data-stat="game_location">{}</td>'.format("@" if week % 2 else ""),
+                 '<td data-stat="opp"><a href="/teams/pit/{}.htm">PIT</a></td>'.format(year),
+                 '<td data-stat="game_result"><a href="/boxscores/">W 27-20</a></td>',
+                 '<td data-stat="gs">*</td>']
+        cells.extend('<td class="right" data-stat="{}">{}</td>'.format(stat.data_stat, _cell(stat, position, year, rng))
+                     for stat in stats if stat.data_stat not in gamelog.NOT_GAME_STATS)
+        rows.append('<tr id="stats.{}">{}</tr>'.format(len(rows) + 1, "".join(cells)))
+    name, _ = FIXTURE_PLAYERS[position]
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>{name} {year} Game Log</title></head><body>'
+            '<div id="header">{header}</div><table class="stats_table" id="stats"><thead><tr><th>Rk</th></tr>'
+            '</thead><tbody>{rows}</tbody></table><div id="footer">{footer}</div></body></html>').format(
+        name=name, year=year, rows="".join(rows), header=_filler(FILLER_BYTES // 8), footer=_filler(FILLER_BYTES // 4))
+
+
+def write_site(directory: str) -> Path:
+    """
+    Writes a player page for every position under DIRECTORY/players/<initial>/<player id>.htm, and
+    its last season's game log under DIRECTORY/players/<initial>/<player id>/gamelog/<year>/.
+
+    Parameters:
+        directory - where to write the site
+    Returns:
+        - Path: the site root
+    """
+    root = Path(directory)
+    for position, (_, player_id) in FIXTURE_PLAYERS.items():
+        page_file = root / "players" / player_id[0] / "{}.htm".format(player_id)
+        page_file.parent.mkdir(parents=True, exist_ok=True)
+        page_file.write_text(player_page(position), encoding="utf-8")
+        gamelog_file = root / "players" / player_id[0] / player_id / "gamelog" / str(LAST_YEAR) / "index.html"
+        gamelog_file.parent.mkdir(parents=True, exist_ok=True)
+        gamelog_file.write_text(gamelog_page(position), encoding="utf-8")
+    return root
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # streaming clients hang up once they've read the table they wanted
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+@contextlib.contextmanager
+def serve(directory: str, port: int = 0) -> Iterator[str]:
+    """
+    Serves a site directory on localhost for the duration of the block.
+
+    Parameters:
+        directory - the site root
+        port - the port to listen on, any free one by default
+    Returns:
+        - str: the base url to set fetch.BASE_URL to
+    """
+    server = _QuietServer(("127.0.0.1", port), functools.partial(_QuietHandler, directory=str(directory)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{}".format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _KVHandler(socketserver.StreamRequestHandler):
+    # just the commands kv.RedisStore sends
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            arguments = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                arguments.append(self.rfile.read(length + 2)[:-2])
+            try:
+                reply = self.server.execute(arguments[0].decode().upper(), arguments[1:])
+            except Exception as e:
+                reply = e
+            self.wfile.write(_encode_reply(reply))
+
+
+def _encode_reply(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Exception):
+        return "-ERR {}\r\n".format(reply).encode()
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, str):
+        return "+{}\r\n".format(reply).encode()
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(_encode_reply(item) for item in reply)
+
+
+class KVServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int]):
+        super().__init__(address, _KVHandler)
+        # key -> (value, expires at or None)
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.commands: int = 0
+        self.lock = threading.Lock()
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, command: str, arguments: List[bytes]):
+        with self.lock:
+            self.commands += 1
+            if command in ("PING", "SELECT", "AUTH"):
+                return "PONG" if command == "PING" else "OK"
+            if command == "GET":
+                return self._live(arguments[0])
+            if command == "MGET":
+                return [self._live(key) for key in arguments]
+            if command == "SET":
+                options = [argument.decode().upper() for argument in arguments[2:]]
+                if "NX" in options and self._live(arguments[0]) is not None:
+                    return None
+                expires_at = None
+                for unit, scale in (("EX", 1.0), ("PX", 0.001)):
+                    if unit in options:
+                        expires_at = time.time() + float(options[options.index(unit) + 1]) * scale
+                self.data[arguments[0]] = (arguments[1], expires_at)
+                return "OK"
+            if command == "EXISTS":
+                return sum(self._live(key) is not None for key in arguments)
+            if command == "DEL":
+                return sum(self.data.pop(key, None) is not None for key in arguments)
+            if command == "SCAN":
+                # everything in one page, the pattern is always an escaped prefix then *
+                pattern = arguments[arguments.index(b"MATCH") + 1]
+                prefix = pattern[:-1].replace(b"\\", b"")
+                return [b"0", [key for key in list(self.data) if key.startswith(prefix) and self._live(key) is not None]]
+            if command == "FLUSHDB":
+                self.data.clear()
+                return "OK"
+            raise ValueError("unknown command {}".format(command))
+
+
+@contextlib.contextmanager
+def serve_kv(port: int = 0) -> Iterator[KVServer]:
+    """
+    Runs an in-memory Redis protocol server on localhost for the duration of the block.
+
+    Parameters:
+        port - the port to listen on, any free one by default
+    Returns:
+        - KVServer: the server, server_address[1] is its port
+    """
+    server = KVServer(("127.0.0.1", port))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    with serve(write_site(sys.argv[1]), int(sys.argv[2]) if len(sys.argv) > 2 else 8000) as base_url:
+        print(">> Serving fixture pages at {}".format(base_url))
+        threading.Event().wait()
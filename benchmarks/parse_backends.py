@@ -0,0 +1,64 @@
+"""
+Compares the parser backends on saved player pages.
+
+Usage:
+    python -m benchmarks.parse_backends TABLE_ID PAGE [PAGE ...]
+
+e.g. python -m benchmarks.parse_backends passing pages/DaltAn00.htm
+"""
+import sys
+import time
+import tracemalloc
+
+from nfl_stats import parsers
+
+
+def benchmark(parser: str, pages, table_id: str, repeat: int = 20):
+    """
+    Parses every page repeat times with the backend.
+
+    Returns:
+        - (pages per second, peak memory traced by tracemalloc for a single page, which
+          only sees Python allocations so lxml's C tree isn't counted)
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            parsers.parse_table(page, table_id, parser)
+    elapsed = time.perf_counter() - start
+
+    peak = 0
+    for page in pages:
+        tracemalloc.start()
+        parsers.parse_table(page, table_id, parser)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return repeat * len(pages) / elapsed, peak
+
+
+def main(table_id: str, paths) -> None:
+    pages = []
+    for path in paths:
+        with open(path, "r") as file:
+            pages.append(file.read())
+
+    expected = [parsers.parse_table(page, table_id, "bs4") for page in pages]
+    print("{:<8} {:>12} {:>14}".format("parser", "pages/sec", "peak KiB"))
+    for parser in parsers.PARSERS:
+        try:
+            if [parsers.parse_table(page, table_id, parser) for page in pages] != expected:
+                print("{:<8} rows differ from bs4".format(parser))
+                continue
+            pages_per_second, peak = benchmark(parser, pages, table_id)
+        except ImportError as e:
+            print("{:<8} unavailable ({})".format(parser, e))
+            continue
+        print("{:<8} {:>12.1f} {:>14.1f}".format(parser, pages_per_second, peak / 1024))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1], sys.argv[2:])
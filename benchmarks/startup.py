@@ -0,0 +1,105 @@
+"""
+Measures cold start: how long a fresh process takes to import nfl_stats.player, how long its first
+set_stats takes when the season is already in the stats cache, and which of the heavy dependencies
+got imported on the way. Every sample is a new interpreter, so nothing is warm between runs.
+
+Usage:
+    python -m benchmarks.startup [--output startup.json] [--repeat 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks import fixtures
+
+# the modules a cache-only process shouldn't have to pay for
+HEAVY_MODULES = ("requests", "urllib3", "bs4", "lxml", "numpy", "yaml", "aiohttp")
+
+# run in the child: prints the import time, the first call time and the heavy modules that got imported
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from nfl_stats.player import POSITIONS
+imported = time.perf_counter()
+player = POSITIONS[sys.argv[1]](sys.argv[2])
+result = player.set_stats(sys.argv[3])
+done = time.perf_counter()
+print(json.dumps({{"import_s": imported - start, "first_call_s": done - imported, "status": result.status,
+                  "loaded": sorted(module for module in {heavy} if module in sys.modules)}}))
+"""
+
+
+def _seed_cache(root: Path) -> None:
+    # a cached season for every fixture player, written the same way set_stats would
+    from nfl_stats import stats_cache
+    from nfl_stats.player import POSITIONS
+
+    cache = stats_cache.YamlStatsCache(str(root / "players"))
+    for position, (name, _) in fixtures.FIXTURE_PLAYERS.items():
+        player = POSITIONS[position](name)
+        player.year = str(fixtures.LAST_YEAR)
+        cache.put(position, name, player.year, player.get_cache_record())
+
+
+def _run_child(root: Path, position: str, name: str) -> Dict[str, object]:
+    environment = dict(os.environ, NFL_STATS_OFFLINE="1",
+                       PYTHONPATH=os.pathsep.join(filter(None, [str(Path(__file__).resolve().parent.parent),
+                                                                os.environ.get("PYTHONPATH")])))
+    output = subprocess.run([sys.executable, "-c", _CHILD.format(heavy=repr(HEAVY_MODULES)),
+                             position, name, str(fixtures.LAST_YEAR)],
+                            cwd=str(root), env=environment, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {"median_ms": statistics.median(samples) * 1000, "min_ms": min(samples) * 1000}
+
+
+def run(repeat: int = 10) -> Dict[str, object]:
+    """
+    Runs the startup benchmark in fresh interpreters against a stats cache seeded in a temporary directory,
+    in cache-only mode so a miss fails instead of going to the network.
+
+    Parameters:
+        repeat - the number of processes started per position
+    Returns:
+        - dict: the results, ready to be written as JSON
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as work:
+        root = Path(work)
+        _seed_cache(root)
+        for position, (name, _) in fixtures.FIXTURE_PLAYERS.items():
+            samples = [_run_child(root, position, name) for _ in range(repeat)]
+            results[position] = {
+                "import": _summary([sample["import_s"] for sample in samples]),
+                "first_call": _summary([sample["first_call_s"] for sample in samples]),
+                "status": samples[-1]["status"],
+                "heavy_modules_loaded": samples[-1]["loaded"]
+            }
+    return results
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description="Cold start benchmarks for nfl_stats")
+    arguments.add_argument("--output", help="write the results to this JSON file instead of stdout")
+    arguments.add_argument("--repeat", type=int, default=10)
+    arguments = arguments.parse_args(argv)
+
+    results = json.dumps(run(arguments.repeat), indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            file.write(results)
+    else:
+        print(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
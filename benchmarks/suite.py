@@ -0,0 +1,292 @@
+"""
+Runs the offline benchmark suite against generated fixture pages served from localhost, and writes the
+results as JSON so runs can be compared between versions.
+
+Usage:
+    python -m benchmarks.suite [--output results.json] [--repeat 20] [--seasons 5000] [--players 200]
+    python -m benchmarks.suite --compare baseline.json results.json
+
+Measures, for every position class:
+    set_stats latency cold (empty caches, fetched from the local server), warm from the
+    stats cache on disk and warm from the in-process memo, and parse throughput per backend.
+    Cold set_stats latency, bytes downloaded and peak traced memory, buffered vs streaming.
+And for the yaml, sqlite and shared key-value stats caches, the time to bulk-load N cached player-seasons,
+and the process pool backfill's throughput from 1 worker up to one per core.
+Peak RSS is for the whole run.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    # no getrusage on windows, peak rss is left out
+    resource = None
+
+from benchmarks import fixtures
+from nfl_stats import backfill, directory, fetch, kv, memo, metrics, parsers, schema, stats_cache
+from nfl_stats.page_cache import PageCache
+from nfl_stats.player import POSITIONS, get_player_url
+
+YEAR = str(fixtures.LAST_YEAR)
+
+# how much slower a timing (or lower a throughput) can get before --compare flags it
+REGRESSION_THRESHOLD = 0.10
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        "min_ms": samples[0] * 1000
+    }
+
+
+def _time(function: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def _reset_caches(root: Path, streaming: bool = False) -> None:
+    # every cold run starts from empty stats, page and in-process caches
+    stats_cache.set_cache(stats_cache.YamlStatsCache(str(root / "players")))
+    fetch.set_fetcher(fetch.Fetcher(page_cache=PageCache(str(root / "pages")), streaming=streaming))
+    memo.set_memo(memo.MemoCache())
+
+
+def bench_set_stats(work: Path, repeat: int) -> Dict[str, Dict]:
+    """
+    End to end set_stats latency for every position: cold, warm from disk and warm from the memo.
+    """
+    results = {}
+    for position, (name, _) in fixtures.FIXTURE_PLAYERS.items():
+        player_class = POSITIONS[position]
+        cold, warm_disk, warm_memo = [], [], []
+        for run in range(repeat):
+            _reset_caches(work / "set_stats" / position / str(run))
+            cold.append(_time(lambda: player_class(name).set_stats(YEAR)))
+            memo.get_memo().clear()
+            warm_disk.append(_time(lambda: player_class(name).set_stats(YEAR)))
+            warm_memo.append(_time(lambda: player_class(name).set_stats(YEAR)))
+        results[position] = {"cold": _summary(cold), "warm_disk": _summary(warm_disk),
+                             "warm_memo": _summary(warm_memo)}
+    return results
+
+
+def bench_streaming(work: Path, repeat: int) -> Dict[str, Dict]:
+    """
+    Cold set_stats for every position with the whole page downloaded before parsing (buffered) and with
+    the season table parsed while it downloads (streaming): latency, bytes downloaded and peak traced memory.
+    """
+    results = {}
+    for position, (name, _) in fixtures.FIXTURE_PLAYERS.items():
+        player_class = POSITIONS[position]
+        results[position] = {}
+        for mode, streaming in (("buffered", False), ("streaming", True)):
+            latency = []
+            for run in range(repeat):
+                _reset_caches(work / "streaming" / position / mode / str(run), streaming)
+                latency.append(_time(lambda: player_class(name).set_stats(YEAR)))
+
+            _reset_caches(work / "streaming" / position / mode / "traced", streaming)
+            bytes_before = metrics.get_metrics().snapshot()["counters"].get("fetch.bytes", 0)
+            tracemalloc.start()
+            player_class(name).set_stats(YEAR)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[position][mode] = dict(_summary(latency), peak_kib=peak / 1024,
+                                           bytes=metrics.get_metrics().snapshot()["counters"]["fetch.bytes"] - bytes_before)
+    return results
+
+
+def bench_parse(repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Pages parsed per second for every position and parser backend.
+    """
+    results = {}
+    for position in fixtures.FIXTURE_PLAYERS:
+        table_id, _ = schema.SCHEMAS[position]
+        page = fixtures.player_page(position)
+        results[position] = {}
+        for parser in parsers.PARSERS:
+            try:
+                parsers.parse_table(page, table_id, parser)
+            except ImportError:
+                continue
+            elapsed = _time(lambda: [parsers.parse_table(page, table_id, parser) for _ in range(repeat)])
+            results[position][parser] = repeat / elapsed
+    return results
+
+
+def bench_warm_load(work: Path, seasons: int) -> Dict[str, Dict[str, float]]:
+    """
+    The time to read back N cached QB player-seasons in bulk, for each stats cache backend, the shared
+    key-value one against the in-memory Redis protocol stand-in.
+    """
+    player = POSITIONS["QB"]("Warm Load")
+    player.year = YEAR
+    record = player.get_cache_record()
+    # 20 seasons per player, like a long career
+    keys = [("Player{:05d}".format(index // 20), str(1990 + index % 20)) for index in range(seasons)]
+
+    results = {}
+    (work / "warm_load").mkdir(parents=True, exist_ok=True)
+    with fixtures.serve_kv() as server:
+        for backend, cache in (("yaml", stats_cache.YamlStatsCache(str(work / "warm_load" / "players"))),
+                               ("sqlite", stats_cache.SqliteStatsCache(str(work / "warm_load" / "players.db"))),
+                               ("kv", stats_cache.KVStatsCache(kv.RedisStore(port=server.server_address[1])))):
+            cache.put_many("QB", {key: dict(record, name=key[0]) for key in keys})
+            elapsed = _time(lambda: cache.get_many("QB", keys))
+            results[backend] = {"seasons": seasons, "seconds": elapsed, "seasons_per_second": seasons / elapsed}
+    return results
+
+
+def bench_backfill(work: Path, players: int) -> Dict[str, Dict[str, float]]:
+    """
+    Pages parsed per second by the process pool backfill from a warm page cache, for 1, 2, 4, ... workers
+    up to the number of cores, and the speedup over a single worker.
+    """
+    page_cache = PageCache(str(work / "backfill" / "pages"))
+    positions = list(fixtures.FIXTURE_PLAYERS)
+    jobs = []
+    for index in range(players):
+        position = positions[index % len(positions)]
+        player_id = "Back{:04d}".format(index)
+        page_cache.put(get_player_url("", player_id), fixtures.player_page(position, index))
+        jobs.append((position, "Backfill {}".format(index), player_id))
+
+    results = {}
+    counts = sorted({min(2 ** power, os.cpu_count() or 1) for power in range(8)})
+    for workers in counts:
+        stats_cache.set_cache(stats_cache.SqliteStatsCache(str(work / "backfill" / "{}.db".format(workers))))
+        fetch.set_fetcher(fetch.Fetcher(page_cache=page_cache))
+        report = backfill.backfill(jobs, max_workers=workers)
+        results[str(workers)] = {"pages_per_second": report.pages_per_second}
+    for result in results.values():
+        result["speedup"] = result["pages_per_second"] / results["1"]["pages_per_second"]
+    return results
+
+
+def peak_rss_kib() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macos, KiB everywhere else
+    return peak / 1024 if sys.platform == "darwin" else peak
+
+
+def run(repeat: int = 20, seasons: int = 5000, players: int = 200) -> Dict[str, object]:
+    """
+    Runs every benchmark against fixture pages served from localhost.
+
+    Parameters:
+        repeat - the number of runs per latency and throughput measurement
+        seasons - the number of player-seasons in the warm load benchmark
+        players - the number of player pages in the backfill benchmark
+    Returns:
+        - dict: the results, ready to be written as JSON
+    """
+    with tempfile.TemporaryDirectory() as work:
+        work = Path(work)
+        fixtures.write_site(str(work / "site"))
+        base_url, fetcher, cache, index, memo_cache = (fetch.BASE_URL, fetch.get_fetcher(), stats_cache.get_cache(),
+                                                       directory.get_index(), memo.get_memo())
+        # names resolve to the guessed player ids the fixtures are saved under
+        directory.set_index(None)
+        try:
+            with fixtures.serve(str(work / "site")) as fixture_url:
+                fetch.BASE_URL = fixture_url
+                set_stats = bench_set_stats(work, repeat)
+                streaming = bench_streaming(work, repeat)
+            parse = bench_parse(repeat)
+            warm_load = bench_warm_load(work, seasons)
+            backfill_results = bench_backfill(work, players)
+        finally:
+            fetch.BASE_URL = base_url
+            fetch.set_fetcher(fetcher)
+            stats_cache.set_cache(cache)
+            directory.set_index(index)
+            memo.set_memo(memo_cache)
+
+    return {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "default_parser": parsers.get_parser(),
+        "set_stats": set_stats,
+        "streaming": streaming,
+        "parse_pages_per_second": parse,
+        "warm_load": warm_load,
+        "backfill": backfill_results,
+        "peak_rss_kib": peak_rss_kib()
+    }
+
+
+def _flatten(results, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, "{}{}.".format(prefix, key)))
+        elif isinstance(value, (int, float)) and key != "timestamp":
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(baseline: Dict, current: Dict) -> List[str]:
+    """
+    Lists the metrics that got worse by more than REGRESSION_THRESHOLD between two runs.
+
+    Timings and sizes (*_ms, seconds, bytes, peak memory) are worse when they go up, throughputs (*per_second, speedup) when they go down.
+    """
+    regressions = []
+    old, new = _flatten(baseline), _flatten(current)
+    for metric in sorted(old.keys() & new.keys()):
+        if not old[metric] or metric.endswith("seasons"):
+            continue
+        change = (new[metric] - old[metric]) / old[metric]
+        if "per_second" in metric or metric.endswith("speedup"):
+            change = -change
+        if change > REGRESSION_THRESHOLD:
+            regressions.append("{}: {:.4g} -> {:.4g} ({:+.0%})".format(metric, old[metric], new[metric], change))
+    return regressions
+
+
+def main(argv=None) -> int:
+    arguments = argparse.ArgumentParser(description="Offline benchmarks for nfl_stats")
+    arguments.add_argument("--output", help="write the results to this JSON file instead of stdout")
+    arguments.add_argument("--repeat", type=int, default=20)
+    arguments.add_argument("--seasons", type=int, default=5000)
+    arguments.add_argument("--players", type=int, default=200)
+    arguments.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                           help="compare two result files and list the regressions")
+    arguments = arguments.parse_args(argv)
+
+    if arguments.compare:
+        with open(arguments.compare[0]) as baseline, open(arguments.compare[1]) as current:
+            regressions = compare(json.load(baseline), json.load(current))
+        for regression in regressions:
+            print(regression)
+        return 1 if regressions else 0
+
+    results = json.dumps(run(arguments.repeat, arguments.seasons, arguments.players), indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            file.write(results)
+    else:
+        print(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+import logging
+
+# the library only logs, applications decide where it goes
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -0,0 +1,185 @@
+from typing import Callable, Dict, NamedTuple, Tuple
+
+import numpy as np
+
+from nfl_stats import schema
+from nfl_stats.columnar import SeasonTable
+
+
+class Derived(NamedTuple):
+    inputs: Tuple[str, ...]
+    # called with one float array per input, returns the metric for every row
+    compute: Callable[..., np.ndarray]
+
+
+def rate(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """
+    numerator / denominator for every row, NaN where the denominator is 0 or missing.
+    """
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def passer_rating(completions, attempts, yards, touchdowns, interceptions) -> np.ndarray:
+    """
+    The NFL passer rating, each of its four components capped between 0 and 2.375.
+    """
+    components = np.stack([(rate(completions, attempts) - 0.3) * 5,
+                           (rate(yards, attempts) - 3) * 0.25,
+                           rate(touchdowns, attempts) * 20,
+                           2.375 - rate(interceptions, attempts) * 25])
+    return np.clip(components, 0, 2.375).sum(axis=0) / 6 * 100
+
+
+def _ratio(numerator: str, denominator: str) -> Derived:
+    return Derived((numerator, denominator), rate)
+
+
+FIELD_GOAL_BANDS = ("20_to_29", "30_to_39", "40_to_49", "50_plus")
+
+# position -> metric name -> how to derive it from the position's counting stats. Rates are always
+# recomputed from the inputs, so over many seasons they're weighted by attempts rather than averaged.
+DERIVED: Dict[str, Dict[str, Derived]] = {
+    "QB": {
+        "passer_rating": Derived(("passes_completed", "passes_attempted", "yards_gained_by_passing",
+                                  "passing_touchdowns", "interceptions"), passer_rating),
+        "completion_rate": _ratio("passes_completed", "passes_attempted"),
+        "yards_per_attempt": _ratio("yards_gained_by_passing", "passes_attempted"),
+        "touchdown_rate": _ratio("passing_touchdowns", "passes_attempted"),
+        "interception_rate": _ratio("interceptions", "passes_attempted"),
+        "sack_rate": Derived(("times_sacked", "passes_attempted"), lambda sacks, attempts: rate(sacks, attempts + sacks))
+    },
+    "WR": {
+        "catch_rate": _ratio("receptions", "pass_targets"),
+        "yards_per_target": _ratio("receiving_yards", "pass_targets"),
+        "yards_per_touch": Derived(("receiving_yards", "rushing_yards", "receptions", "rush_attempts"),
+                                   lambda rec_yds, rush_yds, rec, rush: rate(rec_yds + rush_yds, rec + rush))
+    },
+    "RB": {
+        "catch_rate": _ratio("receptions", "pass_targets"),
+        "yards_per_carry": _ratio("rushing_yards", "rushing_attempts"),
+        "yards_from_scrimmage": Derived(("rushing_yards", "receiving_yards"), np.add),
+        "yards_per_touch": Derived(("rushing_yards", "receiving_yards", "rushing_attempts", "receptions"),
+                                   lambda rush_yds, rec_yds, rush, rec: rate(rush_yds + rec_yds, rush + rec))
+    },
+    "K": dict(
+        {"field_goal_percentage_" + band: _ratio("field_goals_made_" + band, "field_goal_attempts_" + band)
+         for band in FIELD_GOAL_BANDS},
+        field_goal_percentage=_ratio("total_field_goals_made", "total_field_goals_attempted"),
+        extra_point_percentage=_ratio("extra_points_made", "extra_points_attempted")
+    ),
+    "TE": {
+        "catch_rate": _ratio("receptions", "targets"),
+        "yards_per_target": _ratio("receiving_yards", "targets")
+    }
+}
+
+
+def derive(table: SeasonTable, metric: str) -> np.ndarray:
+    """
+    Computes a derived metric for every row, once: the result is kept as a column of the table, so it's
+    reused by later calls and written by SeasonTable.save next to the season stats.
+
+    Parameters:
+        table - the seasons
+        metric - one of the metrics in DERIVED for the table's position
+    Returns:
+        - numpy array: the metric for every row, NaN where it's undefined (e.g. no attempts)
+    """
+    if metric not in table.columns:
+        derived = DERIVED[table.position].get(metric)
+        if derived is None:
+            raise ValueError("Unknown {} metric {}, expected one of {}".format(
+                table.position, metric, ", ".join(DERIVED[table.position])))
+        table.columns[metric] = derived.compute(*(table.columns[column].astype(np.float64)
+                                                  for column in derived.inputs))
+    return table.columns[metric]
+
+
+def derive_all(table: SeasonTable) -> SeasonTable:
+    for metric in DERIVED[table.position]:
+        derive(table, metric)
+    return table
+
+
+def per_game(table: SeasonTable, column: str) -> np.ndarray:
+    """
+    A stat divided by the games played, for every row.
+    """
+    return rate(table.columns[column], table.columns["games_played"])
+
+
+def totals(table: SeasonTable, key: str = "name") -> SeasonTable:
+    """
+    Adds up the seasons of every player (or team, or year) into one row each, e.g. career totals.
+
+    Counting stats are summed and longest_* stats keep their max, as set by each stat's `total`. The uniform
+    number and the position's per-season rate stats are left out since they can't be summed, derive()
+    recomputes the rates from the summed counts.
+
+    Parameters:
+        table - the seasons
+        key - the column to group on
+    Returns:
+        - SeasonTable: one row per key value, with the number of seasons and the first and last year
+    """
+    keys, groups = np.unique(table.columns[key], return_inverse=True)
+    columns = {
+        key: keys,
+        "seasons": np.bincount(groups, minlength=len(keys)),
+        "first_year": np.full(len(keys), np.iinfo(np.int64).max),
+        "last_year": np.full(len(keys), np.iinfo(np.int64).min)
+    }
+    np.minimum.at(columns["first_year"], groups, table.columns["year"])
+    np.maximum.at(columns["last_year"], groups, table.columns["year"])
+
+    _, stats = schema.SCHEMAS[table.position]
+    for stat in stats:
+        if stat.convert is not int or stat.total is None or stat.attribute not in table.columns:
+            continue
+        values = np.nan_to_num(table.columns[stat.attribute].astype(np.float64))
+        if stat.total == "max":
+            longest = np.zeros(len(keys))
+            np.maximum.at(longest, groups, values)
+            columns[stat.attribute] = longest
+        else:
+            columns[stat.attribute] = np.bincount(groups, weights=values, minlength=len(keys))
+    return SeasonTable(table.position, columns)
+
+
+def rolling(table: SeasonTable, column: str, window: int = 3, key: str = "name") -> np.ndarray:
+    """
+    The average of a stat over each player's last `window` seasons up to and including every row's season.
+
+    Missing values are left out of the average. A player's first seasons average over fewer than
+    `window` seasons.
+
+    Parameters:
+        table - the seasons
+        column - the stat to average
+        window - the number of seasons to average over
+        key - the column seasons are grouped on
+    Returns:
+        - numpy array: the rolling average for every row, in the table's row order
+    """
+    if len(table) == 0:
+        return np.zeros(0)
+
+    order = np.lexsort((table.columns["year"], table.columns[key]))
+    values = table.columns[column].astype(np.float64)[order]
+    present = ~np.isnan(values)
+
+    # running sums over the sorted rows, with each player's window clipped to start at their first season
+    value_sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+    count_sums = np.concatenate(([0], np.cumsum(present)))
+    keys = table.columns[key][order]
+    group_start = np.maximum.accumulate(np.where(np.r_[True, keys[1:] != keys[:-1]], np.arange(len(keys)), 0))
+    rows = np.arange(len(keys))
+    window_start = np.maximum(rows - window + 1, group_start)
+
+    averages = rate(value_sums[rows + 1] - value_sums[window_start], count_sums[rows + 1] - count_sums[window_start])
+    result = np.empty_like(averages)
+    result[order] = averages
+    return result
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Type
+
+try:
+    import aiohttp
+except ImportError:
+    # without aiohttp the blocking fetcher runs in the loop's executor instead
+    aiohttp = None
+
+from nfl_stats import fetch, metrics, results
+from nfl_stats.player import Player, get_player_url
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# per event loop, url -> the fetch in flight for it, so concurrent loads of a page share one request
+_in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+# the threads loads run set_stats in, shared by every event loop
+_loader: Optional[ThreadPoolExecutor] = None
+_loader_lock = threading.Lock()
+
+
+async def _run(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+def _get_session(fetcher: fetch.Fetcher) -> "aiohttp.ClientSession":
+    # one pooled session per event loop, shared by every load on it
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connect_timeout, read_timeout = fetcher.timeout
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=fetcher.pool_size),
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+            headers=fetcher.headers)
+        _sessions[loop] = session
+    return session
+
+
+async def _download(url: str, season: Optional[str], max_age: Optional[float]) -> str:
+    fetcher = fetch.get_fetcher()
+    if aiohttp is None or fetcher.offline:
+        return await _run(fetcher.get_page, url, season, max_age)
+
+    if fetcher.page_cache is not None:
+        page = await _run(fetcher.page_cache.get, url, season, max_age)
+        if page is not None:
+            return page
+
+    claimed, page = await _run(fetcher.claim, url, season, max_age)
+    if page is not None:
+        return page
+    try:
+        return await _request(fetcher, url)
+    finally:
+        await _run(fetcher.release, url, claimed)
+
+
+async def _request(fetcher: fetch.Fetcher, url: str) -> str:
+    headers = {}
+    validated = await _run(fetcher.get_validated, url)
+    if validated is not None:
+        etag, last_modified, _ = validated
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    for attempt in range(fetcher.retries + 1):
+        await asyncio.sleep(fetcher.rate_limiter.reserve(url))
+        metrics.increment("fetch.requests")
+        async with _get_session(fetcher).get(url, headers=headers) as response:
+            if response.status in RETRY_STATUSES and attempt < fetcher.retries:
+                delay = results.parse_retry_after(response.headers.get("Retry-After")) or 0.0
+                await asyncio.sleep(max(delay, fetcher.backoff_factor * (2 ** attempt)))
+                continue
+
+            if response.status == 304 and validated is not None:
+                metrics.increment("fetch.not_modified")
+                if fetcher.page_cache is not None:
+                    await _run(fetcher.page_cache.refresh, url)
+                return validated[2]
+
+            # the same errors the blocking fetcher's are classified as, aiohttp's aren't recognized
+            if response.status >= 400:
+                metrics.increment("fetch.errors")
+            if response.status == 404:
+                raise results.PlayerNotFound("{} doesn't exist".format(url))
+            if response.status == 429:
+                raise results.RateLimited("Rate limited on {}".format(url),
+                                          results.parse_retry_after(response.headers.get("Retry-After")))
+            response.raise_for_status()
+            page = await response.text(encoding=None if response.charset else "utf-8")
+            await _run(fetcher.remember, url, page, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return page
+
+
+async def get_page(url: str, season: Optional[str] = None, max_age: Optional[float] = None) -> str:
+    """
+    Gets a page without blocking the event loop, joining the fetch already in flight for the url if there is one.
+
+    Parameters:
+        url - the page url
+        season - the season the page is being read for, if any
+        max_age - overrides the page cache ttl, in seconds
+    Returns:
+        - str: the page html
+    """
+    loop = asyncio.get_running_loop()
+    in_flight = _in_flight.setdefault(loop, {})
+    task = in_flight.get(url)
+    if task is None:
+        task = loop.create_task(_download(url, season, max_age))
+        in_flight[url] = task
+        task.add_done_callback(lambda _: in_flight.pop(url, None))
+    # shielded so one cancelled caller doesn't cancel the fetch for everyone else waiting on it
+    return await asyncio.shield(task)
+
+
+def _get_loader() -> ThreadPoolExecutor:
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = ThreadPoolExecutor(thread_name_prefix="nfl_stats.aio")
+        return _loader
+
+
+async def load(player_class: Type[Player], name: str, year: str) -> results.LoadResult:
+    """
+    Awaitable set_stats, through the same memo, stats cache and known misses: those run in a thread, and only
+    the download of a missing season is handed back to the event loop.
+
+    Parameters:
+        player_class - one of QB, WR, RB, K, TE
+        name - the player name
+        year - the year to get statistics for
+    Returns:
+        - LoadResult: the same as set_stats
+    """
+    loop = asyncio.get_running_loop()
+
+    def download(url: str, season: str) -> str:
+        return asyncio.run_coroutine_threadsafe(get_page(url, season), loop).result()
+
+    # not the loop's executor: these threads wait on downloads that use it, sharing it could starve them
+    player = player_class(name)
+    return await loop.run_in_executor(_get_loader(), player.set_stats, str(year), download)
+
+
+async def load_career(player_class: Type[Player], name: str) -> Dict[str, Player]:
+    """
+    Awaitable load_career, every season on the player page from a single request.
+
+    Parameters:
+        player_class - one of QB, WR, RB, K, TE
+        name - the player name
+    Returns:
+        - dict: year -> player with the stats for that season set
+    """
+    player = player_class(name)
+    page = await get_page(get_player_url(player.name, await _run(player.get_player_id)))
+    return await _run(player.load_career_from_page, page)
+
+
+async def close() -> None:
+    """
+    Closes the event loop's shared HTTP session.
+    """
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
@@ -0,0 +1,151 @@
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from nfl_stats import fetch, memo, metrics, parsers, stats_cache
+from nfl_stats.page_cache import PageCache
+from nfl_stats.player import POSITIONS, get_player_url
+
+logger = logging.getLogger(__name__)
+
+# players sent to a worker at once, large enough that the inter-process overhead doesn't show
+DEFAULT_BATCH_SIZE = 16
+
+# (position, name, player id)
+Job = Tuple[str, str, Optional[str]]
+
+
+class WorkerStats(NamedTuple):
+    pages: int
+    seasons: int
+    # time spent reading and parsing pages, not waiting for work
+    busy_seconds: float
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.busy_seconds if self.busy_seconds else 0.0
+
+
+class BackfillReport(NamedTuple):
+    players: int
+    seasons: int
+    seconds: float
+    failed: List[Tuple[str, str, str]]
+    # worker process id -> what it parsed
+    workers: Dict[int, WorkerStats]
+
+    @property
+    def pages_per_second(self) -> float:
+        return (self.players - len(self.failed)) / self.seconds if self.seconds else 0.0
+
+
+class _BatchResult(NamedTuple):
+    pid: int
+    busy_seconds: float
+    # (position, cache key, year -> cache record) of every player parsed
+    records: List[Tuple[str, str, Dict[str, Dict[str, object]]]]
+    failed: List[Tuple[str, str, str]]
+
+
+def _init_worker(base_url: str, page_cache: PageCache, parser: str) -> None:
+    # workers only read pages already cached and never write to the stats cache
+    fetch.BASE_URL = base_url
+    fetch.set_fetcher(fetch.Fetcher(page_cache=page_cache, offline=True))
+    parsers.set_parser(parser)
+
+
+def _parse_batch(jobs: List[Job]) -> _BatchResult:
+    # the records are plain dicts of numbers and strings, so sending them back is cheap
+    start = time.perf_counter()
+    records = []
+    failed = []
+    for position, name, player_id in jobs:
+        player = POSITIONS[position](name, player_id)
+        try:
+            career = player.parse_career(fetch.get_page(get_player_url(name, player_id)))
+        except Exception as e:
+            failed.append((position, name, repr(e)))
+            continue
+        records.append((position, player.get_cache_key(),
+                        {year: season.get_cache_record() for year, season in career.items()}))
+    return _BatchResult(os.getpid(), time.perf_counter() - start, records, failed)
+
+
+def _resolve(players: Iterable[Tuple]) -> List[Job]:
+    # ids are looked up once here so the workers don't each load the player index
+    jobs = []
+    for player in players:
+        position, name = player[0].upper(), player[1]
+        player_id = player[2] if len(player) > 2 else None
+        jobs.append((position, name, POSITIONS[position](name, player_id).get_player_id()))
+    return jobs
+
+
+def backfill(players: Iterable[Tuple],
+             max_workers: Optional[int] = None,
+             batch_size: int = DEFAULT_BATCH_SIZE) -> BackfillReport:
+    """
+    Re-parses every season of many players from pages already in the page cache, spread over a process
+    pool since parsing is CPU bound and threads would share one GIL.
+
+    Workers read and parse the pages and send back the cache records, this process is the only one
+    writing them to the stats cache, one bulk write per player. Nothing is downloaded, a player whose
+    page isn't cached is reported as failed.
+
+    Parameters:
+        players - (position, name) or (position, name, player id) of every player to backfill
+        max_workers - the number of worker processes, defaults to the number of cores
+        batch_size - the number of players sent to a worker at once
+    Returns:
+        - BackfillReport
+    """
+    jobs = _resolve(players)
+    page_cache = fetch.get_fetcher().page_cache or PageCache()
+
+    start = time.perf_counter()
+    seasons = 0
+    failed = []
+    workers: Dict[int, WorkerStats] = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(fetch.BASE_URL, page_cache, parsers.get_parser())) as executor:
+        futures = [executor.submit(_parse_batch, jobs[index:index + batch_size])
+                   for index in range(0, len(jobs), batch_size)]
+        for future in as_completed(futures):
+            result = future.result()
+            batch_seasons = 0
+            for position, key, records in result.records:
+                with metrics.timer("cache.write"):
+                    stats_cache.get_cache().put_many(position, {(key, year): record for year, record in records.items()})
+                for year in records:
+                    memo.get_memo().invalidate((position, key, year))
+                batch_seasons += len(records)
+            seasons += batch_seasons
+            failed.extend(result.failed)
+
+            pages, parsed, busy_seconds = workers.get(result.pid, WorkerStats(0, 0, 0.0))
+            workers[result.pid] = WorkerStats(pages + len(result.records), parsed + batch_seasons,
+                                              busy_seconds + result.busy_seconds)
+
+    for position, name, error in failed:
+        metrics.increment("load.failures")
+        logger.warning("Could not backfill %s %s: %s", position, name, error)
+    metrics.increment("backfill.seasons", seasons)
+    return BackfillReport(len(jobs), seasons, time.perf_counter() - start, failed, workers)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m nfl_stats.backfill PLAYERS_FILE [WORKERS]")
+        print("PLAYERS_FILE has one POSITION,Name[,player id] per line")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with open(sys.argv[1]) as file:
+        players = [tuple(field.strip() for field in line.split(",")) for line in file if line.strip()]
+    report = backfill(players, int(sys.argv[2]) if len(sys.argv) == 3 else None)
+    print(">> Backfilled {} seasons of {} players in {:.1f}s ({:.1f} pages/s), {} failed".format(
+        report.seasons, report.players, report.seconds, report.pages_per_second, len(report.failed)))
+    for pid, worker in sorted(report.workers.items()):
+        print("   worker {}: {} pages, {:.1f} pages/s".format(pid, worker.pages, worker.pages_per_second))
@@ -0,0 +1,182 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from nfl_stats import schema, stats_cache
+from nfl_stats.player import POSITIONS, Player
+
+AGGREGATES = ("sum", "mean", "min", "max", "count")
+
+
+def _to_column(values: List, convert) -> np.ndarray:
+    if convert is int and None not in values:
+        return np.array(values, dtype=np.int64)
+    if convert in (int, float):
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    return np.array(["" if value is None else str(value) for value in values], dtype=np.str_)
+
+
+class SeasonTable:
+    def __init__(self, position: str, columns: Dict[str, np.ndarray]):
+        self.position: str = position
+        self.columns: Dict[str, np.ndarray] = columns
+
+    @classmethod
+    def from_players(cls, position: str, players: Iterable[Player]) -> "SeasonTable":
+        """
+        Builds a table with one row per player-season and one array per stat of the position.
+
+        Parameters:
+            position - one of QB, WR, RB, K, TE
+            players - loaded players of that position, each with its year set
+        Returns:
+            - SeasonTable
+        """
+        _, stats = schema.SCHEMAS[position]
+        players = list(players)
+        columns = {
+            "name": _to_column([player.name for player in players], str),
+            "year": _to_column([int(player.year) for player in players], int)
+        }
+        for stat in stats:
+            columns[stat.attribute] = _to_column([getattr(player, stat.attribute) for player in players], stat.convert)
+        return cls(position, columns)
+
+    @classmethod
+    def from_cache(cls, position: str) -> "SeasonTable":
+        """
+        Builds a table from every cached season of the position in the stats cache.
+
+        Parameters:
+            position - one of QB, WR, RB, K, TE
+        Returns:
+            - SeasonTable
+        """
+        players = []
+        for (name, year), data in stats_cache.get_cache().all(position):
+            player = POSITIONS[position](name)
+            player.year = year
+            player.set_stats_from_dict(data)
+            players.append(player)
+        return cls.from_players(position, players)
+
+    @classmethod
+    def load(cls, path: str) -> "SeasonTable":
+        """
+        Loads a table written by save.
+
+        Parameters:
+            path - the .npz file
+        Returns:
+            - SeasonTable
+        """
+        with np.load(path, allow_pickle=False) as data:
+            columns = {name: data[name] for name in data.files if name != "__position__"}
+            return cls(str(data["__position__"]), columns)
+
+    def save(self, path: str) -> None:
+        """
+        Saves every column as an array in a single .npz file.
+
+        Parameters:
+            path - the .npz file
+        Returns:
+            - None
+        """
+        np.savez(path, __position__=np.array(self.position), **self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns["name"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def take(self, rows: np.ndarray) -> "SeasonTable":
+        return SeasonTable(self.position, {name: values[rows] for name, values in self.columns.items()})
+
+    def filter(self, mask: np.ndarray) -> "SeasonTable":
+        """
+        Keeps the rows where mask is True, e.g. table.filter(table["year"] >= 2000).
+
+        Parameters:
+            mask - a boolean array with one value per row
+        Returns:
+            - SeasonTable
+        """
+        return self.take(np.asarray(mask, dtype=bool))
+
+    def sort(self, column: str, descending: bool = True) -> "SeasonTable":
+        """
+        Sorts the rows by a column, rows without a value (NaN) last either way.
+
+        Parameters:
+            column - the column to sort by
+            descending - highest first
+        Returns:
+            - SeasonTable
+        """
+        values = self.columns[column]
+        if descending and values.dtype.kind in "iuf":
+            # negated rather than reversed, so NaN stays last and ties keep their order
+            return self.take(np.argsort(-values, kind="stable"))
+        rows = np.argsort(values, kind="stable")
+        return self.take(rows[::-1] if descending else rows)
+
+    def top(self, column: str, k: int = 10) -> "SeasonTable":
+        """
+        The k rows with the highest values of a column, highest first.
+
+        Parameters:
+            column - the stat to rank by
+            k - the number of rows to keep
+        Returns:
+            - SeasonTable
+        """
+        values = self.columns[column]
+        if k < len(values):
+            # only the top k are sorted, the rest are just partitioned away
+            rows = np.argpartition(-values, k)[:k]
+        else:
+            rows = np.arange(len(values))
+        return self.take(rows[np.argsort(-values[rows], kind="stable")])
+
+    def group_by(self, key: str, column: str, aggregate: str = "sum") -> Dict[object, float]:
+        """
+        Aggregates a column over the rows sharing a key, e.g. total passing yards per team.
+
+        Rows without a value (NaN) are left out, so a group's count is the number of rows with a value,
+        and a group without any gets a sum of 0 and a NaN mean, min and max.
+
+        Parameters:
+            key - the column to group on, e.g. team or year
+            column - the stat to aggregate
+            aggregate - one of sum, mean, min, max, count
+        Returns:
+            - dict: key value -> aggregated value
+        """
+        if aggregate not in AGGREGATES:
+            raise ValueError("Unknown aggregate {}, expected one of {}".format(aggregate, ", ".join(AGGREGATES)))
+
+        keys, groups = np.unique(self.columns[key], return_inverse=True)
+        values = self.columns[column].astype(np.float64)
+        present = ~np.isnan(values)
+        groups, values = groups[present], values[present]
+        counts = np.bincount(groups, minlength=len(keys))
+
+        if aggregate == "count":
+            result = counts
+        elif aggregate in ("sum", "mean"):
+            result = np.bincount(groups, weights=values, minlength=len(keys))
+            if aggregate == "mean":
+                with np.errstate(invalid="ignore"):
+                    result = result / counts
+        else:
+            result = np.full(len(keys), np.inf if aggregate == "min" else -np.inf)
+            (np.minimum if aggregate == "min" else np.maximum).at(result, groups, values)
+            result[counts == 0] = np.nan
+
+        return {key_value.item(): value.item() for key_value, value in zip(keys, result)}
+
+    def to_records(self, limit: Optional[int] = None) -> List[Dict[str, object]]:
+        rows = range(len(self) if limit is None else min(limit, len(self)))
+        return [{name: values[row].item() for name, values in self.columns.items()} for row in rows]
@@ -0,0 +1,176 @@
+import difflib
+import json
+import logging
+import re
+import string
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+SUFFIXES = ("jr", "sr", "ii", "iii", "iv", "v")
+
+INDEX_FILE = "./player_index.json"
+
+logger = logging.getLogger(__name__)
+
+# e.g. <b><a href="/players/B/BradTo00.htm">Tom Brady</a></b> (QB) 2000-2022
+INDEX_ENTRY = re.compile(r'<a href="/players/[A-Z]/([^"/]+)\.htm">([^<]+)</a>(?:\s*</b>)?\s*\(([^)]*)\)\s*(\d{4})-(\d{4})')
+
+
+class PlayerEntry(NamedTuple):
+    player_id: str
+    name: str
+    positions: Tuple[str, ...]
+    first_year: int
+    last_year: int
+
+
+def normalize_name(name: str) -> str:
+    """
+    Lowercases a name and drops accents, punctuation and suffixes, so "Odell Beckham Jr." -> "odell beckham".
+
+    Parameters:
+        name - the player name
+    Returns:
+        - str: the normalized name
+    """
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    name = name.translate(str.maketrans("", "", ".'"))
+    name = name.translate(str.maketrans(string.punctuation, " " * len(string.punctuation)))
+    words = name.split()
+    while len(words) > 2 and words[-1] in SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def split_name(name: str) -> Tuple[str, str]:
+    """
+    Splits a name into first and last name, dropping any suffix but keeping the case and punctuation,
+    which the site's player ids keep too (A.J. Green is GreeA.00).
+
+    Parameters:
+        name - the player name, e.g. "Odell Beckham Jr."
+    Returns:
+        - (first name, last name), e.g. ("Odell", "Beckham")
+    """
+    words = name.split()
+    while len(words) > 2 and words[-1].lower().rstrip(".") in SUFFIXES:
+        words.pop()
+    return words[0], words[-1].rstrip(",")
+
+
+class PlayerIndex:
+    def __init__(self, entries: Iterable[PlayerEntry] = ()):
+        self.entries: List[PlayerEntry] = []
+        self._by_name: Dict[str, List[PlayerEntry]] = {}
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: PlayerEntry) -> None:
+        self.entries.append(entry)
+        self._by_name.setdefault(normalize_name(entry.name), []).append(entry)
+
+    @classmethod
+    def build(cls, letters: str = string.ascii_uppercase) -> "PlayerIndex":
+        """
+        Builds the index from the site's alphabetical player index pages, one request per letter.
+
+        Parameters:
+            letters - the last name initials to index
+        Returns:
+            - PlayerIndex
+        """
+        from nfl_stats import fetch
+
+        index = cls()
+        for letter in letters:
+            logger.info("Retrieving player index %s from pro-football-reference.com", letter)
+            page = fetch.get_page("{}/players/{}/".format(fetch.BASE_URL, letter))
+            for player_id, name, positions, first_year, last_year in INDEX_ENTRY.findall(page):
+                index.add(PlayerEntry(player_id, name.strip(), tuple(positions.split("-")),
+                                      int(first_year), int(last_year)))
+        return index
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE) -> "PlayerIndex":
+        with open(path, "r") as file:
+            return cls(PlayerEntry(entry[0], entry[1], tuple(entry[2]), entry[3], entry[4]) for entry in json.load(file))
+
+    def save(self, path: str = INDEX_FILE) -> None:
+        with open(path, "w") as file:
+            json.dump([list(entry) for entry in self.entries], file)
+
+    def lookup(self, name: str, position: Optional[str] = None, year: Optional[str] = None) -> Optional[PlayerEntry]:
+        """
+        Finds the player a name refers to, narrowed by position and by a season they played.
+
+        Only the exact name (up to case, accents, punctuation and suffixes) matches, search finds
+        misspelled ones. If several players match, the most recent one wins.
+
+        Parameters:
+            name - the player name
+            position - the position the player played, if known
+            year - a season the player played, if known
+        Returns:
+            - PlayerEntry: the player, None if nothing matched
+        """
+        candidates = self._by_name.get(normalize_name(name), [])
+
+        for narrowed in (self._narrow(candidates, position, year), self._narrow(candidates, position, None),
+                         candidates):
+            if narrowed:
+                return max(narrowed, key=lambda entry: entry.last_year)
+        return None
+
+    def search(self, name: str, limit: int = 5) -> List[PlayerEntry]:
+        """
+        Fuzzy search for every player with a name close to the one given.
+
+        Parameters:
+            name - the (partial or misspelled) player name
+            limit - the max number of names to return
+        Returns:
+            - list of PlayerEntry, closest names first
+        """
+        close = difflib.get_close_matches(normalize_name(name), self._by_name.keys(), n=limit, cutoff=0.6)
+        return [entry for match in close for entry in self._by_name[match]]
+
+    @staticmethod
+    def _narrow(candidates: List[PlayerEntry], position: Optional[str], year: Optional[str]) -> List[PlayerEntry]:
+        return [entry for entry in candidates
+                if (position is None or position in entry.positions)
+                and (not year or entry.first_year <= int(year) <= entry.last_year)]
+
+
+_index: Optional[PlayerIndex] = None
+_index_loaded: bool = False
+
+
+def get_index() -> Optional[PlayerIndex]:
+    """
+    The index the position classes resolve player ids with, loaded from ./player_index.json the first
+    time it's needed.
+
+    Returns:
+        - PlayerIndex: None if no index has been built
+    """
+    global _index, _index_loaded
+    if not _index_loaded:
+        _index_loaded = True
+        if _index is None and Path(INDEX_FILE).is_file():
+            _index = PlayerIndex.load(INDEX_FILE)
+    return _index
+
+
+def set_index(index: Optional[PlayerIndex]) -> None:
+    global _index, _index_loaded
+    _index = index
+    _index_loaded = True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=">> %(message)s")
+    index = PlayerIndex.build(sys.argv[1] if len(sys.argv) > 1 else string.ascii_uppercase)
+    index.save()
+    print(">> Indexed {} players into {}".format(len(index.entries), INDEX_FILE))
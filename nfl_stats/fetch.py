@@ -0,0 +1,474 @@
+import codecs
+import contextlib
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from nfl_stats import metrics, parsers, results
+from nfl_stats.page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://www.pro-football-reference.com"
+
+
+class HostRateLimiter:
+    def __init__(self, requests_per_second: float = 0.0, parent: Optional["HostRateLimiter"] = None):
+        self.requests_per_second: float = requests_per_second
+        # a limiter that also has to allow the request, so a tighter limit can't escape the process-wide one
+        self.parent: Optional[HostRateLimiter] = parent
+        self._lock = threading.Lock()
+        self._next_request_at: Dict[str, float] = {}
+
+    def reserve(self, url: str) -> float:
+        """
+        Reserves the next request slot for the url's host.
+
+        Parameters:
+            url - the url about to be requested
+        Returns:
+            - float: how many seconds to wait before making the request
+        """
+        parent_delay = self.parent.reserve(url) if self.parent is not None else 0.0
+        if self.requests_per_second <= 0:
+            return parent_delay
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            request_at = max(now, self._next_request_at.get(host, now))
+            self._next_request_at[host] = request_at + 1.0 / self.requests_per_second
+        return max(request_at - now, parent_delay)
+
+    def wait(self, url: str) -> None:
+        """
+        Blocks until another request to the url's host is allowed.
+
+        Parameters:
+            url - the url about to be requested
+        Returns:
+            - None
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+
+# shared by every fetch in the process so concurrent loaders can't hammer the site together
+rate_limiter = HostRateLimiter()
+
+
+class Fetcher:
+    def __init__(self,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0,
+                 retries: int = 3,
+                 backoff_factor: float = 1.0,
+                 pool_size: int = 10,
+                 max_validated_pages: int = 256,
+                 page_cache: Optional[PageCache] = None,
+                 offline: bool = False,
+                 streaming: bool = False):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.retries: int = retries
+        self.backoff_factor: float = backoff_factor
+        self.pool_size: int = pool_size
+        self.headers: Dict[str, str] = {"Accept-Encoding": "gzip, deflate"}
+        self.rate_limiter: HostRateLimiter = rate_limiter
+        self.page_cache: Optional[PageCache] = page_cache
+        self.max_validated_pages: int = max_validated_pages
+        self.offline: bool = offline
+        # read season tables while they download and hang up once they're parsed
+        self.streaming: bool = streaming
+
+        # url -> (etag, last modified, page) of recent pages, used for conditional requests
+        self._validated_pages: "OrderedDict[str, Tuple[Optional[str], Optional[str], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._session = None
+
+    def with_rate_limit(self, requests_per_second: float) -> "Fetcher":
+        """
+        A fetcher sharing this one's session and caches whose requests are also held to their own per-host rate.
+
+        Parameters:
+            requests_per_second - the max requests per second to any one host, on top of this fetcher's limit
+        Returns:
+            - Fetcher: the rate limited fetcher
+        """
+        fetcher = copy.copy(self)
+        fetcher.rate_limiter = HostRateLimiter(requests_per_second, parent=self.rate_limiter)
+        return fetcher
+
+    @property
+    def session(self):
+        """
+        The pooled requests session, created on the first download so requests is only imported
+        by processes that actually go to the network.
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            with self._lock:
+                if self._session is None:
+                    # retries back off exponentially and honor Retry-After on 429/503
+                    retry = Retry(total=self.retries,
+                                  backoff_factor=self.backoff_factor,
+                                  status_forcelist=(429, 500, 502, 503, 504),
+                                  allowed_methods=frozenset(["GET"]),
+                                  respect_retry_after_header=True,
+                                  # the last response is raised by raise_for_status, so its Retry-After can be read
+                                  raise_on_status=False)
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size,
+                                          max_retries=retry)
+                    session = requests.Session()
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+        return self._session
+
+    def get_page(self, url: str, season: Optional[str] = None, max_age: Optional[float] = None) -> str:
+        """
+        Gets a page from the page cache if it's fresh, otherwise downloads it over the pooled session.
+
+        If the page was downloaded before with an ETag or Last-Modified header, the request is
+        made conditional and a 304 response returns the previously downloaded page.
+
+        Parameters:
+            url - the page url
+            season - the season the page is being read for, decides if a cached page is fresh
+            max_age - overrides the page cache ttl, in seconds
+        Returns:
+            - str: the page html
+        """
+        page = self._read_cache(url, season, max_age)
+        if page is not None:
+            return page
+
+        claimed, page = self.claim(url, season, max_age)
+        if page is not None:
+            return page
+        try:
+            return self._download(url)
+        finally:
+            self.release(url, claimed)
+
+    def claim(self, url: str, season: Optional[str] = None,
+              max_age: Optional[float] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Claims the download of a page that wasn't in the page cache, so hosts sharing the cache download it once.
+        If another host already claimed it, waits for that host's download to show up in the cache instead.
+
+        Parameters:
+            url - the page url
+            season - the season the page is being read for, decides if a cached page is fresh
+            max_age - overrides the page cache ttl, in seconds
+        Returns:
+            - (True if the claim was taken and has to be released, the page if it no longer has to be downloaded)
+        """
+        if self.page_cache is None:
+            return False, None
+
+        if self.page_cache.claim(url):
+            # the host that held the claim before may have cached the page since it was looked up
+            page = self.page_cache.get(url, season, max_age)
+            if page is None:
+                return True, None
+            self.page_cache.release(url)
+        else:
+            # another host sharing the page cache is downloading the page right now
+            page = self.page_cache.wait(url, season, max_age)
+            if page is None:
+                return False, None
+        metrics.increment("page_cache.shared_hit")
+        return False, page
+
+    def release(self, url: str, claimed: bool) -> None:
+        """
+        Releases a claim taken by claim, once the page is cached or its download failed.
+        """
+        if claimed:
+            self.page_cache.release(url)
+
+    def _download(self, url: str) -> str:
+        import requests
+
+        validated = self.get_validated(url)
+        try:
+            response = self._request(url, validated)
+            if response.status_code == 304 and validated is not None:
+                return self._not_modified(url, validated)
+
+            response.raise_for_status()
+            page = response.text
+        except requests.RequestException:
+            metrics.increment("fetch.errors")
+            raise
+
+        metrics.increment("fetch.bytes", len(response.content))
+        with metrics.timer("page_cache.write"):
+            self.remember(url, page, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return page
+
+    def iter_page(self, url: str, season: Optional[str] = None, max_age: Optional[float] = None,
+                  chunk_size: int = 64 * 1024) -> Iterator[str]:
+        """
+        Reads a page in pieces as it's downloaded, so parsing can start before the whole page has arrived.
+
+        Closing the iterator before the end, e.g. once the table being read is parsed, closes the connection
+        and nothing more is downloaded. Only a page read to the end is kept in the page cache, hosts waiting on
+        the claim of a page that was left unfinished download it themselves.
+
+        Parameters:
+            url - the page url
+            season - the season the page is being read for, decides if a cached page is fresh
+            max_age - overrides the page cache ttl, in seconds
+            chunk_size - the size of the pieces, in bytes
+        Returns:
+            - iterator of str: the page html, in order
+        """
+        page = self._read_cache(url, season, max_age)
+        claimed = False
+        if page is None:
+            claimed, page = self.claim(url, season, max_age)
+        try:
+            yield from self._iter_download(url, page, chunk_size)
+        finally:
+            self.release(url, claimed)
+
+    def _iter_download(self, url: str, page: Optional[str], chunk_size: int) -> Iterator[str]:
+        if page is None:
+            import requests
+
+            validated = self.get_validated(url)
+            try:
+                response = self._request(url, validated, stream=True)
+            except requests.RequestException:
+                metrics.increment("fetch.errors")
+                raise
+            if response.status_code == 304 and validated is not None:
+                response.close()
+                page = self._not_modified(url, validated)
+
+        if page is not None:
+            for start in range(0, len(page), chunk_size):
+                yield page[start:start + chunk_size]
+            return
+
+        received = 0
+        chunks = []
+        complete = False
+        try:
+            response.raise_for_status()
+            decoder = codecs.getincrementaldecoder(response.encoding)(errors="replace")
+            for data in response.iter_content(chunk_size):
+                received += len(data)
+                chunk = decoder.decode(data)
+                chunks.append(chunk)
+                yield chunk
+            chunks.append(decoder.decode(b"", final=True))
+            complete = True
+        except requests.RequestException:
+            metrics.increment("fetch.errors")
+            raise
+        finally:
+            # an unfinished body can't go back to the pool, closing drops the connection
+            response.close()
+            metrics.increment("fetch.bytes", received)
+            if not complete:
+                metrics.increment("fetch.stopped_early")
+
+        with metrics.timer("page_cache.write"):
+            self.remember(url, "".join(chunks), response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    def get_table(self, url: str, table_id: str, season: Optional[str] = None) -> parsers.Table:
+        """
+        Reads the season rows of a table while the page downloads, and stops the download as soon as the
+        table is parsed, so the rest of the page is never transferred.
+
+        Parameters:
+            url - the page url
+            table_id - the id prefix of the season rows
+            season - the season the page is being read for, decides if a cached page is fresh
+        Returns:
+            - dict: year -> data-stat -> cell text
+        """
+        with contextlib.closing(self.iter_page(url, season)) as chunks:
+            return parsers.parse_table_chunks(chunks, table_id)
+
+    def _read_cache(self, url: str, season: Optional[str], max_age: Optional[float]) -> Optional[str]:
+        if self.page_cache is not None:
+            with metrics.timer("page_cache.read"):
+                # offline, any page that was ever downloaded beats none at all
+                page = self.page_cache.get(url, season, float("inf") if self.offline else max_age)
+            if page is not None:
+                metrics.increment("page_cache.hit")
+                return page
+            metrics.increment("page_cache.miss")
+
+        if self.offline:
+            raise results.Offline("{} isn't cached and the fetcher is offline".format(url))
+        return None
+
+    def _request(self, url: str, validated: Optional[Tuple[Optional[str], Optional[str], str]], stream: bool = False):
+        headers = {}
+        if validated is not None:
+            etag, last_modified, _ = validated
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        with metrics.timer("fetch.rate_limit"):
+            self.rate_limiter.wait(url)
+
+        logger.info("Retrieving %s", url)
+        metrics.increment("fetch.requests")
+        with metrics.timer("fetch.download"):
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+        # connect and time to first byte, requests doesn't split out dns
+        metrics.observe("fetch.response", response.elapsed.total_seconds())
+        if "charset" not in response.headers.get("Content-Type", ""):
+            # requests falls back to latin-1 for text/html, the site's pages are utf-8
+            response.encoding = "utf-8"
+        return response
+
+    def _not_modified(self, url: str, validated: Tuple[Optional[str], Optional[str], str]) -> str:
+        metrics.increment("fetch.not_modified")
+        if self.page_cache is not None:
+            self.page_cache.refresh(url)
+        return validated[2]
+
+    def get_validated(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], str]]:
+        """
+        Gets a previously downloaded page with the validators for a conditional request.
+
+        Returns:
+            - (etag, last modified, page html), None if the page has no validators
+        """
+        if self.page_cache is not None:
+            entry = self.page_cache.get_entry(url)
+            if entry is None or not (entry["etag"] or entry["last_modified"]):
+                return None
+            page = self.page_cache.read_page(entry)
+            if page is None:
+                return None
+            return entry["etag"], entry["last_modified"], page
+
+        with self._lock:
+            validated = self._validated_pages.get(url)
+            if validated is not None:
+                self._validated_pages.move_to_end(url)
+            return validated
+
+    def remember(self, url: str, page: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """
+        Keeps a downloaded page in the page cache, or in memory if it came with validators and there's no page cache.
+        """
+        if self.page_cache is not None:
+            self.page_cache.put(url, page, etag, last_modified)
+            return
+
+        if not etag and not last_modified:
+            return
+
+        with self._lock:
+            self._validated_pages[url] = (etag, last_modified, page)
+            self._validated_pages.move_to_end(url)
+            while len(self._validated_pages) > self.max_validated_pages:
+                self._validated_pages.popitem(last=False)
+
+
+# NFL_STATS_OFFLINE=1 starts every process in cache-only mode
+_fetcher = Fetcher(page_cache=PageCache(), offline=os.environ.get("NFL_STATS_OFFLINE", "") not in ("", "0"))
+
+
+def get_fetcher() -> Fetcher:
+    return _fetcher
+
+
+def set_fetcher(fetcher: Fetcher) -> None:
+    """
+    Replaces the fetcher shared by every position class, e.g. to change timeouts or retries.
+
+    Parameters:
+        fetcher - the new shared fetcher
+    Returns:
+        - None
+    """
+    global _fetcher
+    _fetcher = fetcher
+
+
+def set_offline(offline: bool = True) -> None:
+    """
+    Turns cache-only mode on or off. Offline, pages only come from the page cache (however old they are)
+    and anything else fails straight away with results.Offline instead of going to the network.
+
+    Parameters:
+        offline - True for cache-only mode
+    Returns:
+        - None
+    """
+    _fetcher.offline = offline
+
+
+def set_streaming(streaming: bool = True) -> None:
+    """
+    Turns streaming season loads on or off. Streaming, set_stats parses the season table while the player
+    page downloads and drops the connection once it's read, instead of downloading the whole page first.
+    The page isn't kept then, so secondary tables asked for afterwards download it again.
+
+    Parameters:
+        streaming - True to stream
+    Returns:
+        - None
+    """
+    _fetcher.streaming = streaming
+
+
+def set_rate_limit(requests_per_second: float) -> None:
+    """
+    Sets the per-host request rate for every fetch, 0 disables the limit.
+
+    Parameters:
+        requests_per_second - the max requests per second to any one host
+    Returns:
+        - None
+    """
+    rate_limiter.requests_per_second = requests_per_second
+
+
+def get_page(url: str, season: Optional[str] = None, max_age: Optional[float] = None) -> str:
+    """
+    Gets a page with the shared fetcher.
+
+    Parameters:
+        url - the page url
+        season - the season the page is being read for, if any
+        max_age - overrides the page cache ttl, in seconds
+    Returns:
+        - str: the page html
+    """
+    return _fetcher.get_page(url, season, max_age)
+
+
+def get_table(url: str, table_id: str, season: Optional[str] = None) -> parsers.Table:
+    """
+    Reads the season rows of a table with the shared fetcher, stopping the download once they're parsed.
+
+    Parameters:
+        url - the page url
+        table_id - the id prefix of the season rows
+        season - the season the page is being read for, if any
+    Returns:
+        - dict: year -> data-stat -> cell text
+    """
+    return _fetcher.get_table(url, table_id, season)
@@ -0,0 +1,123 @@
+import logging
+import re
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from nfl_stats import fetch, metrics, parsers, schema
+from nfl_stats.player import POSITIONS, get_player_url
+
+logger = logging.getLogger(__name__)
+
+# the regular season game log table, the playoff games are in "stats_playoffs"
+GAMELOG_TABLE = "stats"
+
+# season stats that don't exist per game, or that are already fields of Game
+NOT_GAME_STATS = ("uniform_number", "pos", "g", "gs", "av", "team")
+
+
+class Game(NamedTuple):
+    player: str
+    season: str
+    week: int
+    date: str
+    team: str
+    opponent: str
+    # "" at home, "@" away, "N" on a neutral field
+    location: str
+    result: str
+    started: bool
+    # attribute -> value of the position's stats that appear in the game log, blank cells are None
+    stats: Dict[str, object]
+
+
+def get_gamelog_url(name: str, year: str, player_id: Optional[str] = None) -> str:
+    """
+    Builds the game log url of a player season, e.g. /players/B/BradTo00/gamelog/2017/.
+
+    Parameters:
+        name - the player name
+        year - the season
+        player_id - the pro-football-reference player id, guessed from the name if not given
+    Returns:
+        - str: the game log url
+    """
+    player_url = get_player_url(name, player_id)
+    return "{}/gamelog/{}/".format(player_url[:-len(".htm")], year)
+
+
+def _game_stats(position: str) -> Tuple[schema.Stat, ...]:
+    _, stats = schema.SCHEMAS[position]
+    return tuple(stat for stat in stats if stat.data_stat not in NOT_GAME_STATS)
+
+
+def parse_games(page: str, position: str, name: str, year: str, table_id: str = GAMELOG_TABLE) -> Iterator[Game]:
+    """
+    Reads the games of a game log page one at a time.
+
+    Parameters:
+        page - the game log page html
+        position - one of QB, WR, RB, K, TE, decides which stats are read
+        name - the player name
+        year - the season
+        table_id - the game log table, "stats_playoffs" for the playoff games
+    Returns:
+        - iterator of Game, rows for games the player didn't play are skipped
+    """
+    stats = _game_stats(position)
+    rows = parsers.PlayerPage(page).rows(table_id)
+    # only the rows are kept while the games are consumed
+    del page
+    for row in rows:
+        week = row.get("week_num", "").strip()
+        if not re.match(r"^\d+$", week) or row.get("reason"):
+            continue
+        try:
+            yield Game(name, str(year), int(week), row.get("game_date", ""), row.get("team", ""),
+                       row.get("opp", ""), row.get("game_location", ""), row.get("game_result", ""),
+                       row.get("gs", "").strip() != "",
+                       {stat.attribute: stat.convert(row[stat.data_stat]) if row[stat.data_stat] != "" else None
+                        for stat in stats if stat.data_stat in row})
+        except ValueError:
+            metrics.increment("parse.failures")
+            logger.warning("Could not read week %s of the %s game log of %s", week, year, name, exc_info=True)
+
+
+def load_games(position: str, name: str, year: str, player_id: Optional[str] = None,
+               playoffs: bool = False) -> Iterator[Game]:
+    """
+    Streams the games a player played in a season.
+
+    The page goes through the page cache like every other download, so a game log fetched after its season
+    finished is never downloaded again and any other is re-validated with a conditional request.
+
+    Parameters:
+        position - one of QB, WR, RB, K, TE
+        name - the player name
+        year - the season
+        player_id - the pro-football-reference player id, resolved from the player index if not given
+        playoffs - read the playoff games instead of the regular season
+    Returns:
+        - iterator of Game, in the order they were played
+    """
+    position = position.upper()
+    player = POSITIONS[position](name, player_id)
+    player.year = str(year)
+    page = fetch.get_page(get_gamelog_url(name, year, player.get_player_id()), str(year))
+    return parse_games(page, position, name, year, "stats_playoffs" if playoffs else GAMELOG_TABLE)
+
+
+def stream_games(players: Iterable[Tuple[str, str, str]]) -> Iterator[Game]:
+    """
+    Streams the games of many player seasons, one page in memory at a time, e.g. a whole league's logs
+    into a store. A player season that can't be loaded is logged and skipped.
+
+    Parameters:
+        players - (position, name, season) of each player season
+    Returns:
+        - iterator of Game
+    """
+    for position, name, year in players:
+        try:
+            yield from load_games(position, name, year)
+        except Exception:
+            metrics.increment("load.failures")
+            logger.warning("Could not load the %s game log of %s", year, name, exc_info=True)
@@ -0,0 +1,202 @@
+import socket
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import urlsplit
+
+# A key-value store shared by many hosts, behind the stats and page caches (stats_cache.KVStatsCache,
+# page_cache.KVPageCache). Any object with the same methods as RedisStore can stand in for it:
+#   get(key), get_many(keys), put(key, value, ttl), put_many(values, ttl), add(key, value, ttl),
+#   exists(key), delete(key) and keys(prefix), with keys as str, values as bytes and ttls in seconds.
+
+Value = Union[bytes, str]
+
+
+class RespError(Exception):
+    pass
+
+
+def _encode(*args: Union[Value, int, float]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def _read_reply(reader):
+    line = reader.readline()
+    if not line:
+        raise ConnectionError("The key-value server closed the connection")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode("utf-8")
+    if kind == b"-":
+        raise RespError(rest.decode("utf-8"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        return None if length < 0 else reader.read(length + 2)[:-2]
+    if kind == b"*":
+        count = int(rest)
+        return None if count < 0 else [_read_reply(reader) for _ in range(count)]
+    raise RespError("Unexpected reply {!r}".format(line))
+
+
+def _escape_pattern(prefix: str) -> str:
+    # SCAN MATCH is a glob pattern
+    return "".join("\\" + char if char in "*?[]\\" else char for char in prefix)
+
+
+class RedisStore:
+    """
+    A Redis, or any server speaking its protocol (KeyDB, Valkey, Dragonfly, ...), as a key-value store.
+    Bulk reads are a single MGET and bulk writes a single pipelined round trip.
+    """
+
+    # keys per MGET or pipeline, so one batch can't block the server for long
+    BATCH_SIZE = 1000
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0, prefix: str = "nfl_stats:",
+                 password: Optional[str] = None, timeout: float = 5.0):
+        self.host: str = host
+        self.port: int = port
+        self.db: int = db
+        # keeps the cache's keys apart from everything else on the server
+        self.prefix: str = prefix
+        self.password: Optional[str] = password
+        self.timeout: float = timeout
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # sent to backfill worker processes, which open their own connections
+        state = dict(self.__dict__)
+        del state["_local"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "nfl_stats:") -> "RedisStore":
+        """
+        Parameters:
+            url - e.g. redis://:password@cache.internal:6379/0
+            prefix - prepended to every key
+        Returns:
+            - RedisStore
+        """
+        parts = urlsplit(url)
+        return cls(parts.hostname or "127.0.0.1", parts.port or 6379, int(parts.path.strip("/") or 0), prefix,
+                   parts.password)
+
+    def _connect(self):
+        connection = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        reader = connection.makefile("rb")
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            connection.sendall(b"".join(_encode(*command) for command in setup))
+            for _ in setup:
+                _read_reply(reader)
+        return connection, reader
+
+    def execute(self, *commands) -> List[object]:
+        """
+        Sends commands in one round trip and reads their replies.
+
+        Parameters:
+            commands - each a tuple of the command name and its arguments, e.g. ("GET", key)
+        Returns:
+            - list: the reply to each command
+        """
+        # sockets aren't shared between threads, each thread keeps its own connection
+        if getattr(self._local, "connection", None) is None:
+            self._local.connection = self._connect()
+        connection, reader = self._local.connection
+        try:
+            connection.sendall(b"".join(_encode(*command) for command in commands))
+            replies = []
+            for _ in commands:
+                # every reply is read even after an error, or the next call would get this one's replies
+                try:
+                    replies.append(_read_reply(reader))
+                except RespError as e:
+                    replies.append(e)
+        except (OSError, ConnectionError):
+            # the next call reconnects
+            self._local.connection = None
+            connection.close()
+            raise
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return replies
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute(("GET", self._key(key)))[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Reads many keys with one MGET per BATCH_SIZE keys.
+
+        Returns:
+            - dict: key -> value, misses are left out
+        """
+        keys = list(keys)
+        values = {}
+        for start in range(0, len(keys), self.BATCH_SIZE):
+            batch = keys[start:start + self.BATCH_SIZE]
+            replies = self.execute(["MGET"] + [self._key(key) for key in batch])[0]
+            values.update((key, value) for key, value in zip(batch, replies) if value is not None)
+        return values
+
+    def put(self, key: str, value: Value, ttl: Optional[float] = None) -> None:
+        self.execute(self._set(key, value, ttl))
+
+    def put_many(self, values: Dict[str, Value], ttl: Optional[float] = None) -> None:
+        items = list(values.items())
+        for start in range(0, len(items), self.BATCH_SIZE):
+            self.execute(*(self._set(key, value, ttl) for key, value in items[start:start + self.BATCH_SIZE]))
+
+    def add(self, key: str, value: Value, ttl: Optional[float] = None) -> bool:
+        """
+        Sets a key only if it doesn't exist yet, e.g. to take a lock.
+
+        Returns:
+            - bool: True if the key was set
+        """
+        return self.execute(self._set(key, value, ttl) + ("NX",))[0] is not None
+
+    def _set(self, key: str, value: Value, ttl: Optional[float]) -> tuple:
+        if ttl is None:
+            return "SET", self._key(key), value
+        return "SET", self._key(key), value, "PX", max(1, int(ttl * 1000))
+
+    def exists(self, key: str) -> bool:
+        return self.execute(("EXISTS", self._key(key)))[0] > 0
+
+    def delete(self, key: str) -> None:
+        self.execute(("DEL", self._key(key)))
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        """
+        Every key starting with a prefix, read with SCAN so the server isn't blocked.
+        """
+        cursor = b"0"
+        pattern = _escape_pattern(self._key(prefix)) + "*"
+        while True:
+            cursor, keys = self.execute(("SCAN", cursor, "MATCH", pattern, "COUNT", self.BATCH_SIZE))[0]
+            for key in keys:
+                yield key.decode("utf-8")[len(self.prefix):]
+            if cursor in (b"0", 0, "0"):
+                return
@@ -0,0 +1,83 @@
+import logging
+from typing import Dict
+
+from nfl_stats import directory, fetch, memo, metrics, parsers, stats_cache
+from nfl_stats.player import POSITIONS, Player
+
+logger = logging.getLogger(__name__)
+
+# position -> league season tables, the first one lists the players and the rest add stats to them
+LEAGUE_TABLES = {
+    "QB": ("passing",),
+    "WR": ("receiving", "rushing"),
+    "RB": ("rushing", "receiving"),
+    "K": ("kicking",),
+    "TE": ("receiving", "rushing")
+}
+
+
+def get_league_url(year: str, table_id: str) -> str:
+    return "{}/years/{}/{}.htm".format(fetch.BASE_URL, year, table_id)
+
+
+def load_season(position: str, year: str, seed_cache: bool = True) -> Dict[str, Player]:
+    """
+    Loads every player of a position for one season from the league-wide tables,
+    one or two requests instead of one per player.
+
+    Parameters:
+        position - one of QB, WR, RB, K, TE
+        year - the season
+        seed_cache - also write each player-season that isn't cached yet into the stats cache, stats
+                     the league tables don't have (e.g. the uniform number) are cached as None
+    Returns:
+        - dict: player id -> player with the stats for that season set
+    """
+    position = position.upper()
+    player_class = POSITIONS[position]
+    year = str(year)
+
+    logger.info("Retrieving %s %s season tables from pro-football-reference.com", year, position)
+
+    rows: Dict[str, Dict[str, str]] = {}
+    for table_id in LEAGUE_TABLES[position]:
+        page = fetch.get_page(get_league_url(year, table_id), year)
+        for row in parsers.parse_league_table(page, table_id):
+            if table_id == LEAGUE_TABLES[position][0]:
+                # a traded player's combined row comes before their per-team rows
+                rows.setdefault(row["player_id"], row)
+            elif row["player_id"] in rows:
+                for data_stat, value in row.items():
+                    rows[row["player_id"]].setdefault(data_stat, value)
+
+    season = {}
+    records = {}
+    for player_id, row in rows.items():
+        if row.get("pos") and position not in row["pos"].upper().split("/"):
+            continue
+
+        player = player_class(row["player"], player_id)
+        player.year = year
+        try:
+            player.set_stats_from_row(row, strict=False)
+        except Exception:
+            logger.exception("Could not read the %s %s row of %s", year, position, row.get("player"))
+            continue
+        season[player_id] = player
+
+        # without a player index the cache is keyed by name, so that's where later lookups go
+        key = player_id if directory.get_index() is not None else player.name
+        records[(key, year)] = player.get_cache_record()
+
+    if seed_cache and records:
+        # a season already cached most likely came from the player page, which has every stat
+        with metrics.timer("cache.read"):
+            cached = stats_cache.get_cache().get_many(position, records)
+        records = {key: record for key, record in records.items() if key not in cached}
+    if seed_cache and records:
+        with metrics.timer("cache.write"):
+            stats_cache.get_cache().put_many(position, records)
+        for (key, year), record in records.items():
+            memo.get_memo().put((position, key, year), record)
+
+    return season
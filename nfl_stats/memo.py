@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+
+class MemoStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    coalesced: int
+
+
+class _Flight:
+    # a load in progress, which every concurrent miss for the same key waits on
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: object = None
+        self.error: Optional[BaseException] = None
+
+
+class MemoCache:
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries: int = max_entries
+        self.ttl: Optional[float] = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._coalesced = 0
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, object]:
+        # callers hold the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        stored_at, value = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self._expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: object) -> None:
+        # callers hold the lock
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, key: Hashable) -> Optional[object]:
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+            else:
+                self._misses += 1
+            return value
+
+    def put(self, key: Hashable, value: object) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, key: Hashable, load: Callable[[], object]) -> object:
+        """
+        Gets a value, loading it on a miss. Concurrent misses for the same key share a single load.
+
+        A load that returns None or raises isn't memoized, every caller waiting on it gets the same
+        result or exception.
+
+        Parameters:
+            key - the memo key
+            load - called with no arguments to load the value
+        Returns:
+            - object: the memoized or loaded value
+        """
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+                return value
+            self._misses += 1
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = load()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if flight.error is None and flight.value is not None:
+                    self._store(key, flight.value)
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def stats(self) -> MemoStats:
+        """
+        Returns:
+            - MemoStats: hits, misses, evictions, expirations and coalesced misses since the memo was created
+        """
+        with self._lock:
+            return MemoStats(self._hits, self._misses, self._evictions, self._expirations, self._coalesced)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# parsed player-season records keyed by (position, player id or name, season), in front of the stats cache
+_memo = MemoCache()
+
+
+def get_memo() -> MemoCache:
+    return _memo
+
+
+def set_memo(memo: MemoCache) -> None:
+    """
+    Sets the memo every position class reads through, MemoCache(max_entries=0) turns memoizing off.
+
+    Parameters:
+        memo - the MemoCache to use
+    Returns:
+        - None
+    """
+    global _memo
+    _memo = memo
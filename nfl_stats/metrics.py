@@ -0,0 +1,97 @@
+import contextlib
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, NamedTuple
+
+# hook(kind, name, value), kind is "counter" (value is the increment) or "timing" (value is in seconds)
+Hook = Callable[[str, str, float], None]
+
+
+class Timing(NamedTuple):
+    count: int
+    total: float
+    max: float
+
+
+class Metrics:
+    def __init__(self):
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, Timing] = {}
+        self._hooks: List[Hook] = []
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+        for hook in self._hooks:
+            hook("counter", name, value)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            count, total, longest = self._timings.get(name, (0, 0.0, 0.0))
+            self._timings[name] = Timing(count + 1, total + seconds, max(longest, seconds))
+        for hook in self._hooks:
+            hook("timing", name, seconds)
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Times the block under a stage name, e.g. with metrics.timer("parse"): ...
+
+        The time is recorded whether or not the block raises.
+
+        Parameters:
+            name - the stage name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def add_hook(self, hook: Hook) -> None:
+        """
+        Calls hook(kind, name, value) on every counter increment and timing, e.g. to export them to
+        a Prometheus or OpenTelemetry collector. Hooks run on the thread doing the load, keep them cheap.
+
+        Parameters:
+            hook - the callable to add
+        Returns:
+            - None
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        self._hooks.remove(hook)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Returns:
+            - dict: {"counters": name -> count, "timings": name -> Timing}
+        """
+        with self._lock:
+            return {"counters": dict(self._counters), "timings": dict(self._timings)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def increment(name: str, value: int = 1) -> None:
+    _metrics.increment(name, value)
+
+
+def observe(name: str, seconds: float) -> None:
+    _metrics.observe(name, seconds)
+
+
+def timer(name: str):
+    return _metrics.timer(name)
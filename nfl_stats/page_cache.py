@@ -0,0 +1,305 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+
+def current_season(at: Optional[float] = None) -> int:
+    """
+    The season whose stats can still change. Seasons start in September and the
+    playoffs run into February, so before September the previous season is current.
+
+    Parameters:
+        at - a timestamp to get the current season at, defaults to now
+    Returns:
+        - int: the current season year
+    """
+    today = datetime.date.today() if at is None else datetime.date.fromtimestamp(at)
+    return today.year if today.month >= 9 else today.year - 1
+
+
+class PageCache:
+    # once over max_bytes, pages are evicted until the cache is down to this fraction of it
+    LOW_WATER_MARK = 0.9
+
+    def __init__(self, directory: str = "./pages", ttl: float = 6 * 60 * 60, max_bytes: int = 512 * 1024 * 1024):
+        self.directory: Path = Path(directory)
+        self.ttl: float = ttl
+        self.max_bytes: int = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def __getstate__(self):
+        # sent to backfill worker processes, locks can't be pickled
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, url: str, season: Optional[str] = None, max_age: Optional[float] = None) -> Optional[str]:
+        """
+        Gets a cached page if it's still fresh.
+
+        A page read for a season that was already finished when the page was fetched never goes
+        stale since those rows can't change, otherwise (a season that was still being played, or
+        the whole career) the page expires after the ttl.
+
+        Parameters:
+            url - the page url
+            season - the season the page is being read for, if any
+            max_age - overrides the ttl, in seconds
+        Returns:
+            - str: the page html, None on a miss or a stale page
+        """
+        entry = self.get_entry(url)
+        if entry is None or not self.is_fresh(entry, season, max_age):
+            return None
+        return self.read_page(entry)
+
+    def get_entry(self, url: str) -> Optional[Dict]:
+        """
+        Gets the metadata stored for a url, fresh or not.
+
+        Returns:
+            - dict: digest, fetched_at, the season current when it was fetched, etag and last_modified,
+                    None if never cached
+        """
+        entry_file = self._entry_file(url)
+        try:
+            with open(entry_file, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: Dict, season: Optional[str] = None, max_age: Optional[float] = None) -> bool:
+        # entries written before the season was stored just go by the ttl
+        if season is not None and int(season) < entry.get("season", int(season)):
+            return True
+        return time.time() - entry["fetched_at"] < (self.ttl if max_age is None else max_age)
+
+    def read_page(self, entry: Dict) -> Optional[str]:
+        """
+        Reads the page html for a cache entry, marking it as recently used.
+
+        Returns:
+            - str: the page html, None if it was evicted
+        """
+        data = self._read_blob(entry["digest"])
+        return None if data is None else data.decode("utf-8")
+
+    def put(self, url: str, page: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Caches a page, stored compressed under the hash of its content.
+
+        Parameters:
+            url - the page url
+            page - the page html
+            etag - the ETag header the page came with
+            last_modified - the Last-Modified header the page came with
+        Returns:
+            - None
+        """
+        data = page.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        self._write_blob(digest, data)
+        self._write_entry(url, {
+            "url": url,
+            "digest": digest,
+            "fetched_at": time.time(),
+            "season": current_season(),
+            "etag": etag,
+            "last_modified": last_modified
+        })
+
+    def refresh(self, url: str) -> None:
+        """
+        Marks a cached page as just fetched, e.g. after a 304 Not Modified.
+
+        Parameters:
+            url - the page url
+        Returns:
+            - None
+        """
+        entry = self.get_entry(url)
+        if entry is not None:
+            entry["fetched_at"] = time.time()
+            entry["season"] = current_season()
+            self._write_entry(url, entry)
+
+    def claim(self, url: str) -> bool:
+        """
+        Claims the download of a page that isn't cached. Only a cache shared between hosts has anyone to
+        coordinate with, so a local one always gives the claim.
+
+        Returns:
+            - bool: True if this process should download the page, False if another one already is
+        """
+        return True
+
+    def wait(self, url: str, season: Optional[str] = None, max_age: Optional[float] = None) -> Optional[str]:
+        """
+        Waits for a page another host claimed to show up in the cache.
+
+        Returns:
+            - str: the page html, None if it didn't show up
+        """
+        return None
+
+    def release(self, url: str) -> None:
+        pass
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        blob_file = self._blob_file(digest)
+        try:
+            with gzip.open(blob_file, "rb") as file:
+                data = file.read()
+            os.utime(blob_file)
+        except OSError:
+            return None
+        return data
+
+    def _write_blob(self, digest: str, data: bytes) -> None:
+        blob_file = self._blob_file(digest)
+        blob_file.parent.mkdir(parents=True, exist_ok=True)
+
+        if blob_file.is_file():
+            os.utime(blob_file)
+        else:
+            temp_file = blob_file.with_suffix(".tmp{}-{}".format(os.getpid(), threading.get_ident()))
+            with gzip.open(temp_file, "wb") as file:
+                file.write(data)
+            size = temp_file.stat().st_size
+            os.replace(temp_file, blob_file)
+            self._add_bytes(size)
+
+    def _write_entry(self, url: str, entry: Dict) -> None:
+        entry_file = self._entry_file(url)
+        entry_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = entry_file.with_suffix(".tmp{}-{}".format(os.getpid(), threading.get_ident()))
+        with open(temp_file, "w") as file:
+            json.dump(entry, file)
+        os.replace(temp_file, entry_file)
+
+    def _add_bytes(self, size: int) -> None:
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(stat.st_size for _, stat in self._blob_stats())
+            else:
+                self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # down to the low-water mark rather than just under max_bytes, so the writes after this one
+        # don't each have to list and sort every blob again
+        target = self.max_bytes * self.LOW_WATER_MARK
+        evicted = set()
+        # least recently used first, pages are touched every time they're read
+        blobs = sorted(self._blob_stats(), key=lambda blob_stat: blob_stat[1].st_mtime)
+        for blob, stat in blobs:
+            if self._total_bytes <= target:
+                break
+            try:
+                blob.unlink()
+            except FileNotFoundError:
+                # evicted by another process since it was listed, its bytes are gone all the same
+                pass
+            except OSError:
+                continue
+            self._total_bytes -= stat.st_size
+            evicted.add(blob.name[:-len(".html.gz")])
+
+        # the urls of the evicted pages would otherwise be left pointing at nothing
+        for entry_file in (self.directory / "urls").glob("*/*.json"):
+            try:
+                with open(entry_file, "r") as file:
+                    digest = json.load(file).get("digest")
+                if digest in evicted:
+                    entry_file.unlink()
+            except (OSError, ValueError):
+                continue
+
+    def _blobs(self):
+        return (self.directory / "blobs").glob("*/*.html.gz")
+
+    def _blob_stats(self) -> Iterator[Tuple[Path, os.stat_result]]:
+        # stat each blob once, skipping the ones another process sharing the directory evicted meanwhile
+        for blob in self._blobs():
+            try:
+                yield blob, blob.stat()
+            except OSError:
+                continue
+
+    def _entry_file(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / "urls" / key[:2] / "{}.json".format(key)
+
+    def _blob_file(self, digest: str) -> Path:
+        return self.directory / "blobs" / digest[:2] / "{}.html.gz".format(digest)
+
+
+class KVPageCache(PageCache):
+    """
+    Pages in a key-value store shared by many hosts, e.g. a kv.RedisStore, so each page is downloaded once
+    for the whole fleet: the first host to miss a page claims it, and the others wait for it to show up
+    instead of downloading it too. Pages are stored compressed under the hash of their content, the store
+    drops them after `retention` (and sooner under its own memory limit) instead of the max_bytes cap.
+    """
+
+    # how long a host gets to download a page the others are waiting for, in seconds
+    CLAIM_TTL = 60.0
+    # how often waiting hosts look for the page, in seconds
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, store, ttl: float = 6 * 60 * 60, retention: Optional[float] = 30 * 24 * 60 * 60):
+        super().__init__(ttl=ttl)
+        self.store = store
+        self.retention: Optional[float] = retention
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get_entry(self, url: str) -> Optional[Dict]:
+        value = self.store.get("page:" + self._url_key(url))
+        if value is None:
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+
+    def _write_entry(self, url: str, entry: Dict) -> None:
+        self.store.put("page:" + self._url_key(url), json.dumps(entry), self.retention)
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        value = self.store.get("blob:" + digest)
+        return None if value is None else gzip.decompress(value)
+
+    def _write_blob(self, digest: str, data: bytes) -> None:
+        self.store.put("blob:" + digest, gzip.compress(data), self.retention)
+
+    def claim(self, url: str) -> bool:
+        return self.store.add("claim:" + self._url_key(url), str(os.getpid()), self.CLAIM_TTL)
+
+    def wait(self, url: str, season: Optional[str] = None, max_age: Optional[float] = None) -> Optional[str]:
+        claim_key = "claim:" + self._url_key(url)
+        deadline = time.monotonic() + self.CLAIM_TTL
+        while time.monotonic() < deadline:
+            time.sleep(self.POLL_INTERVAL)
+            page = self.get(url, season, max_age)
+            # a released claim without a page is a failed download
+            if page is not None or not self.store.exists(claim_key):
+                return page
+        return None
+
+    def release(self, url: str) -> None:
+        self.store.delete("claim:" + self._url_key(url))
@@ -0,0 +1,352 @@
+import importlib.util
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, Optional
+
+from nfl_stats import metrics
+
+# year -> data-stat -> cell text, for every season row of a stats table
+Table = Dict[str, Dict[str, str]]
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _season_row_id(table_id: str):
+    return re.compile(r"^{}\.(\d{{4}})$".format(re.escape(table_id)))
+
+
+def parse_table_bs4(page: str, table_id: str) -> Table:
+    """
+    Reads the season rows by building the full BeautifulSoup tree, slowest but most forgiving.
+    """
+    from bs4 import BeautifulSoup
+
+    row_id = _season_row_id(table_id)
+    soup = BeautifulSoup(page, 'html.parser')
+    table = {}
+    for stats_for_year in soup.find_all("tr", {"id": row_id}):
+        year = row_id.match(stats_for_year["id"]).group(1)
+        table[year] = {cell["data-stat"]: cell.text for cell in stats_for_year.find_all(["th", "td"])
+                       if cell.has_attr("data-stat")}
+    return table
+
+
+def parse_table_lxml(page: str, table_id: str) -> Table:
+    """
+    Reads the season rows with lxml's C parser and an XPath query for the rows.
+    """
+    import lxml.html
+
+    row_id = _season_row_id(table_id)
+    tree = lxml.html.fromstring(page)
+    table = {}
+    for stats_for_year in tree.xpath("//tr[starts-with(@id, $prefix)]", prefix=table_id + "."):
+        match = row_id.match(stats_for_year.get("id"))
+        if match is None:
+            continue
+        table[match.group(1)] = {cell.get("data-stat"): cell.text_content() for cell in stats_for_year
+                                 if cell.get("data-stat") is not None}
+    return table
+
+
+class _RowExtractor(HTMLParser):
+    def __init__(self, table_id: str):
+        super().__init__(convert_charrefs=True)
+        self.row_id = _season_row_id(table_id)
+        self.table: Table = {}
+        self.done: bool = False
+        self._row: Optional[Dict[str, str]] = None
+        self._stat: Optional[str] = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            match = self.row_id.match(dict(attrs).get("id") or "")
+            self._row = None
+            if match is not None:
+                self._row = self.table[match.group(1)] = {}
+        elif self._row is not None and tag in ("td", "th"):
+            self._stat = dict(attrs).get("data-stat")
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._stat is not None:
+            self._row[self._stat] = "".join(self._text)
+            self._stat = None
+        elif tag == "tr":
+            self._row = None
+        elif tag == "table" and self.table:
+            self.done = True
+
+    def handle_data(self, data):
+        if self._stat is not None:
+            self._text.append(data)
+
+
+def parse_table_stream(page: str, table_id: str) -> Table:
+    """
+    Reads the season rows with a streaming tokenizer that only keeps the rows' cell text,
+    and stops as soon as the table holding them closes.
+    """
+    extractor = _RowExtractor(table_id)
+    for start in range(0, len(page), CHUNK_SIZE):
+        extractor.feed(page[start:start + CHUNK_SIZE])
+        if extractor.done:
+            break
+    return extractor.table
+
+
+# longer than any opening table tag, kept between chunks so a tag split across two of them is still found
+_TAG_OVERLAP = 1024
+
+
+def parse_table_chunks(chunks: Iterable[str], table_id: str, parser: Optional[str] = None) -> Table:
+    """
+    Reads the season rows from a page arriving in pieces, e.g. while it's downloaded. Everything before
+    the table is skipped with a plain text search, and no more chunks are pulled once the table closes,
+    so only the table's own markup is kept and parsed.
+
+    Parameters:
+        chunks - the page html, in order
+        table_id - the table id, also the id prefix of the season rows
+        parser - the backend to use, defaults to the one set with set_parser
+    Returns:
+        - dict: year -> data-stat -> cell text, empty if the page has no such table
+    """
+    start_tag = re.compile(r'<table\b[^>]*?\bid="{}"'.format(re.escape(table_id)))
+    pending = ""
+    markup = None
+    for chunk in chunks:
+        if markup is None:
+            pending += chunk
+            match = start_tag.search(pending)
+            if match is None:
+                pending = pending[-_TAG_OVERLAP:]
+                continue
+            markup = [pending[match.start():]]
+            tail = markup[0]
+        else:
+            markup.append(chunk)
+            tail = tail[-len("</table>"):] + chunk
+        if "</table>" in tail:
+            break
+
+    if markup is None:
+        return {}
+    return parse_table("".join(markup), table_id, parser)
+
+
+class _TableRowExtractor(HTMLParser):
+    def __init__(self, table_id: str):
+        super().__init__(convert_charrefs=True)
+        self.table_id: str = table_id
+        self.rows: List[Dict[str, str]] = []
+        self.done: bool = False
+        self._in_table: bool = False
+        self._in_head: bool = False
+        self._row: Optional[Dict[str, str]] = None
+        self._stat: Optional[str] = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "table" and attrs.get("id") == self.table_id:
+            self._in_table = True
+        elif not self._in_table:
+            return
+        elif tag == "thead":
+            self._in_head = True
+        elif tag == "tr":
+            # header rows are repeated through the body every so often
+            self._row = None if self._in_head or "thead" in (attrs.get("class") or "") else {}
+        elif self._row is not None and tag in ("td", "th"):
+            self._stat = attrs.get("data-stat")
+            self._text = []
+            self.handle_cell(attrs)
+        elif self._stat is not None:
+            self.handle_cell_tag(tag, attrs)
+
+    def handle_cell(self, attrs: Dict[str, str]) -> None:
+        pass
+
+    def handle_cell_tag(self, tag: str, attrs: Dict[str, str]) -> None:
+        pass
+
+    def handle_row(self, row: Dict[str, str]) -> None:
+        self.rows.append(row)
+
+    def handle_endtag(self, tag):
+        if not self._in_table:
+            return
+        if tag in ("td", "th") and self._stat is not None:
+            self._row[self._stat] = "".join(self._text)
+            self._stat = None
+        elif tag == "thead":
+            self._in_head = False
+        elif tag == "tr":
+            if self._row:
+                self.handle_row(self._row)
+            self._row = None
+        elif tag == "table":
+            self._in_table = False
+            self.done = True
+
+    def handle_data(self, data):
+        if self._stat is not None:
+            self._text.append(data)
+
+
+class _LeagueRowExtractor(_TableRowExtractor):
+    def handle_cell(self, attrs):
+        if self._stat == "player" and attrs.get("data-append-csv"):
+            self._row["player_id"] = attrs["data-append-csv"]
+
+    def handle_cell_tag(self, tag, attrs):
+        if self._stat == "player" and tag == "a" and "player_id" not in self._row:
+            match = re.match(r"/players/[A-Z]/([^/]+)\.htm", attrs.get("href") or "")
+            if match is not None:
+                self._row["player_id"] = match.group(1)
+
+    def handle_row(self, row):
+        if "player_id" in row:
+            self.rows.append(row)
+
+
+def _extract_rows(extractor: _TableRowExtractor, page: str) -> List[Dict[str, str]]:
+    for start in range(0, len(page), CHUNK_SIZE):
+        extractor.feed(page[start:start + CHUNK_SIZE])
+        if extractor.done:
+            break
+    return extractor.rows
+
+
+def parse_league_table(page: str, table_id: str) -> List[Dict[str, str]]:
+    """
+    Reads every player row of a league-wide season table, e.g. the "passing" table of /years/2017/passing.htm.
+
+    Parameters:
+        page - the league season page html
+        table_id - the id of the table
+    Returns:
+        - list of data-stat -> cell text, one per row, with the player id under "player_id"
+    """
+    with metrics.timer("parse"):
+        rows = _extract_rows(_LeagueRowExtractor(table_id), page)
+    for row in rows:
+        # award markers, e.g. "Tom Brady*+" for a pro bowl, all-pro season
+        row["player"] = row.get("player", "").rstrip("*+ ")
+    return rows
+
+
+# the opening tag of every table on a page, commented out or not
+TABLE_TAG = re.compile(r'<table\b[^>]*?\bid="([^"]+)"')
+
+
+class PlayerPage:
+    """
+    A downloaded player page whose tables are only parsed when they're asked for.
+
+    Most of the secondary tables (playoffs, advanced, scoring, ...) are shipped inside HTML comments
+    and filled in by javascript, so an html parser never sees them as tables. Each table is found with
+    a plain text search instead, and only that table's markup is tokenized, commented out or not.
+    """
+
+    def __init__(self, page: str):
+        self.page: str = page
+        self._rows: Dict[str, List[Dict[str, str]]] = {}
+
+    def table_ids(self) -> List[str]:
+        """
+        Returns:
+            - list of str: the id of every table on the page, including the commented out ones
+        """
+        return TABLE_TAG.findall(self.page)
+
+    def _table_markup(self, table_id: str) -> Optional[str]:
+        match = re.search(r'<table\b[^>]*?\bid="{}"'.format(re.escape(table_id)), self.page)
+        if match is None:
+            return None
+        end = self.page.find("</table>", match.start())
+        return self.page[match.start():len(self.page) if end == -1 else end + len("</table>")]
+
+    def rows(self, table_id: str) -> List[Dict[str, str]]:
+        """
+        Reads every body row of a table, parsed the first time it's asked for.
+
+        Parameters:
+            table_id - the table id, e.g. "passing_playoffs"
+        Returns:
+            - list of data-stat -> cell text, one per row, empty if the page has no such table
+        """
+        if table_id not in self._rows:
+            markup = self._table_markup(table_id)
+            with metrics.timer("parse"):
+                self._rows[table_id] = [] if markup is None else _extract_rows(_TableRowExtractor(table_id), markup)
+        return self._rows[table_id]
+
+    def table(self, table_id: str) -> Table:
+        """
+        Reads a table's season rows keyed by year, like parse_table but for any table on the page.
+
+        When a season has several rows (one per team after a trade), the first one, the combined row, is kept.
+
+        Parameters:
+            table_id - the table id, e.g. "passing_playoffs"
+        Returns:
+            - dict: year -> data-stat -> cell text
+        """
+        table = {}
+        for row in self.rows(table_id):
+            match = re.match(r"\d{4}", row.get("year_id", "").strip())
+            if match is not None:
+                table.setdefault(match.group(0), row)
+        return table
+
+
+PARSERS: Dict[str, Callable[[str, str], Table]] = {
+    "bs4": parse_table_bs4,
+    "lxml": parse_table_lxml,
+    "stream": parse_table_stream
+}
+
+
+def _default_parser() -> str:
+    # looked up rather than imported, lxml is only loaded once a page is parsed with it
+    return "lxml" if importlib.util.find_spec("lxml") is not None else "stream"
+
+
+_parser = _default_parser()
+
+
+def get_parser() -> str:
+    return _parser
+
+
+def set_parser(name: str) -> None:
+    """
+    Sets the parser backend used by every position class.
+
+    Parameters:
+        name - one of bs4, lxml or stream
+    Returns:
+        - None
+    """
+    global _parser
+    if name not in PARSERS:
+        raise ValueError("Unknown parser {}, expected one of {}".format(name, ", ".join(PARSERS)))
+    _parser = name
+
+
+def parse_table(page: str, table_id: str, parser: Optional[str] = None) -> Table:
+    """
+    Reads every season row of a stats table, e.g. all the "passing.<year>" rows.
+
+    Parameters:
+        page - the player page html
+        table_id - the id prefix of the season rows
+        parser - the backend to use, defaults to the one set with set_parser
+    Returns:
+        - dict: year -> data-stat -> cell text
+    """
+    with metrics.timer("parse"):
+        return PARSERS[parser or _parser](page, table_id)
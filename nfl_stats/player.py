@@ -1,833 +1,515 @@
-import os
-import yaml
-from pathlib import Path
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple
 
-from bs4 import BeautifulSoup
-import requests
+from nfl_stats import directory, fetch, memo, metrics, parsers, results, schema, stats_cache
+from nfl_stats.page_cache import current_season
+from nfl_stats.schema import Stat
 
-class QB:
-    def __init__(self, name:str):
+logger = logging.getLogger(__name__)
+
+
+def get_player_url(name: str, player_id: Optional[str] = None) -> str:
+    """
+    Builds the pro-football-reference player page url, from the player id when it's known
+    and otherwise guessed from the player name.
+
+    Parameters:
+        name - the player name, e.g. "Tom Brady"
+        player_id - the pro-football-reference player id, e.g. "BradTo00"
+    Returns:
+        - str: the player page url
+    """
+    if player_id:
+        return "{}/players/{}/{}.htm".format(fetch.BASE_URL, player_id[0], player_id)
+
+    first_name, last_name = directory.split_name(name)
+    return "{}/players/{}/{}{}00.htm".format(fetch.BASE_URL,
+                                             last_name[0].upper(),
+                                             last_name[0:4],
+                                             first_name[0:2])
+
+
+class Player:
+    __slots__ = ("name", "year", "player_id", "_page", "_looked_up_in")
+
+    POSITION: str = ""
+    TABLE_ID: str = ""
+    STATS: Tuple[Stat, ...] = ()
+
+    def __init__(self, name: str, player_id: Optional[str] = None):
         self.name: str = name
-        self.number: str = ""
-        self.position: str = "QB"
-        self.team: str = ""
-        self.games_played: int = 0
-        self.games_started: int = 0
-        self.passes_completed: int = 0
-        self.passes_attempted: int = 0
-        self.pass_completion_percentage: float = 0.0
-        self.yards_gained_by_passing: int = 0
-        self.passing_touchdowns: int = 0
-        self.passing_touchdown_percentage: float = 0.0
-        self.interceptions: int = 0
-        self.interception_percentage: float = 0.0
-        self.longest_completed_pass: int = 0
-        self.yards_gained_per_pass_attempt: float = 0.0
-        self.yards_gained_per_pass_completion: float = 0.0
-        self.qb_rating: float = 0.0
-        self.times_sacked: int = 0
-        self.yards_lost_due_to_sacks: int = 0
-        self.approximate_value: int = 0
-        self.year = ""
-
-    def set_stats(self, year:str ) -> None:
+        self.year: str = ""
+        self.player_id: Optional[str] = player_id
+        self._page: Optional[parsers.PlayerPage] = None
+        # the index the player id was last looked up in, so a name that isn't in it is only looked up once
+        self._looked_up_in: Optional[directory.PlayerIndex] = None
+        for stat in self.STATS:
+            setattr(self, stat.attribute, stat.default)
+        self.position = self.POSITION
+
+    def set_stats(self, year: str, get_page: Optional[Callable[[str, str], str]] = None) -> results.LoadResult:
         """
         Gets the statistics from the scraped site and sets appriopiate variables.
 
-        TODO: 
-            - have better exception handling for requests/bs4
+        A season the player didn't play, or a player page that doesn't exist, is remembered in the stats
+        cache for results.MISS_TTL so it isn't fetched again on every call, or only as long as a cached page
+        when the season was still being played.
 
         Parameters:
             year - the year to get statistics for
+            get_page - downloads the player page from (url, season) on a miss instead of fetch, e.g. on an event loop
         Returns:
-            None
+            - LoadResult: found, no_such_season, player_not_found, rate_limited, parse_error or error,
+              the player's stats and year are only set when it's found
         """
-        first_letter_lastname = list(self.name.split()[1])[0].upper() # lol so convoluted
-        first_four_lastname = self.name.split()[1][0:4]
-        first_two_firstname = self.name.split()[0][0:2]
+        previous_year = self.year
         self.year = year
-        
-        if self.is_player_stats_cached():
-            print(">> Player stats cached for year, setting from cache")
-            self.set_player_stats_from_cache()
-            return
-        
-        print(">> Retrieving data from pro-football-reference.com")
-
-        request_url = "https://www.pro-football-reference.com/players/{}/{}{}00.htm".format(first_letter_lastname,
-                                                                                            first_four_lastname,
-                                                                                            first_two_firstname)
+
         try:
-            response = requests.get(request_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            stats_for_year = soup.find("tr", {"id": "passing.{}".format(year)})
-
-            self.team  = stats_for_year.find("td", {"data-stat": "team"}).find('a').text
-            self.position = stats_for_year.find("td", {"data-stat": "pos"}).text
-            self.number = stats_for_year.find("td", {"data-stat": "uniform_number"}).text 
-            self.games_played = int(stats_for_year.find("td", {"data-stat": "g"}).text)
-            self.games_started = int(stats_for_year.find("td", {"data-stat": "gs"}).text)
-            self.passes_completed = int(stats_for_year.find("td", {"data-stat": "pass_cmp"}).text)
-            self.passes_attempted = int(stats_for_year.find("td", {"data-stat": "pass_att"}).text)
-            self.pass_completion_percentage = float(stats_for_year.find("td", {"data-stat": "pass_cmp_perc"}).text)
-            self.yards_gained_by_passing = int(stats_for_year.find("td", {"data-stat": "pass_yds"}).text)
-            self.passing_touchdowns = int(stats_for_year.find("td", {"data-stat": "pass_td"}).text)
-            self.passing_touchdown_percentage = float(stats_for_year.find("td", {"data-stat": "pass_td_perc"}).text) 
-            self.interceptions = int(stats_for_year.find("td", {"data-stat": "pass_int"}).text)
-            self.interception_percentage = float(stats_for_year.find("td", {"data-stat": "pass_int_perc"}).text)
-            self.longest_completed_pass = int(stats_for_year.find("td", {"data-stat": "pass_long"}).text)
-            self.yards_gained_per_pass_attempt = float(stats_for_year.find("td", {"data-stat": "pass_yds_per_att"}).text)
-            self.yards_gained_per_pass_completion = float(stats_for_year.find("td", {"data-stat": "pass_yds_per_cmp"}).text)
-            self.qb_rating = float(stats_for_year.find("td", {"data-stat": "qbr"}).text)
-            self.times_sacked = int(stats_for_year.find("td", {"data-stat": "pass_sacked"}).text)
-            self.yards_lost_due_to_sacks = int(stats_for_year.find("td", {"data-stat": "pass_sacked_yds"}).text)
-            self.approximate_value = int(stats_for_year.find("td", {"data-stat": "av"}).text)
-
-            # save it to its own file for later retrieval
-            self.save_stats_to_yaml()
+            # hot player-seasons come straight from the in-process memo, concurrent misses share one load
+            with metrics.timer("load"):
+                data = memo.get_memo().get_or_load(self.get_memo_key(), lambda: self.load_cache_record(get_page))
         except Exception as e:
-            print(e)
+            status = results.classify(e)
+            metrics.increment("load." + status)
+            if status in results.MISSES:
+                logger.info("%s", e)
+            else:
+                logger.warning("Could not load the %s season of %s", year, self.name, exc_info=True)
+            # the stats left are still the previous season's
+            self.year = previous_year
+            return results.LoadResult(status, self, e)
+
+        self.set_stats_from_dict(data)
+        metrics.increment("load." + results.FOUND)
+        return results.LoadResult(results.FOUND, self)
+
+    def load_cache_record(self, get_page: Optional[Callable[[str, str], str]] = None) -> Dict[str, object]:
+        """
+        Reads the season's record from the stats cache, scraping and caching it on a miss.
 
-    def print_stats(self) -> None:
-        print("Year: {}".format(self.year))
-        print("Name: {}".format(self.name))
-        print("Number: {}".format(self.number))
-        print("Position : {}".format(self.position))
-        print("Team: {}".format(self.team))
-        print("Games played: {}".format(self.games_played))
-        print("Games started: {}".format(self.games_started))
-        print("Passes completed: {}".format(self.passes_completed))
-        print("Passes attempted: {}".format(self.passes_attempted))
-        print("Pass completion %: {}".format(self.pass_completion_percentage))
-        print("Yards gained by passing: {}".format(self.yards_gained_by_passing))
-        print("Passing touchdowns: {}".format(self.passing_touchdowns))
-        print("Passing touchdown percentage: {}".format(self.passing_touchdown_percentage))
-        print("Interceptions: {}".format(self.interceptions))
-        print("Interception percentage: {}".format(self.interception_percentage))
-        print("Longest completed pass: {}".format(self.longest_completed_pass))
-        print("Yards gained per pass attempted: {}".format(self.yards_gained_per_pass_attempt))
-        print("Yards gained per pass completion: {}".format(self.yards_gained_per_pass_completion))
-        print("Rating: {}".format(self.qb_rating))
-        print("Times sacked: {}".format(self.times_sacked))
-        print("Yards lost due to sacks: {}".format(self.yards_lost_due_to_sacks))
-        print("Approximate value: {}".format(self.approximate_value))
-
-    def save_stats_to_yaml(self) -> None:
-        """
-        Saves statistical data to a yaml file
+        Raises NoSuchSeason or PlayerNotFound for a known or newly found miss, and ParseError if the
+        season row can't be read.
 
+        Parameters:
+            get_page - downloads the player page from (url, season) instead of fetch
         Returns:
-            - None
+            - dict: the season's cache record
         """
-        # if the directory for proper organization doesn't exist, make it
-        directory = "./players/QB/{}_{}/".format(self.name.split()[0], self.name.split()[1]) 
-        if not os.path.exists(directory):
-            os.makedirs(directory)        
-
-        data = {
-            "name": self.name,
-            "number": self.number,
-            "position": self.position,
-            "team": self.team,
-            "games_played": self.games_played,
-            "games_started": self.games_started,
-            "passes_completed": self.passes_completed,
-            "passes_attempted": self.passes_attempted,
-            "pass_completion_perc": self.pass_completion_percentage,
-            "yards_gained_by_passing": self.yards_gained_by_passing,
-            "passing_touchdowns": self.passing_touchdowns,
-            "passing_touchdown_perc": self.passing_touchdown_percentage,
-            "interceptions": self.interceptions,
-            "interception_perc": self.interception_percentage,
-            "longest_completed_pass": self.longest_completed_pass,
-            "yards_gained_per_pass_attempt": self.yards_gained_per_pass_attempt,
-            "yards_gained_per_pass_completion": self.yards_gained_per_pass_completion,
-            "qb_rating": self.qb_rating,
-            "times_sacked": self.times_sacked,
-            "yards_lost_due_to_sacks":  self.yards_lost_due_to_sacks,
-            "approximate_value": self.approximate_value
-        }
-
-        with open("{}/{}.yaml".format(directory, self.year), "w") as file:
-            yaml.dump(data, file, default_flow_style=False)
-    
-    def is_player_stats_cached(self) -> bool:
+        with metrics.timer("cache.read"):
+            data = stats_cache.get_cache().get(self.POSITION, self.get_cache_key(), self.year)
+        if data is not None:
+            metrics.increment("cache.hit")
+            logger.debug("%s %s stats cached for year, setting from cache", self.name, self.year)
+            return data
+        metrics.increment("cache.miss")
+
+        miss = stats_cache.get_cache().get(self.POSITION + results.MISS_SUFFIX, self.get_cache_key(), self.year)
+        if miss is not None and time.time() - miss.get("fetched_at", 0) < self.miss_ttl(miss):
+            metrics.increment("cache.known_miss")
+            raise results.ERRORS[miss["status"]](miss["message"])
+
+        logger.info("Retrieving %s %s from pro-football-reference.com", self.name, self.year)
+
+        try:
+            url = get_player_url(self.name, self.get_player_id())
+            if get_page is None and fetch.get_fetcher().streaming:
+                table = fetch.get_table(url, self.TABLE_ID, self.year)
+            else:
+                page = (get_page or fetch.get_page)(url, self.year)
+                # kept so secondary tables asked for next don't read the page again
+                self._page = parsers.PlayerPage(page)
+                table = parsers.parse_table(page, self.TABLE_ID)
+        except Exception as e:
+            if results.classify(e) != results.PLAYER_NOT_FOUND:
+                raise
+            raise self.save_miss(results.PlayerNotFound("No player page for {}".format(self.name))) from e
+
+        if not table:
+            # the page has no table for the position, e.g. a guessed url that landed on another player
+            raise self.save_miss(results.PlayerNotFound("No {} stats for {}".format(self.POSITION, self.name)))
+        if self.year not in table:
+            raise self.save_miss(results.NoSuchSeason("No {} season for {}".format(self.year, self.name)))
+
+        # parsed into a new player so a bad row can't leave this one half set
+        player = type(self)(self.name, self.player_id)
+        player.year = self.year
+        try:
+            player.set_stats_from_row(table[self.year])
+        except (ValueError, KeyError) as e:
+            raise results.ParseError("Could not read the {} season of {}: {!r}".format(self.year, self.name, e)) from e
+
+        record = player.get_cache_record()
+        with metrics.timer("cache.write"):
+            stats_cache.get_cache().put(self.POSITION, self.get_cache_key(), self.year, record)
+        return record
+
+    def miss_ttl(self, miss: Dict[str, object]) -> float:
+        """
+        How long a cached miss for the season is trusted.
+
+        Parameters:
+            miss - the miss record
+        Returns:
+            - float: results.MISS_TTL if the season was already finished when the miss was found, otherwise
+              the page cache ttl
         """
-        Checks if the player + year yaml file exists
+        if int(self.year) < current_season(miss.get("fetched_at", 0)):
+            return results.MISS_TTL
+        page_cache = fetch.get_fetcher().page_cache
+        return results.CURRENT_MISS_TTL if page_cache is None else page_cache.ttl
 
+    def save_miss(self, error: results.LoadError) -> results.LoadError:
+        """
+        Caches a miss for the season so it isn't fetched again until its miss_ttl has passed.
+
+        Parameters:
+            error - the NoSuchSeason or PlayerNotFound error
         Returns:
-            - bool: True if player file exists, False otherwise
+            - LoadError: the same error, to be raised
         """
-        player_file = Path("./players/QB/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year))
-        return player_file.is_file()
-    
-    def set_player_stats_from_cache(self) -> None:
+        stats_cache.get_cache().put(self.POSITION + results.MISS_SUFFIX, self.get_cache_key(), self.year,
+                                    {"status": error.status, "message": str(error), "fetched_at": time.time()})
+        return error
+
+    def set_stats_from_row(self, stats_for_year: Dict[str, str], strict: bool = True) -> None:
         """
-        Reads the corresponding yaml file and set player stats.
+        Sets the statistics from a single season row of the position's stats table.
 
+        Parameters:
+            stats_for_year - data-stat -> cell text for the season
+            strict - if False, stats missing from the row are set to None, like blank cells, instead of raising
         Returns:
             - None
         """
-        player_file = "./players/QB/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year)
+        try:
+            with metrics.timer("rows"):
+                for stat in self.STATS:
+                    value = stats_for_year[stat.data_stat] if strict else stats_for_year.get(stat.data_stat, "")
+                    # a blank cell means the stat wasn't recorded that season, not a zero
+                    setattr(self, stat.attribute, stat.convert(value) if value != "" else None)
+        except Exception:
+            metrics.increment("parse.failures")
+            raise
+
+    def load_career(self, raise_errors: bool = False,
+                    get_page: Optional[Callable[[str], str]] = None) -> Dict[str, "Player"]:
+        """
+        Scrapes every season on the player page with a single request and caches them all.
 
-        with open(player_file, "r") as file:
+        Parameters:
+            raise_errors - raise when the page can't be loaded instead of logging it and returning no seasons
+            get_page - fetches the player page, fetch.get_page by default
+        Returns:
+            - dict: year -> player with the stats for that season set
+        """
+        logger.info("Retrieving %s career data from pro-football-reference.com", self.name)
+
+        try:
+            url = get_player_url(self.name, self.get_player_id())
+            return self.load_career_from_page((get_page or fetch.get_page)(url))
+        except Exception:
+            metrics.increment("load.failures")
+            if raise_errors:
+                raise
+            logger.exception("Could not load the career of %s", self.name)
+        return {}
+
+    def load_career_from_page(self, page: str) -> Dict[str, "Player"]:
+        """
+        Parses every season on an already downloaded player page and caches them all.
+
+        Parameters:
+            page - the player page html
+        Returns:
+            - dict: year -> player with the stats for that season set
+        """
+        self._page = parsers.PlayerPage(page)
+        career = self.parse_career(page)
+
+        # every season goes into the cache in one bulk write
+        records = {(self.get_cache_key(), year): player.get_cache_record() for year, player in career.items()}
+        with metrics.timer("cache.write"):
+            stats_cache.get_cache().put_many(self.POSITION, records)
+        for (key, year), record in records.items():
+            memo.get_memo().put((self.POSITION, key, year), record)
+        return career
+
+    def parse_career(self, page: str) -> Dict[str, "Player"]:
+        """
+        Parses every season on a player page without touching any cache, seasons that can't be read are
+        logged and left out.
+
+        Parameters:
+            page - the player page html
+        Returns:
+            - dict: year -> player with the stats for that season set
+        """
+        career = {}
+        for year, stats_for_year in parsers.parse_table(page, self.TABLE_ID).items():
+            player = type(self)(self.name, self.player_id)
+            player.year = year
             try:
-                yaml_data = yaml.safe_load(file)
-                self.name = yaml_data["name"]
-                self.number = yaml_data["number"]
-                self.team = yaml_data["team"] 
-                self.games_played = yaml_data["games_played"]
-                self.games_started = yaml_data["games_started"]
-                self.passes_completed = yaml_data["passes_completed"]
-                self.passes_attempted = yaml_data["passes_attempted"]
-                self.pass_completion_percentage = yaml_data["pass_completion_perc"]
-                self.yards_gained_by_passing = yaml_data["yards_gained_by_passing"]
-                self.passing_touchdowns = yaml_data["passing_touchdowns"]
-                self.passing_touchdown_percentage = yaml_data["passing_touchdown_perc"]
-                self.interceptions = yaml_data["interceptions"]
-                self.interception_percentage = yaml_data["interception_perc"]
-                self.longest_completed_pass = yaml_data["longest_completed_pass"]
-                self.yards_gained_per_pass_attempt = yaml_data["yards_gained_per_pass_attempt"]
-                self.yards_gained_per_pass_completion = yaml_data["yards_gained_per_pass_completion"]
-                self.qb_rating = yaml_data["qb_rating"]
-                self.times_sacked = yaml_data["times_sacked"]
-                self.yards_lost_due_to_sacks = yaml_data["yards_lost_due_to_sacks"]
-                self.approximate_value = yaml_data["approximate_value"]
-            except yaml.YAMLError as e:
-                print(e)
-
-
-class WR:
-    def __init__(self, name: str):
-        self.name: str = name
-        self.number: int = 0
-        self.team: str = ""
-        self.position: str = "WR"
-        self.games_played: int = 0
-        self.games_started: int = 0
-        self.pass_targets: int = 0
-        self.receptions: int = 0
-        self.receiving_yards: int = 0
-        self.yards_per_reception: float = 0.0
-        self.receiving_touchdowns: int = 0
-        self.longest_reception: int = 0
-        self.receptions_per_game: float = 0.0
-        self.receiving_yards_per_game: float = 0.0
-        self.rush_attempts: int = 0
-        self.rushing_yards: int = 0
-        self.rushing_touchdowns: int = 0
-        self.longest_rushing_attempt: int = 0
-        self.rushing_yards_per_attempt: float = 0.0
-        self.rushing_yards_per_game: float = 0.0
-        self.rushing_attempts_per_game: float = 0.0
-        self.touches: int = 0
-        self.approximate_value: int = 0
-        self.fumbles: int = 0
-
-    def set_stats(self, year: str) -> None:
-        """
-        Given the year, scrape pro-football-reference to get stats
+                player.set_stats_from_row(stats_for_year)
+                career[year] = player
+            except Exception:
+                logger.exception("Could not read the %s season of %s", year, self.name)
+        return career
+
+    def get_page(self) -> parsers.PlayerPage:
+        """
+        The player page, read once per player and kept, with its tables parsed as they're asked for.
+
+        Returns:
+            - PlayerPage
+        """
+        if self._page is None:
+            self._page = parsers.PlayerPage(fetch.get_page(get_player_url(self.name, self.get_player_id())))
+        return self._page
+
+    def get_table(self, table_id: str) -> parsers.Table:
+        """
+        Reads any table of the player page by season, including the ones shipped inside HTML comments,
+        e.g. QB("Tom Brady").get_table("passing_playoffs")["2017"]["pass_yds"].
 
         Parameters:
-            year - the year to get statistics for
+            table_id - the table id, get_page().table_ids() lists them
         Returns:
-            - None
+            - dict: year -> data-stat -> cell text
         """
-        first_letter_lastname = list(self.name.split()[1])[0].upper() # lol so convoluted
-        first_four_lastname = self.name.split()[1][0:4]
-        first_two_firstname = self.name.split()[0][0:2]
-        self.year = year
+        return self.get_page().table(table_id)
+
+    def get_player_id(self) -> Optional[str]:
+        """
+        Resolves the pro-football-reference player id from the player index, if one has been built.
+        Only an exact name matches, a misspelled name could just as well be another player's.
 
-        if self.is_player_stats_cached():
-            print(">> Player stats cached for year, setting from cache")
-            self.set_stats_from_cache()
-            return
+        Returns:
+            - str: the player id, None if there's no index or the name isn't in it
+        """
+        if self.player_id is None:
+            index = directory.get_index()
+            if index is not None and index is not self._looked_up_in:
+                self._looked_up_in = index
+                entry = index.lookup(self.name, self.POSITION, self.year)
+                if entry is not None:
+                    self.player_id = entry.player_id
+        return self.player_id
+
+    def get_cache_key(self) -> str:
+        """
+        Returns:
+            - str: the player id when it's known, the player name otherwise
+        """
+        return self.get_player_id() or self.name
 
-        print(">> Retrieving data from pro-football-reference.com")
+    def get_memo_key(self) -> Tuple[str, str, str]:
+        return self.POSITION, self.get_cache_key(), str(self.year)
 
-        request_url = "https://www.pro-football-reference.com/players/{}/{}{}00.htm".format(first_letter_lastname,
-                                                                                            first_four_lastname,
-                                                                                            first_two_firstname)
-        
-        try:
-            response = requests.get(request_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            stats_for_year = soup.find("tr", {"id": "receiving_and_rushing.{}".format(year)})
-            self.number = int(stats_for_year.find("td", {"data-stat": "uniform_number"}).text)
-            self.team = stats_for_year.find("td", {"data-stat": "team"}).find('a').text 
-            self.position = stats_for_year.find("td", {"data-stat":"pos"}).text
-            self.games_played = int(stats_for_year.find("td", {"data-stat":"g"}).text)
-            self.games_started = int(stats_for_year.find("td", {"data-stat":"gs"}).text)
-            self.pass_targets = int(stats_for_year.find("td", {"data-stat":"targets"}).text)
-            self.receptions = int(stats_for_year.find("td", {"data-stat":"rec"}).text)
-            self.receiving_yards = int(stats_for_year.find("td", {"data-stat":"rec_yds"}).text)
-            self.yards_per_reception = float(stats_for_year.find("td", {"data-stat":"rec_yds_per_rec"}).text)
-            self.receiving_touchdowns = int(stats_for_year.find("td", {"data-stat":"rec_td"}).text)
-            self.longest_reception = int(stats_for_year.find("td", {"data-stat":"rec_long"}).text)
-            self.receptions_per_game = float(stats_for_year.find("td", {"data-stat":"rec_per_g"}).text)
-            self.receiving_yards_per_game = float(stats_for_year.find("td", {"data-stat":"rec_yds_per_g"}).text)
-            self.rush_attempts = int(stats_for_year.find("td", {"data-stat":"rush_att"}).text)
-            self.rushing_yards = int(stats_for_year.find("td", {"data-stat":"rush_yds"}).text)
-            self.rushing_touchdowns = int(stats_for_year.find("td", {"data-stat":"rush_td"}).text)
-            self.longest_rushing_attempt = int(stats_for_year.find("td", {"data-stat":"rush_long"}).text)
-            self.rushing_yards_per_attempt = float(stats_for_year.find("td", {"data-stat":"rush_yds_per_att"}).text)
-            self.rushing_yards_per_game = float(stats_for_year.find("td", {"data-stat":"rush_yds_per_g"}).text)
-            self.rushing_attempts_per_game = float(stats_for_year.find("td", {"data-stat":"rush_att_per_g"}).text)
-            self.touches = int(stats_for_year.find("td", {"data-stat":"touches"}).text)
-            self.fumbles = int(stats_for_year.find("td", {"data-stat":"fumbles"}).text)
-            self.approximate_value = int(stats_for_year.find("td", {"data-stat":"av"}).text)
-            self.save_stats_to_yaml()
-        except Exception as e:
-            print(e)
-    
-    def save_stats_to_yaml(self) -> None:
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Returns:
+            - dict: attribute -> value of every stat, plus the player name and id
         """
-        Saves data scraped to a yaml file for caching.
+        data = {"name": self.name, "player_id": self.player_id}
+        for stat in self.STATS:
+            data[stat.attribute] = getattr(self, stat.attribute)
+        return data
+
+    def get_cache_record(self) -> Dict[str, object]:
+        """
+        The stats as they're written to the stats cache, with when they were fetched and a hash of
+        their values so a refresh can tell if they changed.
 
+        Returns:
+            - dict: get_stats plus fetched_at and content_hash
+        """
+        record = self.get_stats()
+        record["content_hash"] = stats_cache.checksum(record)
+        record["fetched_at"] = time.time()
+        return record
+
+    def set_stats_from_dict(self, data: Dict[str, object]) -> None:
+        """
+        Sets the statistics from a dict written by get_stats, older key names included.
+
+        Parameters:
+            data - attribute -> value
         Returns:
             - None
         """
-        # if the directory for proper organization doesn't exist, make it
-        directory = "./players/WR/{}_{}/".format(self.name.split()[0], self.name.split()[1]) 
-        if not os.path.exists(directory):
-            os.makedirs(directory)     
-
-        data = {
-            "name": self.name,
-            "number": self.number,
-            "team": self.team,
-            "position": self.position,
-            "games_played": self.games_played,
-            "games_started": self.games_started,
-            "pass_targets": self.pass_targets,
-            "receptions": self.receptions,
-            "receiving_yards": self.receiving_yards,
-            "yards_per_reception": self.yards_per_reception,
-            "receiving_touchdowns": self.receiving_touchdowns,
-            "longest_reception": self.longest_reception,
-            "receptions_per_game": self.receptions_per_game,
-            "receiving_yards_per_game": self.receiving_yards_per_game,
-            "rush_attempts": self.rush_attempts,
-            "rushing_yards": self.rushing_yards,
-            "rushing_touchdowns": self.rushing_touchdowns,
-            "longest_rushing_attempt": self.longest_rushing_attempt,
-            "rushing_yards_per_attempt": self.rushing_yards_per_attempt,
-            "rushing_yards_per_game": self.rushing_yards_per_game,
-            "rushing_attempts_per_game": self.rushing_attempts_per_game,
-            "touches": self.touches,
-            "approximate_value": self.approximate_value,
-            "fumbles": self.fumbles
-        } 
-
-        with open("{}/{}.yaml".format(directory, self.year), "w") as file:
-            yaml.dump(data, file, default_flow_style=False)
-        
-    def set_stats_from_cache(self) -> None:
-        player_file = "./players/WR/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year)
-
-        with open(player_file, "r") as file:
-            try:
-                yaml_data = yaml.safe_load(file)
-                self.name = yaml_data["name"]
-                self.number = yaml_data["number"]
-                self.team = yaml_data["team"]
-                self.position = yaml_data["position"]
-                self.games_played = yaml_data["games_played"]
-                self.games_started = yaml_data["games_started"]
-                self.pass_targets = yaml_data["pass_targets"]
-                self.receptions = yaml_data["receptions"]
-                self.receiving_yards = yaml_data["receiving_yards"]
-                self.yards_per_reception = yaml_data["yards_per_reception"]
-                self.receiving_touchdowns = yaml_data["receiving_touchdowns"]
-                self.longest_reception = yaml_data["longest_reception"]
-                self.receptions_per_game = yaml_data["receptions_per_game"]
-                self.receiving_yards_per_game = yaml_data["receiving_yards_per_game"]
-                self.rush_attempts = yaml_data["rush_attempts"]
-                self.rushing_yards = yaml_data["rushing_yards"]
-                self.rushing_touchdowns = yaml_data["rushing_touchdowns"]
-                self.longest_rushing_attempt = yaml_data["longest_rushing_attempt"]
-                self.rushing_yards_per_attempt = yaml_data["rushing_yards_per_attempt"]
-                self.rushing_yards_per_game = yaml_data["rushing_yards_per_game"]
-                self.rushing_attempts_per_game = yaml_data["rushing_attempts_per_game"]
-                self.touches = yaml_data["touches"]
-                self.approximate_value = yaml_data["approximate_value"]
-                self.fumbles = yaml_data["fumbles"]
-            except yaml.YAMLError as e:
-                print(e)
+        self.name = data.get("name", self.name)
+        self.player_id = data.get("player_id") or self.player_id
+        for stat in self.STATS:
+            for key in (stat.attribute,) + stat.aliases:
+                if key in data:
+                    setattr(self, stat.attribute, data[key])
+                    break
 
     def print_stats(self) -> None:
-        print(self.name)
-        print(self.number)
-        print(self.team)
-        print(self.position)
-        print(self.games_played)
-        print(self.games_started)
-        print(self.pass_targets)
-        print(self.receptions)
-        print(self.receiving_yards)
-        print(self.yards_per_reception)
-        print(self.receiving_touchdowns)
-        print(self.longest_reception)
-        print(self.receptions_per_game)
-        print(self.receiving_yards_per_game)
-        print(self.rush_attempts)
-        print(self.rushing_yards)
-        print(self.rushing_touchdowns)
-        print(self.longest_rushing_attempt)
-        print(self.rushing_yards_per_attempt)
-        print(self.rushing_yards_per_game)
-        print(self.rushing_attempts_per_game)
-        print(self.touches)
-        print(self.approximate_value)
-        print(self.fumbles)
+        print("Year: {}".format(self.year))
+        print("Name: {}".format(self.name))
+        for stat in self.STATS:
+            print("{}: {}".format(stat.label, getattr(self, stat.attribute)))
+
+    def save_stats(self) -> None:
+        """
+        Saves statistical data to the stats cache
+
+        Returns:
+            - None
+        """
+        record = self.get_cache_record()
+        stats_cache.get_cache().put(self.POSITION, self.get_cache_key(), self.year, record)
+        memo.get_memo().put(self.get_memo_key(), record)
 
     def is_player_stats_cached(self) -> bool:
-        player_file = Path("./players/WR/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year))
-        return player_file.is_file()
+        """
+        Checks if the player + year is in the stats cache
 
+        Returns:
+            - bool: True if it's cached, False otherwise
+        """
+        return stats_cache.get_cache().exists(self.POSITION, self.get_cache_key(), self.year)
 
-class RB:
-    def __init__(self, name: str):
-        self.name: str = name
-        self.number: int = 0
-        self.team: str = ""
-        self.position: str = "RB"
-        self.games_played: int = 0
-        self.games_started: int = 0
-        self.rushing_attempts: int = 0
-        self.rushing_yards: int = 0
-        self.rushing_touchdowns: int = 0
-        self.longest_rushing_attempt: int = 0
-        self.rushing_yards_per_attempt: float = 0.0
-        self.rushing_yards_per_game: float = 0.0
-        self.rushing_attempts_per_game: float = 0.0
-        self.pass_targets: int = 0
-        self.receptions: int = 0
-        self.receiving_yards: int = 0
-        self.receiving_yards_per_reception: float = 0.0
-        self.receiving_touchdowns: int = 0
-        self.longest_reception: int = 0
-        self.receptions_per_game: float = 0.0
-        self.receiving_yards_per_game: float = 0.0
-        self.approximate_value: int = 0
-        self.fumbles: int = 0
-
-    def set_stats(self, year: str) -> None:
-        """
-        Given the year, scrape pro-football-reference to get stats
+    def set_stats_from_cache(self) -> bool:
+        """
+        Reads the player + year from the stats cache and set player stats.
+
+        Returns:
+            - bool: True if the stats were set, False if the cached stats were missing or corrupt
+        """
+        data = stats_cache.get_cache().get(self.POSITION, self.get_cache_key(), self.year)
+        if data is None:
+            return False
+        self.set_stats_from_dict(data)
+        return True
+
+    def refresh(self, year: str, max_age: float) -> bool:
+        """
+        Re-fetches a cached season if it can still change and was fetched more than max_age ago.
+
+        Seasons that were already finished when they were cached are never re-fetched. The player page itself is re-validated with a
+        conditional request, so an unchanged page costs a 304. A season no longer on the page is cached as a miss,
+        replacing its stale stats, and raises NoSuchSeason.
+
+        Parameters:
+            year - the season to refresh
+            max_age - how old, in seconds, a current season entry can get before it's re-fetched
+        Returns:
+            - bool: True if the season's stats changed (or weren't cached before)
+        """
+        self.year = str(year)
+        with metrics.timer("cache.read"):
+            cached = stats_cache.get_cache().get(self.POSITION, self.get_cache_key(), self.year)
+        if cached is not None:
+            self.set_stats_from_dict(cached)
+            fetched_at = cached.get("fetched_at", 0)
+            if int(self.year) < current_season(fetched_at) or time.time() - fetched_at < max_age:
+                return False
+
+        page = fetch.get_page(get_player_url(self.name, self.get_player_id()), self.year, max_age)
+        stats_for_year = parsers.parse_table(page, self.TABLE_ID).get(self.year)
+        if stats_for_year is None:
+            # the season was taken off the page, so the cached stats are stale
+            if cached is not None:
+                with metrics.timer("cache.write"):
+                    stats_cache.get_cache().delete(self.POSITION, self.get_cache_key(), self.year)
+                memo.get_memo().invalidate(self.get_memo_key())
+            raise self.save_miss(results.NoSuchSeason("No {} season for {}".format(self.year, self.name)))
+
+        self.set_stats_from_row(stats_for_year)
+        record = self.get_cache_record()
+        with metrics.timer("cache.write"):
+            stats_cache.get_cache().put(self.POSITION, self.get_cache_key(), self.year, record)
+        memo.get_memo().put(self.get_memo_key(), record)
+        return cached is None or cached.get("content_hash") != record["content_hash"]
+
+    @classmethod
+    def load_cached_seasons(cls, name: str, years) -> Dict[str, "Player"]:
+        """
+        Reads many cached seasons of a player with a single bulk cache read.
+
+        Parameters:
+            name - the player name
+            years - the years to read
+        Returns:
+            - dict: year -> player, for the years that were cached
+        """
+        key = cls(name).get_cache_key()
+        records = stats_cache.get_cache().get_many(cls.POSITION, [(key, str(year)) for year in years])
+        seasons = {}
+        for (_, year), data in records.items():
+            player = cls(name)
+            player.year = year
+            player.set_stats_from_dict(data)
+            seasons[year] = player
+        return seasons
+
+    @classmethod
+    async def aload(cls, name: str, year: str) -> results.LoadResult:
+        """
+        Loads one season without blocking the event loop, e.g. await QB.aload("Andy Dalton", "2017").
 
         Parameters:
+            name - the player name
             year - the year to get statistics for
         Returns:
-            - None
+            - LoadResult: the same as set_stats
         """
-        first_letter_lastname = list(self.name.split()[1])[0].upper() # lol so convoluted
-        first_four_lastname = self.name.split()[1][0:4]
-        first_two_firstname = self.name.split()[0][0:2]
-        self.year = year
+        from nfl_stats import aio
+        return await aio.load(cls, name, year)
 
-        if self.is_player_stats_cached():
-            print(">> Player stats cached for year, setting from cache")
-            self.set_stats_from_cache()
-            return
+    @classmethod
+    async def aload_career(cls, name: str) -> Dict[str, "Player"]:
+        from nfl_stats import aio
+        return await aio.load_career(cls, name)
 
-        print(">> Retrieving data from pro-football-reference.com")
+    # names the position classes used before they shared this base class
+    save_stats_to_yaml = save_stats
+    set_player_stats_from_cache = set_stats_from_cache
 
-        request_url = "https://www.pro-football-reference.com/players/{}/{}{}00.htm".format(first_letter_lastname,
-                                                                                            first_four_lastname,
-                                                                                            first_two_firstname)
-        
-        try:
-            response = requests.get(request_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            stats_for_year = soup.find("tr", {"id": "rushing_and_receiving.{}".format(year)})
-            self.number = int(stats_for_year.find("td", {"data-stat": "uniform_number"}).text)
-            self.team = stats_for_year.find("td", {"data-stat": "team"}).find('a').text 
-            self.games_played = int(stats_for_year.find("td", {"data-stat": "g"}).text)
-            self.games_started = int(stats_for_year.find("td", {"data-stat": "gs"}).text)
-            self.rushing_attempts = int(stats_for_year.find("td", {"data-stat": "rush_att"}).text)
-            self.rushing_yards = int(stats_for_year.find("td", {"data-stat": "rush_yds"}).text)
-            self.rushing_touchdowns = int(stats_for_year.find("td", {"data-stat": "rush_td"}).text)
-            self.longest_rushing_attempt = int(stats_for_year.find("td", {"data-stat": "rush_long"}).text)
-            self.rushing_yards_per_attempt = float(stats_for_year.find("td", {"data-stat": "rush_yds_per_att"}).text)
-            self.rushing_yards_per_game = float(stats_for_year.find("td", {"data-stat": "rush_yds_per_g"}).text)
-            self.rushing_attempts_per_game = float(stats_for_year.find("td", {"data-stat": "rush_att_per_g"}).text)
-            self.pass_targets = int(stats_for_year.find("td", {"data-stat": "targets"}).text)
-            self.receptions = int(stats_for_year.find("td", {"data-stat": "rec"}).text)
-            self.receiving_yards = int(stats_for_year.find("td", {"data-stat": "rec_yds"}).text)
-            self.receiving_yards_per_reception = float(stats_for_year.find("td", {"data-stat": "rec_yds_per_rec"}).text)
-            self.receiving_touchdowns = int(stats_for_year.find("td", {"data-stat": "rec_td"}).text)
-            self.longest_reception = int(stats_for_year.find("td", {"data-stat": "rec_long"}).text)
-            self.receptions_per_game = float(stats_for_year.find("td", {"data-stat": "rec_per_g"}).text)
-            self.receiving_yards_per_game = float(stats_for_year.find("td", {"data-stat": "rec_yds_per_g"}).text)
-            self.approximate_value = int(stats_for_year.find("td", {"data-stat": "av"}).text)
-            self.fumbles = int(stats_for_year.find("td", {"data-stat": "fumbles"}).text)
-            self.save_stats()
-        except Exception as e:
-            print(e)
-    
-    def save_stats(self) -> None:
-        directory = "./players/RB/{}_{}/".format(self.name.split()[0], self.name.split()[1]) 
-        if not os.path.exists(directory):
-            os.makedirs(directory)    
-
-        data = {
-            "name": self.name,
-            "number": self.number,
-            "team": self.team,
-            "games_played": self.games_played,
-            "games_started": self.games_started,
-            "rushing_attempts": self.rushing_attempts,
-            "rushing_yards": self.rushing_yards,
-            "rushing_touchdowns": self.rushing_touchdowns,
-            "longest_rushing_attempt": self.longest_rushing_attempt,
-            "rushing_yards_per_attempt": self.rushing_yards_per_attempt,
-            "rushing_yards_per_game": self.rushing_yards_per_game,
-            "rushing_attempts_per_game": self.rushing_attempts_per_game,
-            "pass_targets": self.pass_targets,
-            "receptions": self.receptions,
-            "receiving_yards": self.receiving_yards,
-            "receiving_yards_per_reception": self.receiving_yards_per_reception,
-            "receiving_touchdowns": self.receiving_touchdowns,
-            "longest_reception": self.longest_reception,
-            "receptions_per_game": self.receptions_per_game,
-            "receiving_yards_per_game": self.receiving_yards_per_game,
-            "approximate_value": self.approximate_value,
-            "fumbles": self.fumbles
-        }
-        
-        with open("{}/{}.yaml".format(directory, self.year), "w") as file:
-            yaml.dump(data, file, default_flow_style=False)
-    
-    def set_stats_from_cache(self) -> None:
-        player_file = "./players/RB/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year)
-        
-        with open(player_file, "r") as file:
-            try:
-                yaml_data = yaml.safe_load(file)
-                self.number = yaml_data["number"]
-                self.team = yaml_data["team"]
-                self.games_played = yaml_data["games_played"] 
-                self.games_started = yaml_data["games_started"] 
-                self.rushing_attempts = yaml_data["rushing_attempts"] 
-                self.rushing_yards = yaml_data["rushing_yards"] 
-                self.rushing_touchdowns = yaml_data["rushing_touchdowns"] 
-                self.longest_rushing_attempt = yaml_data["longest_rushing_attempt"] 
-                self.rushing_yards_per_attempt = yaml_data["rushing_yards_per_attempt"] 
-                self.rushing_yards_per_game = yaml_data["rushing_yards_per_game"] 
-                self.rushing_attempts_per_game = yaml_data["rushing_attempts_per_game"] 
-                self.pass_targets = yaml_data["pass_targets"] 
-                self.receptions = yaml_data["receptions"] 
-                self.receiving_yards = yaml_data["receiving_yards"] 
-                self.receiving_yards_per_reception = yaml_data["receiving_yards_per_reception"] 
-                self.receiving_touchdowns = yaml_data["receiving_touchdowns"] 
-                self.longest_reception = yaml_data["longest_reception"] 
-                self.receptions_per_game = yaml_data["receptions_per_game"] 
-                self.receiving_yards_per_game = yaml_data["receiving_yards_per_game"] 
-                self.approximate_value = yaml_data["approximate_value"] 
-                self.fumbles = yaml_data["fumbles"] 
-            except yaml.YAMLError as e:
-                print(e)
-    
-    def is_player_stats_cached(self) -> bool:
-        player_file = Path("./players/RB/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year))
-        return player_file.is_file()
-    
-    def print_stats(self) -> None:
-        print("Year: {}".format(self.year))
-        print("Name: {}".format(self.name))
-        print("Number: {}".format(self.number))
-        print("Position : {}".format(self.position))
-        print("Team: {}".format(self.team))
-        print("Games played: {}".format(self.games_played))
-        print("Games started: {}".format(self.games_started))
-        print("Rushing attempts: {}".format(self.rushing_attempts))
-        print("Rushing yards: {}".format(self.rushing_yards))
-        print("Rushing touchdowns: {}".format(self.rushing_touchdowns))
-        print("Longest rushing attempt: {}".format(self.longest_rushing_attempt))
-        print("Rushing yards per attempt: {}".format(self.rushing_yards_per_attempt))
-        print("Rushing yards per game: {}".format(self.rushing_yards_per_game))
-        print("Pass targets: {}".format(self.pass_targets))
-        print("Receptions: {}".format(self.receptions))
-        print("Receiving yards: {}".format(self.receiving_yards))
-        print("Receiving yards per reception: {}".format(self.receiving_yards_per_reception))
-        print("Receiving touchdowns: {}".format(self.receiving_touchdowns))
-        print("Longest reception: {}".format(self.longest_reception))
-        print("Receptions per game: {}".format(self.receptions_per_game))
-        print("Receiving yards per game: {}".format(self.receiving_yards_per_game))
-        print("Approximate value: {}".format(self.approximate_value))
-        print("Fumbles: {}".format(self.fumbles))
-         
-
-class K:
-    def __init__(self, name: str):
-        self.name: str = name
-        self.number: int = 0
-        self.team: str = ""
-        self.position: str = "K"
-        self.games_played: int = 0
-        self.games_started: int = 0
-        self.field_goal_attempts_20_to_29: int = 0
-        self.field_goals_made_20_to_29: int = 0
-        self.field_goal_attempts_30_to_39: int = 0
-        self.fields_goals_made_30_to_39: int = 0
-        self.field_goal_attempts_40_to_49: int = 0
-        self.field_goals_made_40_to_49: int = 0
-        self.field_goal_attempts_50_plus: int = 0
-        self.field_goals_made_50_plus: int = 0
-        self.longest_field_goal_made: int = 0
-        self.total_field_goals_attempted: int = 0
-        self.total_field_goals_made: int = 0
-        self.extra_points_attempted: int = 0
-        self.extra_points_made: int = 0
-        self.approximate_value: int = 0
-    
-    def set_stats(self, year: str) -> None:
-        first_letter_lastname = list(self.name.split()[1])[0].upper() # lol so convoluted
-        first_four_lastname = self.name.split()[1][0:4]
-        first_two_firstname = self.name.split()[0][0:2]
-        self.year = year
 
-        if self.is_player_stats_cached():
-            print(">> Player stats cached for year, setting from cache")
-            self.set_stats_from_cache()
-            return
+class QB(Player):
+    POSITION = "QB"
+    TABLE_ID, STATS = schema.SCHEMAS["QB"]
+    __slots__ = schema.slots(STATS)
 
-        print(">> Retrieving data from pro-football-reference.com")
 
-        request_url = "https://www.pro-football-reference.com/players/{}/{}{}00.htm".format(first_letter_lastname,
-                                                                                            first_four_lastname,
-                                                                                            first_two_firstname)
-        try:
-            response = requests.get(request_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            stats_for_year = soup.find("tr", {"id": "kicking.{}".format(year)})
-            self.number = int(stats_for_year.find("td", {"data-stat": "uniform_number"}).text)
-            self.team = stats_for_year.find("td", {"data-stat": "team"}).find('a').text 
-            self.games_played = int(stats_for_year.find("td", {"data-stat": "g"}).text)
-            self.games_started = int(stats_for_year.find("td", {"data-stat": "gs"}).text)
-            self.field_goal_attempts_20_to_29 = int(stats_for_year.find("td", {"data-stat": "fga2"}).text)
-            self.field_goals_made_20_to_29 = int(stats_for_year.find("td", {"data-stat": "fgm2"}).text)
-            self.field_goal_attempts_30_to_39 = int(stats_for_year.find("td", {"data-stat": "fga3"}).text)
-            self.fields_goals_made_30_to_39 = int(stats_for_year.find("td", {"data-stat": "fgm3"}).text)
-            self.field_goal_attempts_40_to_49 = int(stats_for_year.find("td", {"data-stat": "fga4"}).text)
-            self.field_goals_made_40_to_49 = int(stats_for_year.find("td", {"data-stat": "fgm4"}).text)
-            self.field_goal_attempts_50_plus = int(stats_for_year.find("td", {"data-stat": "fga5"}).text)
-            self.field_goals_made_50_plus = int(stats_for_year.find("td", {"data-stat": "fgm5"}).text)
-            self.longest_field_goal_made = int(stats_for_year.find("td", {"data-stat": "fg_long"}).text)
-            self.total_field_goals_attempted = int(stats_for_year.find("td", {"data-stat": "fga"}).text)
-            self.total_field_goals_made = int(stats_for_year.find("td", {"data-stat": "fgm"}).text)
-            self.extra_points_attempted = int(stats_for_year.find("td", {"data-stat": "xpa"}).text)
-            self.extra_points_made = int(stats_for_year.find("td", {"data-stat": "xpm"}).text)
-            self.approximate_value = int(stats_for_year.find("td", {"data-stat": "av"}).text)
-            self.save_stats()
-        except Exception as e:
-            print(e)
-    
-    def save_stats(self) -> None:
-        directory = "./players/K/{}_{}/".format(self.name.split()[0], self.name.split()[1]) 
-        if not os.path.exists(directory):
-            os.makedirs(directory)    
-
-        data = {
-            "name": self.name,
-            "number": self.number,
-            "team": self.team,
-            "games_played": self.games_played,
-            "games_started": self.games_started,
-            "field_goal_attempts_20_to_29": self.field_goal_attempts_20_to_29,
-            "field_goals_made_20_to_29": self.field_goals_made_20_to_29,
-            "field_goal_attempts_30_to_39": self.field_goal_attempts_30_to_39,
-            "field_goals_made_30_to_39": self.fields_goals_made_30_to_39,
-            "field_goal_attempts_40_to_49": self.field_goal_attempts_40_to_49,
-            "field_goals_made_40_to_49": self.field_goals_made_40_to_49,
-            "field_goal_attempts_50_plus": self.field_goal_attempts_50_plus,
-            "field_goals_made_50_plus": self.field_goals_made_50_plus,
-            "longest_field_goal_made": self.longest_field_goal_made,
-            "total_field_goals_attempted": self.total_field_goals_attempted,
-            "total_field_goals_made": self.total_field_goals_made,
-            "extra_points_attempted": self.extra_points_attempted,
-            "extra_points_made": self.extra_points_made,
-            "approximate_value": self.approximate_value
-        }
-        
-        with open("{}/{}.yaml".format(directory, self.year), "w") as file:
-            yaml.dump(data, file, default_flow_style=False)
-    
-    def set_stats_from_cache(self) -> None:
-        player_file = "./players/K/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year)
-        
-        with open(player_file, "r") as file:
-            try:
-                yaml_data = yaml.safe_load(file)
-                self.number = yaml_data["number"]
-                self.team = yaml_data["team"]
-                self.games_played = yaml_data["games_played"] 
-                self.games_started = yaml_data["games_started"] 
-                self.field_goal_attempts_20_to_29 = yaml_data["field_goal_attempts_20_to_29"]
-                self.field_goals_made_20_to_29 =  yaml_data["field_goals_made_20_to_29"]
-                self.field_goal_attempts_30_to_39 = yaml_data["field_goal_attempts_30_to_39"]
-                self.field_goals_made_30_to_39 = yaml_data["field_goals_made_30_to_39"] 
-                self.field_goal_attempts_40_to_49 = yaml_data["field_goal_attempts_40_to_49"] 
-                self.field_goals_made_40_to_49 = yaml_data["field_goals_made_40_to_49"]
-                self.field_goal_attempts_50_plus = yaml_data["field_goal_attempts_50_plus"] 
-                self.field_goals_made_50_plus = yaml_data["field_goals_made_50_plus"] 
-                self.longest_field_goal_made = yaml_data["longest_field_goal_made"] 
-                self.total_field_goals_attempted = yaml_data["total_field_goals_attempted"] 
-                self.total_field_goals_made = yaml_data["total_field_goals_made"] 
-                self.extra_points_attempted = yaml_data["extra_points_attempted"] 
-                self.extra_points_made = yaml_data["extra_points_made"] 
-                self.approximate_value = yaml_data["approximate_value"] 
-            except yaml.YAMLError as e:
-                print(e)
-    
-    def is_player_stats_cached(self) -> bool:
-        player_file = Path("./players/K/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year))
-        return player_file.is_file()
+class WR(Player):
+    POSITION = "WR"
+    TABLE_ID, STATS = schema.SCHEMAS["WR"]
+    __slots__ = schema.slots(STATS)
 
-    def print_stats(self) -> None:
-        print("Year: {}".format(self.year))
-        print("Name: {}".format(self.name))
-        print("Number: {}".format(self.number))
-        print("Team: {}".format(self.team))
-        print("Position: {}".format(self.position))
-        print("Games played: {}".format(self.games_played))
-        print("Games started: {}".format(self.games_started))
-        print("Field goal attempts (20-29): {}".format(self.field_goal_attempts_20_to_29))
-        print("Field goals made (20-29): {}".format(self.field_goals_made_20_to_29))
-        print("Field goal attempts (30-39): {}".format(self.field_goal_attempts_30_to_39))
-        print("Field goals made (30-39): {}".format(self.fields_goals_made_30_to_39))
-        print("Field goal attempts (40-49): {}".format(self.field_goal_attempts_40_to_49))
-        print("Field goals made (40-49): {}".format(self.field_goals_made_40_to_49))
-        print("Field goal attempts (50+): {}".format(self.field_goal_attempts_50_plus))
-        print("Field goals made (50+): {}".format(self.field_goals_made_50_plus))
-        print("Longest field goal: {} yd".format(self.longest_field_goal_made))
-        print("Total field goals attempted: {}".format(self.total_field_goals_attempted))
-        print("Total field goals mdae: {}".format(self.total_field_goals_made))
-        print("Extra points attempted: {}".format(self.extra_points_attempted))
-        print("Extra points made: {}".format(self.extra_points_made))
-        print("Approximate value: {}".format(self.approximate_value))
-
-class TE:
-    def __init__(self, name: str):
-        self.name: str = name
-        self.number: int = 0
-        self.team: str = ""
-        self.position: str = "TE"
-        self.games_played: int = 0
-        self.games_started: int = 0
-        self.targets: int = 0
-        self.receptions: int = 0
-        self.receiving_yards: int = 0
-        self.receiving_touchdowns: int = 0
-        self.longest_reception: int = 0
-        self.touches: int = 0
-        self.all_purpose_yards: int = 0
-        self.fumbles: int = 0
-        self.approximate_value: int = 0
-
-    def set_stats(self, year:str) -> None:
-        first_letter_lastname = list(self.name.split()[1])[0].upper() # lol so convoluted
-        first_four_lastname = self.name.split()[1][0:4]
-        first_two_firstname = self.name.split()[0][0:2]
-        self.year = year
 
-        if self.is_player_stats_cached():
-            print(">> Player stats cached for year, setting from cache")
-            self.set_stats_from_cache()
-            return
+class RB(Player):
+    POSITION = "RB"
+    TABLE_ID, STATS = schema.SCHEMAS["RB"]
+    __slots__ = schema.slots(STATS)
 
-        print(">> Retrieving data from pro-football-reference.com")
 
-        request_url = "https://www.pro-football-reference.com/players/{}/{}{}00.htm".format(first_letter_lastname,
-                                                                                            first_four_lastname,
-                                                                                            first_two_firstname)
-        try:
-            response = requests.get(request_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            stats_for_year = soup.find("tr", {"id": "receiving_and_rushing.{}".format(year)})
-            self.number = int(stats_for_year.find("td", {"data-stat": "uniform_number"}).text)
-            self.team = stats_for_year.find("td", {"data-stat": "team"}).find('a').text 
-            self.games_played = int(stats_for_year.find("td", {"data-stat": "g"}).text)
-            self.games_started = int(stats_for_year.find("td", {"data-stat": "gs"}).text)
-            self.targets = int(stats_for_year.find("td", {"data-stat": "targets"}).text)
-            self.receptions = int(stats_for_year.find("td", {"data-stat": "rec"}).text)
-            self.receiving_yards = int(stats_for_year.find("td", {"data-stat": "rec_yds"}).text)
-            self.receiving_touchdowns = int(stats_for_year.find("td", {"data-stat": "rec_td"}).text)
-            self.longest_reception = int(stats_for_year.find("td", {"data-stat": "rec_long"}).text)
-            self.touches = int(stats_for_year.find("td", {"data-stat": "touches"}).text)
-            self.all_purpose_yards = int(stats_for_year.find("td", {"data-stat": "all_purpose_yds"}).text)
-            self.fumbles = int(stats_for_year.find("td", {"data-stat": "fumbles"}).text)
-            self.approximate_value =  int(stats_for_year.find("td", {"data-stat": "av"}).text)
-            self.save_stats()
-        except Exception as e:
-            print(e)
-    
-    def save_stats(self) -> None:
-        directory = "./players/TE/{}_{}/".format(self.name.split()[0], self.name.split()[1]) 
-        if not os.path.exists(directory):
-            os.makedirs(directory)    
-
-        data = {
-            "name": self.name,
-            "number": self.number,
-            "team": self.team,
-            "games_played": self.games_played,
-            "games_started": self.games_started,
-            "targets": self.targets,
-            "receptions": self.receptions,
-            "receiving_yards": self.receiving_yards,
-            "receiving_touchdowns": self.receiving_touchdowns,
-            "longest_reception": self.longest_reception,
-            "touches": self.touches,
-            "all_purpose_yards": self.all_purpose_yards,
-            "fumbles": self.fumbles,
-            "approximate_value": self.approximate_value
-        }
-        
-        with open("{}/{}.yaml".format(directory, self.year), "w") as file:
-            yaml.dump(data, file, default_flow_style=False)
-    
-    def set_stats_from_cache(self) -> None:
-        player_file = "./players/TE/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year)
-        
-        with open(player_file, "r") as file:
-            try:
-                yaml_data = yaml.safe_load(file)
-                self.number = yaml_data["number"]
-                self.team = yaml_data["team"]
-                self.games_played = yaml_data["games_played"] 
-                self.games_started = yaml_data["games_started"] 
-                self.targets = yaml_data["targets"] 
-                self.receptions = yaml_data["receptions"] 
-                self.receiving_yards = yaml_data["receiving_yards"] 
-                self.receiving_touchdowns = yaml_data["receiving_touchdowns"] 
-                self.longest_reception = yaml_data["longest_reception"] 
-                self.touches = yaml_data["touches"] 
-                self.all_purpose_yards = yaml_data["all_purpose_yards"] 
-                self.fumbles = yaml_data["fumbles"] 
-                self.approximate_value = yaml_data["approximate_value"] 
-            except yaml.YAMLError as e:
-                print(e)
+class K(Player):
+    POSITION = "K"
+    TABLE_ID, STATS = schema.SCHEMAS["K"]
+    __slots__ = schema.slots(STATS)
 
-    def is_player_stats_cached(self) -> bool:
-        player_file = Path("./players/TE/{}_{}/{}.yaml".format(self.name.split()[0], self.name.split()[1], self.year))
-        return player_file.is_file()
-    
-    def print_stats(self) -> None:
-        print("Year: {}".format(self.year))
-        print("Name: {}".format(self.name))
-        print("Number: {}".format(self.number))
-        print("Team: {}".format(self.team))
-        print("Position: {}".format(self.position))
-        print("Games played: {}".format(self.games_played))
-        print("Games started: {}".format(self.games_started))
-        print("Targets: {}".format(self.targets)) 
-        print("Receptions: {}".format(self.receptions)) 
-        print("Receiving yards: {}".format(self.receiving_yards)) 
-        print("Receiving touchdowns: {}".format(self.receiving_touchdowns)) 
-        print("Longest reception: {}".format(self.longest_reception)) 
-        print("Touches: {}".format(self.touches)) 
-        print("All purpose yards: {}".format(self.all_purpose_yards)) 
-        print("Fumbles: {}".format(self.fumbles)) 
-        print("Approximate Value: {}".format(self.approximate_value)) 
\ No newline at end of file
+    @property
+    def fields_goals_made_30_to_39(self) -> int:
+        # misspelled attribute name from before the stat schema, kept for old callers
+        return self.field_goals_made_30_to_39
+
+
+class TE(Player):
+    POSITION = "TE"
+    TABLE_ID, STATS = schema.SCHEMAS["TE"]
+    __slots__ = schema.slots(STATS)
+
+
+POSITIONS = {
+    "QB": QB,
+    "WR": WR,
+    "RB": RB,
+    "K": K,
+    "TE": TE
+}
@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from nfl_stats import stats_cache
+from nfl_stats.page_cache import current_season
+from nfl_stats.player import POSITIONS
+
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+
+class RefreshReport(NamedTuple):
+    checked: int
+    # (position, name) of every player whose stats changed
+    changed: List[Tuple[str, str]]
+    failed: List[Tuple[str, str, Exception]]
+
+
+def cached_players(year: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Every player with the season in the stats cache.
+
+    Parameters:
+        year - the season
+    Returns:
+        - iterator of (position, name, player id)
+    """
+    for position in POSITIONS:
+        for (player, _), data in stats_cache.get_cache().season(position, str(year)):
+            yield position, data.get("name") or player, data.get("player_id")
+
+
+def refresh_season(players: Optional[Iterable[Tuple]] = None,
+                   year: Optional[str] = None,
+                   max_age: float = DEFAULT_MAX_AGE,
+                   max_workers: int = 4) -> RefreshReport:
+    """
+    Re-fetches the season for every player whose cached stats are older than max_age, and
+    reports which ones changed. A finished season is never re-fetched.
+
+    Parameters:
+        players - (position, name) or (position, name, player id) of the players to refresh,
+                  defaults to every player with the season cached
+        year - the season, defaults to the current one
+        max_age - how old, in seconds, a cached season can get before it's re-fetched
+        max_workers - the max number of players refreshed at once
+    Returns:
+        - RefreshReport
+    """
+    year = str(year or current_season())
+    players = list(cached_players(year) if players is None else players)
+    changed = []
+    failed = []
+
+    def refresh(position: str, name: str, player_id: Optional[str] = None) -> bool:
+        return POSITIONS[position](name, player_id).refresh(year, max_age)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(refresh, *player): player for player in players}
+        for future in as_completed(futures):
+            position, name = futures[future][:2]
+            try:
+                if future.result():
+                    changed.append((position, name))
+            except Exception as e:
+                failed.append((position, name, e))
+
+    return RefreshReport(len(players), changed, failed)
@@ -0,0 +1,129 @@
+import email.utils
+import sys
+import time
+from typing import NamedTuple, Optional
+
+FOUND = "found"
+NO_SUCH_SEASON = "no_such_season"
+PLAYER_NOT_FOUND = "player_not_found"
+RATE_LIMITED = "rate_limited"
+PARSE_ERROR = "parse_error"
+# a miss in cache-only mode
+OFFLINE = "offline"
+# network failures and anything else unexpected
+ERROR = "error"
+
+# how long, in seconds, a known miss (no such season, player not found) is trusted before it's fetched again
+MISS_TTL = 7 * 24 * 60 * 60
+
+# a miss for a season that was still being played when it was found can turn into stats with the next game,
+# so it's only trusted as long as a cached page is (the page cache ttl, or this without a page cache)
+CURRENT_MISS_TTL = 6 * 60 * 60
+
+# known misses are cached under <position><MISS_SUFFIX>, apart from the stats themselves
+MISS_SUFFIX = ".missing"
+
+
+class LoadError(Exception):
+    status: str = ERROR
+
+
+class NoSuchSeason(LoadError, LookupError):
+    status = NO_SUCH_SEASON
+
+
+class PlayerNotFound(LoadError, LookupError):
+    status = PLAYER_NOT_FOUND
+
+
+class RateLimited(LoadError):
+    status = RATE_LIMITED
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(message)
+        # the seconds the site asked to wait, if it said
+        self.retry_after: Optional[float] = retry_after
+
+
+class ParseError(LoadError, ValueError):
+    status = PARSE_ERROR
+
+
+class Offline(LoadError, LookupError):
+    status = OFFLINE
+
+
+ERRORS = {error.status: error for error in (NoSuchSeason, PlayerNotFound, RateLimited, ParseError, Offline)}
+
+# the statuses worth caching, the others are either transient or a bug
+MISSES = (NO_SUCH_SEASON, PLAYER_NOT_FOUND)
+
+
+class LoadResult(NamedTuple):
+    status: str
+    player: object
+    error: Optional[Exception] = None
+
+    @property
+    def found(self) -> bool:
+        return self.status == FOUND
+
+
+def classify(error: Exception) -> str:
+    """
+    Maps an exception raised while loading a season to a result status.
+
+    Parameters:
+        error - the exception
+    Returns:
+        - str: one of the result statuses
+    """
+    if isinstance(error, LoadError):
+        return error.status
+
+    # requests errors can only happen once requests has been imported by a download
+    requests = sys.modules.get("requests")
+    if requests is not None:
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            if error.response.status_code == 404:
+                return PLAYER_NOT_FOUND
+            if error.response.status_code == 429:
+                return RATE_LIMITED
+        if isinstance(error, requests.exceptions.RetryError) and "429" in str(error):
+            return RATE_LIMITED
+    if isinstance(error, (ValueError, KeyError, TypeError, AttributeError)):
+        return PARSE_ERROR
+    return ERROR
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Reads how long the site asked to wait from the Retry-After header of a rate limited response.
+
+    Parameters:
+        error - the exception a load failed with
+    Returns:
+        - float: the seconds to wait, None if the error didn't come with a Retry-After header
+    """
+    if isinstance(error, RateLimited):
+        return error.retry_after
+    response = getattr(error, "response", None)
+    return parse_retry_after(response.headers.get("Retry-After") if response is not None else None)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parameters:
+        value - a Retry-After header, in seconds or an http date
+    Returns:
+        - float: the seconds to wait, None without a valid header
+    """
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    # or an http date
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from nfl_stats import fetch
+from nfl_stats.player import POSITIONS
+
+
+class RosterResult(NamedTuple):
+    position: str
+    name: str
+    seasons: Dict[str, object]
+    error: Optional[Exception] = None
+
+
+def load_player(position: str, name: str, seasons: Iterable,
+                get_page: Optional[Callable[[str], str]] = None) -> RosterResult:
+    """
+    Loads the given seasons for one player, from the cache where possible.
+
+    Any season that isn't cached triggers a single load_career for the player,
+    which fetches the page once and caches every season on it.
+
+    Parameters:
+        position - one of QB, WR, RB, K, TE
+        name - the player name
+        seasons - the years to load
+        get_page - fetches the player page, fetch.get_page by default
+    Returns:
+        - RosterResult: the loaded seasons keyed by year, with the error if the player page couldn't be
+          loaded (the cached seasons are still returned then)
+    """
+    player_class = POSITIONS[position.upper()]
+    seasons = [str(season) for season in seasons]
+    loaded = player_class.load_cached_seasons(name, seasons)
+    missing = [season for season in seasons if season not in loaded]
+
+    error = None
+    if missing:
+        try:
+            career = player_class(name).load_career(raise_errors=True, get_page=get_page)
+        except Exception as e:
+            career = {}
+            error = e
+        for season in missing:
+            if season in career:
+                loaded[season] = career[season]
+
+    return RosterResult(position, name, {season: loaded[season] for season in seasons if season in loaded}, error)
+
+
+def load_roster(players: Iterable[Tuple[str, str, Iterable]],
+                max_workers: int = 4,
+                requests_per_second: Optional[float] = None) -> Iterator[RosterResult]:
+    """
+    Loads many players over a bounded thread pool, yielding each one as soon as it finishes.
+
+    Parameters:
+        players - (position, name, seasons) for each player to load
+        max_workers - the max number of players loaded at once
+        requests_per_second - if set, a per-host rate limit for this roster's fetches, on top of the process-wide one
+    Returns:
+        - iterator of RosterResult, in completion order
+    """
+    fetcher = fetch.get_fetcher()
+    if requests_per_second is not None:
+        fetcher = fetcher.with_rate_limit(requests_per_second)
+
+    # shut down by hand rather than in a with block, so a caller that stops early doesn't wait on the queued players
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {executor.submit(load_player, *player, get_page=fetcher.get_page): player for player in players}
+        for future in as_completed(futures):
+            position, name, _ = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                yield RosterResult(position, name, {}, e)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,402 @@
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from nfl_stats import directory, fetch, metrics, results
+from nfl_stats.page_cache import current_season
+from nfl_stats.player import POSITIONS
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = "./backfill_queue.db"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# how many times a player page that errored is tried before it's given up on
+MAX_ATTEMPTS = 5
+
+# how long an errored player page waits before it's tried again, doubled on every attempt
+RETRY_DELAY = 60.0
+
+# (position, name, player id, the player's most recent season)
+Job = Tuple[str, str, Optional[str], str]
+
+
+def season_priority(year: str) -> int:
+    """
+    Lower runs first: players of the current season, then of the most recent seasons back to the oldest.
+    """
+    return max(0, current_season() - int(year))
+
+
+def index_jobs(index: Optional[directory.PlayerIndex] = None,
+               positions: Iterable[str] = tuple(POSITIONS)) -> Iterator[Job]:
+    """
+    Every player in the player index who played one of the positions, one job per player page.
+
+    Parameters:
+        index - the player index, defaults to the one the position classes use
+        positions - the positions to backfill
+    Returns:
+        - iterator of (position, name, player id, most recent season)
+    """
+    index = index or directory.get_index()
+    if index is None:
+        raise ValueError("No player index, build one with python -m nfl_stats.directory")
+    positions = set(positions)
+    for entry in index.entries:
+        for position in positions.intersection(entry.positions):
+            yield position, entry.name, entry.player_id, str(entry.last_year)
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Formats a duration as hours:minutes:seconds, with as many hours as it takes, e.g. 52:04:10.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{}:{:02d}:{:02d}".format(hours, minutes, seconds)
+
+
+class Progress(NamedTuple):
+    total: int
+    done: int
+    failed: int
+    pending: int
+    # player pages finished per second since this run started
+    players_per_second: float
+    # None until the rate is known
+    eta_seconds: Optional[float]
+    requests_per_second: float
+
+    def __str__(self) -> str:
+        eta = "unknown" if self.eta_seconds is None else format_duration(self.eta_seconds)
+        return "{}/{} players done, {} failed, {} pending, {:.2f} players/s at {:.2f} requests/s, ETA {}".format(
+            self.done, self.total, self.failed, self.pending, self.players_per_second, self.requests_per_second, eta)
+
+
+class AdaptiveThrottle:
+    """
+    Finds the highest request rate the site puts up with: every download that goes through raises the rate
+    a little, and a rate limited response halves it and pauses for as long as the site asked.
+    """
+
+    def __init__(self,
+                 rate_limiter: Optional[fetch.HostRateLimiter] = None,
+                 initial_rate: float = 1.0,
+                 min_rate: float = 0.05,
+                 max_rate: float = 5.0,
+                 increase: float = 0.05,
+                 decrease: float = 0.5,
+                 cooldown: float = 60.0):
+        self.rate_limiter: fetch.HostRateLimiter = rate_limiter or fetch.rate_limiter
+        self.min_rate: float = min_rate
+        self.max_rate: float = max_rate
+        self.increase: float = increase
+        self.decrease: float = decrease
+        # the pause after a rate limited response that didn't say how long to wait, doubled while it keeps happening
+        self.cooldown: float = cooldown
+        self._rate_limited_in_a_row: int = 0
+        self.rate_limiter.requests_per_second = initial_rate
+
+    @property
+    def rate(self) -> float:
+        return self.rate_limiter.requests_per_second
+
+    def on_success(self) -> None:
+        self._rate_limited_in_a_row = 0
+        self.rate_limiter.requests_per_second = min(self.max_rate, self.rate + self.increase)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        Slows down after a rate limited response.
+
+        Parameters:
+            retry_after - the Retry-After the site sent, in seconds, if any
+        Returns:
+            - float: how many seconds to pause before the next request
+        """
+        self._rate_limited_in_a_row += 1
+        self.rate_limiter.requests_per_second = max(self.min_rate, self.rate * self.decrease)
+        if retry_after is not None:
+            return retry_after
+        return self.cooldown * 2 ** (self._rate_limited_in_a_row - 1)
+
+
+class BackfillQueue:
+    """
+    A persistent queue of player pages to load, kept in sqlite. Each page is loaded once with load_career,
+    which caches every season on it, and its outcome is committed as soon as it's known, so a run that's
+    stopped, killed or crashes picks up where it left off.
+    """
+
+    def __init__(self, path: str = QUEUE_FILE):
+        self.path: str = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS players (
+                    position TEXT NOT NULL,
+                    -- the player id, or the name when there's none, so players sharing a name each get a job
+                    player_key TEXT NOT NULL,
+                    player TEXT NOT NULL,
+                    player_id TEXT,
+                    last_season TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    not_before REAL NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (position, player_key)
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS players_next ON players (status, priority, not_before)")
+            # pages that were being loaded when the last run stopped
+            connection.execute("UPDATE players SET status = ? WHERE status = ?", (PENDING, RUNNING))
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _key(job: Job) -> str:
+        return job[2] or job[1]
+
+    def add(self, jobs: Iterable[Job], priority: Optional[Callable[[str], int]] = None) -> int:
+        """
+        Queues player pages, the ones already queued keep their progress.
+
+        Parameters:
+            jobs - (position, name, player id, most recent season) of every player
+            priority - most recent season -> priority, lower runs first, defaults to season_priority
+        Returns:
+            - int: the number of players newly queued
+        """
+        priority = priority or season_priority
+        with self._connection() as connection:
+            before = connection.total_changes
+            connection.executemany("INSERT OR IGNORE INTO players "
+                                   "(position, player_key, player, player_id, last_season, priority, status) "
+                                   "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                   ((position.upper(), player_id or name, name, player_id, str(year),
+                                     priority(str(year)), PENDING)
+                                    for position, name, player_id, year in jobs))
+            return connection.total_changes - before
+
+    def next(self) -> Optional[Tuple[Optional[Job], float]]:
+        """
+        Takes the highest priority player page that's ready to run.
+
+        Returns:
+            - (job, 0) for the job to run, (None, seconds) when every pending job is waiting to be retried,
+              None when nothing is left
+        """
+        connection = self._connection()
+        with connection:
+            row = connection.execute("SELECT position, player, player_id, last_season, not_before FROM players "
+                                     "WHERE status = ? ORDER BY priority, not_before LIMIT 1", (PENDING,)).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if row[4] > now:
+                # the top job is backing off, anything else that's ready goes first
+                ready = connection.execute("SELECT position, player, player_id, last_season FROM players "
+                                           "WHERE status = ? AND not_before <= ? ORDER BY priority LIMIT 1",
+                                           (PENDING, now)).fetchone()
+                if ready is None:
+                    wait = connection.execute("SELECT MIN(not_before) FROM players WHERE status = ?",
+                                              (PENDING,)).fetchone()[0]
+                    return None, wait - now
+                row = ready
+            connection.execute("UPDATE players SET status = ?, updated_at = ? WHERE position = ? AND player_key = ?",
+                               (RUNNING, now, row[0], self._key(row)))
+        return (row[0], row[1], row[2], row[3]), 0.0
+
+    def finish(self, job: Job, result: str) -> None:
+        self._update(job, "status = ?, result = ?, error = NULL", (DONE, result))
+
+    def retry(self, job: Job, error: str, delay: Optional[float] = None, count_attempt: bool = True) -> None:
+        """
+        Puts a player page back in the queue to be tried again after a delay. Once it's been tried
+        MAX_ATTEMPTS times it's marked failed instead.
+
+        Parameters:
+            job - the player
+            error - why it failed
+            delay - how many seconds to wait before trying again, defaults to RETRY_DELAY doubled for
+                    every attempt so far
+            count_attempt - False for failures that weren't the page's fault, e.g. rate limiting
+        Returns:
+            - None
+        """
+        attempts = self._connection().execute("SELECT attempts FROM players WHERE position = ? AND player_key = ?",
+                                              (job[0], self._key(job))).fetchone()[0]
+        if delay is None:
+            delay = RETRY_DELAY * 2 ** attempts
+        attempts += 1 if count_attempt else 0
+        status = FAILED if attempts >= MAX_ATTEMPTS else PENDING
+        self._update(job, "status = ?, attempts = ?, error = ?, not_before = ?",
+                     (status, attempts, error, time.time() + delay))
+
+    def _update(self, job: Job, assignments: str, values: Tuple) -> None:
+        with self._connection() as connection:
+            connection.execute("UPDATE players SET {}, updated_at = ? WHERE position = ? AND player_key = ?"
+                               .format(assignments), values + (time.time(), job[0], self._key(job)))
+
+    def reset_failed(self) -> int:
+        """
+        Puts every failed player page back in the queue with its attempts reset.
+
+        Returns:
+            - int: the number of players requeued
+        """
+        with self._connection() as connection:
+            return connection.execute("UPDATE players SET status = ?, attempts = 0, not_before = 0 WHERE status = ?",
+                                      (PENDING, FAILED)).rowcount
+
+    def counts(self) -> Tuple[int, int, int]:
+        """
+        Returns:
+            - (done, failed, pending), running pages count as pending
+        """
+        counts = dict(self._connection().execute("SELECT status, COUNT(*) FROM players GROUP BY status").fetchall())
+        return counts.get(DONE, 0), counts.get(FAILED, 0), counts.get(PENDING, 0) + counts.get(RUNNING, 0)
+
+
+class Scheduler:
+    def __init__(self,
+                 queue: Optional[BackfillQueue] = None,
+                 throttle: Optional[AdaptiveThrottle] = None,
+                 report_every: float = 60.0,
+                 on_progress: Optional[Callable[[Progress], None]] = None):
+        self.queue: BackfillQueue = queue or BackfillQueue()
+        self.throttle: AdaptiveThrottle = throttle or AdaptiveThrottle()
+        # seconds between progress reports
+        self.report_every: float = report_every
+        self.on_progress: Optional[Callable[[Progress], None]] = on_progress
+        self._started_at: float = time.monotonic()
+        self._done_at_start: int = 0
+        self._stop = threading.Event()
+
+    def progress(self) -> Progress:
+        done, failed, pending = self.queue.counts()
+        elapsed = time.monotonic() - self._started_at
+        finished = done + failed - self._done_at_start
+        rate = finished / elapsed if elapsed > 0 else 0.0
+        return Progress(done + failed + pending, done, failed, pending, rate,
+                        pending / rate if rate > 0 else None, self.throttle.rate)
+
+    def stop(self) -> None:
+        """
+        Stops the run after the player page being loaded, e.g. from a signal handler or another thread.
+        """
+        self._stop.set()
+
+    def run(self, limit: Optional[int] = None) -> Progress:
+        """
+        Loads queued player pages, highest priority first, until the queue is empty, stop() is called
+        or limit pages have been tried. Pages that fail are retried later with a growing delay, rate
+        limited ones are put back without counting as an attempt.
+
+        Parameters:
+            limit - the max number of player pages to load in this run
+        Returns:
+            - Progress: where the queue stands when the run ends
+        """
+        self._stop.clear()
+        self._started_at = time.monotonic()
+        done, failed, _ = self.queue.counts()
+        self._done_at_start = done + failed
+        last_report = time.monotonic()
+        loaded = 0
+
+        while not self._stop.is_set() and (limit is None or loaded < limit):
+            taken = self.queue.next()
+            if taken is None:
+                break
+            job, wait = taken
+            if job is None:
+                self._stop.wait(wait)
+                continue
+
+            self.run_job(job)
+            loaded += 1
+
+            if time.monotonic() - last_report >= self.report_every:
+                last_report = time.monotonic()
+                self.report()
+
+        return self.report()
+
+    def run_job(self, job: Job) -> str:
+        """
+        Loads every season on one player page into the stats cache and records the outcome in the queue.
+
+        Parameters:
+            job - (position, name, player id, most recent season)
+        Returns:
+            - str: the load status
+        """
+        position, name, player_id, _ = job
+        requests_before = metrics.get_metrics().snapshot()["counters"].get("fetch.requests", 0)
+        error = None
+        try:
+            career = POSITIONS[position](name, player_id).load_career(raise_errors=True)
+            # a page without the position's table, e.g. a player listed under another position too
+            status = results.FOUND if career else results.PLAYER_NOT_FOUND
+        except Exception as e:
+            error = e
+            status = results.classify(e)
+        downloaded = metrics.get_metrics().snapshot()["counters"].get("fetch.requests", 0) > requests_before
+
+        if status == results.RATE_LIMITED:
+            pause = self.throttle.on_rate_limited(results.retry_after(error))
+            logger.warning("Rate limited, slowing down to %.2f requests/s and pausing %.0fs", self.throttle.rate, pause)
+            self.queue.retry(job, repr(error), 0.0, count_attempt=False)
+            self._stop.wait(pause)
+        elif status == results.FOUND or status in results.MISSES:
+            # a page that doesn't exist is an answer too, it won't be fetched again
+            if downloaded:
+                self.throttle.on_success()
+            self.queue.finish(job, status)
+        elif status == results.OFFLINE:
+            self.queue.retry(job, repr(error), 0.0, count_attempt=False)
+            logger.error("The fetcher is offline, stopping")
+            self.stop()
+        else:
+            logger.warning("Could not load the career of %s", name, exc_info=error)
+            self.queue.retry(job, repr(error))
+        metrics.increment("scheduler." + status)
+        return status
+
+    def report(self) -> Progress:
+        progress = self.progress()
+        logger.info("%s", progress)
+        if self.on_progress is not None:
+            self.on_progress(progress)
+        return progress
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=">> %(message)s")
+    scheduler = Scheduler(BackfillQueue(sys.argv[1] if len(sys.argv) > 1 else QUEUE_FILE))
+    if scheduler.queue.add(index_jobs()):
+        logger.info("Queued every player in %s", directory.INDEX_FILE)
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        # the page being loaded is requeued when the queue is opened again
+        print(">> Stopped, run again to resume: {}".format(scheduler.progress()))
@@ -0,0 +1,149 @@
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+
+class Stat(NamedTuple):
+    attribute: str
+    data_stat: str
+    convert: Callable[[str], Any]
+    label: str
+    default: Any = 0
+    # keys this stat was cached under before, so older yaml files still load
+    aliases: Tuple[str, ...] = ()
+    # how aggregate.totals() combines the stat across seasons: "sum", "max", or None to leave it out
+    total: Optional[str] = "sum"
+
+
+NUMBER = Stat("number", "uniform_number", int, "Number", total=None)
+TEAM = Stat("team", "team", str, "Team", "")
+POSITION = Stat("position", "pos", str, "Position", "")
+GAMES_PLAYED = Stat("games_played", "g", int, "Games played")
+GAMES_STARTED = Stat("games_started", "gs", int, "Games started")
+APPROXIMATE_VALUE = Stat("approximate_value", "av", int, "Approximate value")
+FUMBLES = Stat("fumbles", "fumbles", int, "Fumbles")
+
+QB_STATS = (
+    Stat("number", "uniform_number", str, "Number", "", total=None),
+    POSITION,
+    TEAM,
+    GAMES_PLAYED,
+    GAMES_STARTED,
+    Stat("passes_completed", "pass_cmp", int, "Passes completed"),
+    Stat("passes_attempted", "pass_att", int, "Passes attempted"),
+    Stat("pass_completion_percentage", "pass_cmp_perc", float, "Pass completion %", 0.0, ("pass_completion_perc",)),
+    Stat("yards_gained_by_passing", "pass_yds", int, "Yards gained by passing"),
+    Stat("passing_touchdowns", "pass_td", int, "Passing touchdowns"),
+    Stat("passing_touchdown_percentage", "pass_td_perc", float, "Passing touchdown percentage", 0.0,
+         ("passing_touchdown_perc",)),
+    Stat("interceptions", "pass_int", int, "Interceptions"),
+    Stat("interception_percentage", "pass_int_perc", float, "Interception percentage", 0.0, ("interception_perc",)),
+    Stat("longest_completed_pass", "pass_long", int, "Longest completed pass", total="max"),
+    Stat("yards_gained_per_pass_attempt", "pass_yds_per_att", float, "Yards gained per pass attempted", 0.0),
+    Stat("yards_gained_per_pass_completion", "pass_yds_per_cmp", float, "Yards gained per pass completion", 0.0),
+    Stat("qb_rating", "qbr", float, "Rating", 0.0),
+    Stat("times_sacked", "pass_sacked", int, "Times sacked"),
+    Stat("yards_lost_due_to_sacks", "pass_sacked_yds", int, "Yards lost due to sacks"),
+    APPROXIMATE_VALUE
+)
+
+WR_STATS = (
+    NUMBER,
+    TEAM,
+    POSITION,
+    GAMES_PLAYED,
+    GAMES_STARTED,
+    Stat("pass_targets", "targets", int, "Pass targets"),
+    Stat("receptions", "rec", int, "Receptions"),
+    Stat("receiving_yards", "rec_yds", int, "Receiving yards"),
+    Stat("yards_per_reception", "rec_yds_per_rec", float, "Yards per reception", 0.0),
+    Stat("receiving_touchdowns", "rec_td", int, "Receiving touchdowns"),
+    Stat("longest_reception", "rec_long", int, "Longest reception", total="max"),
+    Stat("receptions_per_game", "rec_per_g", float, "Receptions per game", 0.0),
+    Stat("receiving_yards_per_game", "rec_yds_per_g", float, "Receiving yards per game", 0.0),
+    Stat("rush_attempts", "rush_att", int, "Rushing attempts"),
+    Stat("rushing_yards", "rush_yds", int, "Rushing yards"),
+    Stat("rushing_touchdowns", "rush_td", int, "Rushing touchdowns"),
+    Stat("longest_rushing_attempt", "rush_long", int, "Longest rushing attempt", total="max"),
+    Stat("rushing_yards_per_attempt", "rush_yds_per_att", float, "Rushing yards per attempt", 0.0),
+    Stat("rushing_yards_per_game", "rush_yds_per_g", float, "Rushing yards per game", 0.0),
+    Stat("rushing_attempts_per_game", "rush_att_per_g", float, "Rushing attempts per game", 0.0),
+    Stat("touches", "touches", int, "Touches"),
+    APPROXIMATE_VALUE,
+    FUMBLES
+)
+
+RB_STATS = (
+    NUMBER,
+    TEAM,
+    POSITION,
+    GAMES_PLAYED,
+    GAMES_STARTED,
+    Stat("rushing_attempts", "rush_att", int, "Rushing attempts"),
+    Stat("rushing_yards", "rush_yds", int, "Rushing yards"),
+    Stat("rushing_touchdowns", "rush_td", int, "Rushing touchdowns"),
+    Stat("longest_rushing_attempt", "rush_long", int, "Longest rushing attempt", total="max"),
+    Stat("rushing_yards_per_attempt", "rush_yds_per_att", float, "Rushing yards per attempt", 0.0),
+    Stat("rushing_yards_per_game", "rush_yds_per_g", float, "Rushing yards per game", 0.0),
+    Stat("rushing_attempts_per_game", "rush_att_per_g", float, "Rushing attempts per game", 0.0),
+    Stat("pass_targets", "targets", int, "Pass targets"),
+    Stat("receptions", "rec", int, "Receptions"),
+    Stat("receiving_yards", "rec_yds", int, "Receiving yards"),
+    Stat("receiving_yards_per_reception", "rec_yds_per_rec", float, "Receiving yards per reception", 0.0),
+    Stat("receiving_touchdowns", "rec_td", int, "Receiving touchdowns"),
+    Stat("longest_reception", "rec_long", int, "Longest reception", total="max"),
+    Stat("receptions_per_game", "rec_per_g", float, "Receptions per game", 0.0),
+    Stat("receiving_yards_per_game", "rec_yds_per_g", float, "Receiving yards per game", 0.0),
+    APPROXIMATE_VALUE,
+    FUMBLES
+)
+
+K_STATS = (
+    NUMBER,
+    TEAM,
+    POSITION,
+    GAMES_PLAYED,
+    GAMES_STARTED,
+    Stat("field_goal_attempts_20_to_29", "fga2", int, "Field goal attempts (20-29)"),
+    Stat("field_goals_made_20_to_29", "fgm2", int, "Field goals made (20-29)"),
+    Stat("field_goal_attempts_30_to_39", "fga3", int, "Field goal attempts (30-39)"),
+    Stat("field_goals_made_30_to_39", "fgm3", int, "Field goals made (30-39)"),
+    Stat("field_goal_attempts_40_to_49", "fga4", int, "Field goal attempts (40-49)"),
+    Stat("field_goals_made_40_to_49", "fgm4", int, "Field goals made (40-49)"),
+    Stat("field_goal_attempts_50_plus", "fga5", int, "Field goal attempts (50+)"),
+    Stat("field_goals_made_50_plus", "fgm5", int, "Field goals made (50+)"),
+    Stat("longest_field_goal_made", "fg_long", int, "Longest field goal", total="max"),
+    Stat("total_field_goals_attempted", "fga", int, "Total field goals attempted"),
+    Stat("total_field_goals_made", "fgm", int, "Total field goals made"),
+    Stat("extra_points_attempted", "xpa", int, "Extra points attempted"),
+    Stat("extra_points_made", "xpm", int, "Extra points made"),
+    APPROXIMATE_VALUE
+)
+
+TE_STATS = (
+    NUMBER,
+    TEAM,
+    POSITION,
+    GAMES_PLAYED,
+    GAMES_STARTED,
+    Stat("targets", "targets", int, "Targets"),
+    Stat("receptions", "rec", int, "Receptions"),
+    Stat("receiving_yards", "rec_yds", int, "Receiving yards"),
+    Stat("receiving_touchdowns", "rec_td", int, "Receiving touchdowns"),
+    Stat("longest_reception", "rec_long", int, "Longest reception", total="max"),
+    Stat("touches", "touches", int, "Touches"),
+    Stat("all_purpose_yards", "all_purpose_yds", int, "All purpose yards"),
+    FUMBLES,
+    APPROXIMATE_VALUE
+)
+
+# position -> (id prefix of the season rows, stats)
+SCHEMAS: Dict[str, Tuple[str, Tuple[Stat, ...]]] = {
+    "QB": ("passing", QB_STATS),
+    "WR": ("receiving_and_rushing", WR_STATS),
+    "RB": ("rushing_and_receiving", RB_STATS),
+    "K": ("kicking", K_STATS),
+    "TE": ("receiving_and_rushing", TE_STATS)
+}
+
+
+def slots(stats: Tuple[Stat, ...]) -> Tuple[str, ...]:
+    return tuple(stat.attribute for stat in stats)
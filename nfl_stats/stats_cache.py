@@ -0,0 +1,427 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from nfl_stats import memo, metrics, results
+
+try:
+    import fcntl
+except ImportError:
+    # no advisory locks on windows, writes are still atomic through os.replace
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# (player id or name, season) -> attribute -> value
+Key = Tuple[str, str]
+Record = Dict[str, object]
+
+# bumped whenever the layout of a cached record changes, older records are refetched
+CACHE_VERSION = 1
+
+
+def checksum(data: Record) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def expired(data: Record, ttl: Optional[float]) -> bool:
+    """
+    Whether a record is older than a cache's ttl, from when its stats were fetched.
+    """
+    return ttl is not None and time.time() - data.get("fetched_at", 0) > ttl
+
+
+def stamp(data: Record) -> Record:
+    """
+    Adds the cache version and a checksum of the record, so a corrupt record can be detected when read.
+    """
+    stamped = dict(data)
+    stamped["_version"] = CACHE_VERSION
+    stamped["_checksum"] = checksum(data)
+    return stamped
+
+
+def verify(data) -> Optional[Record]:
+    """
+    Checks a record read from the cache against its stamp.
+
+    Records written before stamping was added have no stamp and are trusted as is.
+
+    Returns:
+        - dict: the record without its stamp, None if it's corrupt or from another cache version
+    """
+    if not isinstance(data, dict):
+        return None
+    if "_checksum" not in data and "_version" not in data:
+        return data
+
+    record = {key: value for key, value in data.items() if key not in ("_version", "_checksum")}
+    if data.get("_version") != CACHE_VERSION or data.get("_checksum") != checksum(record):
+        return None
+    return record
+
+
+class YamlStatsCache:
+    def __init__(self, directory: str = "./players", lock: bool = False, ttl: Optional[float] = None):
+        self.directory: str = directory
+        self.lock: bool = lock and fcntl is not None
+        # how old, in seconds, a record can get before it's a miss, None to keep records forever
+        self.ttl: Optional[float] = ttl
+
+    def _player_file(self, position: str, player: str, year: str) -> Path:
+        # a player id is used as is, a name becomes <First>_<Last>
+        return Path(self.directory, position, "_".join(player.split()[:2]), "{}.yaml".format(year))
+
+    def exists(self, position: str, player: str, year: str) -> bool:
+        if self.ttl is not None:
+            return self.get(position, player, year) is not None
+        return self._player_file(position, player, year).is_file()
+
+    def get(self, position: str, player: str, year: str) -> Optional[Record]:
+        """
+        Reads a cached record, removing it if it's corrupt so it gets fetched again.
+
+        Returns:
+            - dict: the record, None on a miss, a corrupt record or one older than the ttl
+        """
+        import yaml
+
+        player_file = self._player_file(position, player, year)
+        try:
+            with open(player_file, "r") as file:
+                # libyaml's loader when it's available, several times faster for the same safe subset
+                data = verify(yaml.load(file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)))
+        except FileNotFoundError:
+            return None
+        except yaml.YAMLError:
+            logger.exception("Could not read cache file %s", player_file)
+            data = None
+
+        if data is None:
+            logger.warning("Removing corrupt cache file %s", player_file)
+            metrics.increment("cache.corrupt")
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(player_file)
+        elif expired(data, self.ttl):
+            return None
+        return data
+
+    def put(self, position: str, player: str, year: str, data: Record) -> None:
+        """
+        Writes a record to a temp file then moves it into place, so readers never see a partial file.
+        """
+        import yaml
+
+        player_file = self._player_file(position, player, year)
+        player_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = player_file.with_name(".{}.{}-{}.tmp".format(player_file.name, os.getpid(), threading.get_ident()))
+
+        with self._locked(player_file.parent):
+            with open(temp_file, "w") as file:
+                yaml.dump(stamp(data), file, default_flow_style=False)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_file, player_file)
+
+    def delete(self, position: str, player: str, year: str) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self._player_file(position, player, year))
+
+    @contextlib.contextmanager
+    def _locked(self, directory: Path):
+        # an advisory lock per player directory, serializes writers across processes
+        if not self.lock:
+            yield
+            return
+
+        with open(directory / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_many(self, position: str, keys: Iterable[Key]) -> Dict[Key, Record]:
+        records = {}
+        for player, year in keys:
+            data = self.get(position, player, year)
+            if data is not None:
+                records[(player, year)] = data
+        return records
+
+    def put_many(self, position: str, records: Dict[Key, Record]) -> None:
+        for (player, year), data in records.items():
+            self.put(position, player, year, data)
+
+    def all(self, position: str) -> Iterator[Tuple[Key, Record]]:
+        return self._read_files(position, "*/*.yaml")
+
+    def season(self, position: str, year: str) -> Iterator[Tuple[Key, Record]]:
+        """
+        Every cached record of a position for one season, without reading the other seasons' files.
+        """
+        return self._read_files(position, "*/{}.yaml".format(year))
+
+    def _read_files(self, position: str, pattern: str) -> Iterator[Tuple[Key, Record]]:
+        for player_file in sorted(Path(self.directory, position).glob(pattern)):
+            player = player_file.parent.name.replace("_", " ")
+            data = self.get(position, player, player_file.stem)
+            if data is not None:
+                yield (data.get("player_id") or data.get("name") or player, player_file.stem), data
+
+
+class SqliteStatsCache:
+    # how many keys go into a single bulk select, under sqlite's bound parameter limit
+    BATCH_SIZE = 400
+
+    def __init__(self, path: str = "./players.db", ttl: Optional[float] = None):
+        self.path: str = path
+        # how old, in seconds, a record can get before it's a miss, None to keep records forever
+        self.ttl: Optional[float] = ttl
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    position TEXT NOT NULL,
+                    player TEXT NOT NULL,
+                    season TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (position, player, season)
+                ) WITHOUT ROWID
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS stats_season ON stats (position, season)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared between threads, so each thread gets its own
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def exists(self, position: str, player: str, year: str) -> bool:
+        if self.ttl is not None:
+            return self.get(position, player, year) is not None
+        row = self._connection().execute("SELECT 1 FROM stats WHERE position = ? AND player = ? AND season = ?",
+                                         (position, player, str(year))).fetchone()
+        return row is not None
+
+    def get(self, position: str, player: str, year: str) -> Optional[Record]:
+        row = self._connection().execute("SELECT data FROM stats WHERE position = ? AND player = ? AND season = ?",
+                                         (position, player, str(year))).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        return None if expired(data, self.ttl) else data
+
+    def put(self, position: str, player: str, year: str, data: Record) -> None:
+        self.put_many(position, {(player, str(year)): data})
+
+    def delete(self, position: str, player: str, year: str) -> None:
+        with self._connection() as connection:
+            connection.execute("DELETE FROM stats WHERE position = ? AND player = ? AND season = ?",
+                               (position, player, str(year)))
+
+    def get_many(self, position: str, keys: Iterable[Key]) -> Dict[Key, Record]:
+        """
+        Reads many player-seasons of a position with one query per batch of keys.
+
+        Parameters:
+            position - one of QB, WR, RB, K, TE
+            keys - (player id or name, season) pairs
+        Returns:
+            - dict: (player id or name, season) -> record, misses are left out
+        """
+        wanted = set((player, str(year)) for player, year in keys)
+        players = sorted(set(player for player, _ in wanted))
+        records = {}
+        connection = self._connection()
+        # select whole players by the primary key prefix and drop the seasons that weren't asked for,
+        # sqlite can't use the index for an IN over (player, season) pairs
+        for start in range(0, len(players), self.BATCH_SIZE):
+            batch = players[start:start + self.BATCH_SIZE]
+            query = "SELECT player, season, data FROM stats WHERE position = ? AND player IN ({})".format(
+                ", ".join(["?"] * len(batch)))
+            for player, year, data in connection.execute(query, [position] + batch):
+                if (player, year) in wanted:
+                    data = json.loads(data)
+                    if not expired(data, self.ttl):
+                        records[(player, year)] = data
+        return records
+
+    def put_many(self, position: str, records: Dict[Key, Record]) -> None:
+        """
+        Writes many player-seasons of a position in a single transaction.
+
+        Parameters:
+            position - one of QB, WR, RB, K, TE
+            records - (player id or name, season) -> record
+        Returns:
+            - None
+        """
+        with self._connection() as connection:
+            connection.executemany("INSERT OR REPLACE INTO stats (position, player, season, data) VALUES (?, ?, ?, ?)",
+                                   [(position, player, str(year), json.dumps(data))
+                                    for (player, year), data in records.items()])
+
+    def all(self, position: str) -> Iterator[Tuple[Key, Record]]:
+        rows = self._connection().execute("SELECT player, season, data FROM stats WHERE position = ? "
+                                          "ORDER BY player, season", (position,))
+        for player, year, data in rows:
+            yield (player, year), json.loads(data)
+
+    def season(self, position: str, year: str) -> Iterator[Tuple[Key, Record]]:
+        """
+        Every cached record of a position for one season.
+        """
+        rows = self._connection().execute("SELECT player, data FROM stats WHERE position = ? AND season = ? "
+                                          "ORDER BY player", (position, str(year)))
+        for player, data in rows:
+            data = json.loads(data)
+            if not expired(data, self.ttl):
+                yield (player, str(year)), data
+
+
+class KVStatsCache:
+    """
+    Stats records in a key-value store shared by many hosts, e.g. a kv.RedisStore, so a season scraped by
+    one host is a hit for all of them. Bulk reads take a single round trip per batch of keys.
+    """
+
+    def __init__(self, store, ttl: Optional[float] = None):
+        self.store = store
+        # how long, in seconds, the store keeps a record, None to keep records forever
+        self.ttl: Optional[float] = ttl
+
+    @staticmethod
+    def _key(position: str, player: str, year: str) -> str:
+        return "stats:{}:{}:{}".format(position, player, year)
+
+    def exists(self, position: str, player: str, year: str) -> bool:
+        return self.store.exists(self._key(position, player, str(year)))
+
+    def get(self, position: str, player: str, year: str) -> Optional[Record]:
+        key = self._key(position, player, str(year))
+        return self._decode(key, self.store.get(key))
+
+    def _decode(self, key: str, value: Optional[bytes]) -> Optional[Record]:
+        if value is None:
+            return None
+        try:
+            data = verify(json.loads(value))
+        except ValueError:
+            data = None
+        if data is None:
+            logger.warning("Removing corrupt cache record %s", key)
+            metrics.increment("cache.corrupt")
+            self.store.delete(key)
+        return data
+
+    def put(self, position: str, player: str, year: str, data: Record) -> None:
+        self.store.put(self._key(position, player, str(year)), json.dumps(stamp(data)), self.ttl)
+
+    def delete(self, position: str, player: str, year: str) -> None:
+        self.store.delete(self._key(position, player, str(year)))
+
+    def get_many(self, position: str, keys: Iterable[Key]) -> Dict[Key, Record]:
+        """
+        Reads many player-seasons of a position in one round trip per batch of keys.
+
+        Parameters:
+            position - one of QB, WR, RB, K, TE
+            keys - (player id or name, season) pairs
+        Returns:
+            - dict: (player id or name, season) -> record, misses are left out
+        """
+        wanted = {self._key(position, player, str(year)): (player, str(year)) for player, year in keys}
+        records = {}
+        for key, value in self.store.get_many(wanted).items():
+            data = self._decode(key, value)
+            if data is not None:
+                records[wanted[key]] = data
+        return records
+
+    def put_many(self, position: str, records: Dict[Key, Record]) -> None:
+        self.store.put_many({self._key(position, player, str(year)): json.dumps(stamp(data))
+                             for (player, year), data in records.items()}, self.ttl)
+
+    def all(self, position: str) -> Iterator[Tuple[Key, Record]]:
+        return self._read_keys(position, None)
+
+    def season(self, position: str, year: str) -> Iterator[Tuple[Key, Record]]:
+        """
+        Every cached record of a position for one season, only the season's records are read from the store.
+        """
+        return self._read_keys(position, str(year))
+
+    def _read_keys(self, position: str, year: Optional[str]) -> Iterator[Tuple[Key, Record]]:
+        prefix = self._key(position, "", "")[:-1]
+        keys = []
+        for key in self.store.keys(prefix):
+            player, season = key[len(prefix):].rsplit(":", 1)
+            if year is None or season == year:
+                keys.append((player, season))
+        yield from sorted(self.get_many(position, keys).items())
+
+
+def migrate_yaml_tree(directory: str, cache: SqliteStatsCache) -> int:
+    """
+    Imports every season in the ./players/<POS>/<First>_<Last>/<year>.yaml tree.
+
+    The known misses under <POS>.missing aren't imported, they only save a lookup and the sqlite cache finds
+    them again on its own.
+
+    Parameters:
+        directory - the root of the yaml cache
+        cache - the cache to import into
+    Returns:
+        - int: the number of player-seasons imported
+    """
+    yaml_cache = YamlStatsCache(directory)
+    imported = 0
+    for position_directory in sorted(Path(directory).iterdir()):
+        if not position_directory.is_dir() or position_directory.name.endswith(results.MISS_SUFFIX):
+            continue
+        records = dict(yaml_cache.all(position_directory.name))
+        cache.put_many(position_directory.name, records)
+        imported += len(records)
+    return imported
+
+
+_cache = YamlStatsCache()
+
+
+def get_cache():
+    return _cache
+
+
+def set_cache(cache) -> None:
+    """
+    Sets the stats cache used by every position class.
+
+    Parameters:
+        cache - a YamlStatsCache, SqliteStatsCache or KVStatsCache
+    Returns:
+        - None
+    """
+    global _cache
+    _cache = cache
+    # memoized records came from the previous cache
+    memo.get_memo().clear()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m nfl_stats.stats_cache YAML_DIRECTORY SQLITE_FILE")
+        sys.exit(1)
+    print(">> Imported {} player-seasons".format(migrate_yaml_tree(sys.argv[1], SqliteStatsCache(sys.argv[2]))))
@@ -0,0 +1,60 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks import fixtures
+from nfl_stats import directory, fetch, memo, metrics, stats_cache
+from nfl_stats.page_cache import PageCache
+
+
+class FixtureSiteTestCase(unittest.TestCase):
+    """
+    Serves the benchmark fixture site on localhost for the whole test case, and gives every test its own
+    empty stats cache, page cache, memo and metrics so nothing leaks between tests.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site_directory = tempfile.mkdtemp()
+        cls.server = fixtures.serve(fixtures.write_site(cls.site_directory))
+        cls.base_url = cls.server.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.__exit__(None, None, None)
+        shutil.rmtree(cls.site_directory, ignore_errors=True)
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.directory), True)
+
+        previous = (fetch.BASE_URL, fetch.get_fetcher(), stats_cache.get_cache(), memo.get_memo(),
+                    directory.get_index(), fetch.rate_limiter.requests_per_second)
+        self.addCleanup(self._restore, *previous)
+
+        fetch.BASE_URL = self.base_url
+        self.page_cache = PageCache(str(self.directory / "pages"))
+        fetch.set_fetcher(fetch.Fetcher(retries=0, page_cache=self.page_cache))
+        stats_cache.set_cache(stats_cache.YamlStatsCache(str(self.directory / "players")))
+        memo.set_memo(memo.MemoCache())
+        # guessed player ids, whatever player_index.json the working directory has
+        directory.set_index(None)
+        metrics.get_metrics().reset()
+
+    @staticmethod
+    def _restore(base_url, fetcher, cache, player_memo, index, requests_per_second):
+        fetch.BASE_URL = base_url
+        fetch.set_fetcher(fetcher)
+        stats_cache.set_cache(cache)
+        memo.set_memo(player_memo)
+        directory.set_index(index)
+        fetch.set_rate_limit(requests_per_second)
+
+    @staticmethod
+    def requests() -> int:
+        """
+        Returns:
+            - int: the number of requests sent to the fixture site since the test started
+        """
+        return metrics.get_metrics().snapshot()["counters"].get("fetch.requests", 0)
@@ -0,0 +1,30 @@
+import unittest
+
+import numpy as np
+
+from nfl_stats import aggregate
+from nfl_stats.columnar import SeasonTable
+
+
+class TotalsTest(unittest.TestCase):
+    def setUp(self):
+        self.table = SeasonTable("WR", {
+            "name": np.array(["A.J. Green", "A.J. Green", "Tyler Boyd"]),
+            "year": np.array([2016, 2017, 2017]),
+            "number": np.array([18, 18, 83]),
+            "receptions": np.array([66, 75, 22]),
+            "longest_reception": np.array([54, 77, 25]),
+            "yards_per_reception": np.array([14.8, 16.1, 10.6])
+        })
+
+    def test_counting_stats_are_summed(self):
+        totals = aggregate.totals(self.table)
+        self.assertEqual(["A.J. Green", "Tyler Boyd"], list(totals.columns["name"]))
+        self.assertEqual([141, 22], list(totals.columns["receptions"]))
+        self.assertEqual([77, 25], list(totals.columns["longest_reception"]))
+        self.assertEqual([2, 1], list(totals.columns["seasons"]))
+
+    def test_number_and_rates_are_not_summed(self):
+        totals = aggregate.totals(self.table)
+        self.assertNotIn("number", totals.columns)
+        self.assertNotIn("yards_per_reception", totals.columns)
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import fixtures
+from nfl_stats import aio, memo, results, stats_cache
+from nfl_stats.player import QB
+from tests.support import FixtureSiteTestCase
+
+NAME = fixtures.FIXTURE_PLAYERS["QB"][0]
+YEAR = str(fixtures.LAST_YEAR)
+
+
+class _RateLimitedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(429)
+        self.send_header("Retry-After", "7")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LoadTest(FixtureSiteTestCase):
+    @staticmethod
+    def run_loads(*loads):
+        async def main():
+            try:
+                return await asyncio.gather(*loads)
+            finally:
+                await aio.close()
+        return asyncio.run(main())
+
+    @unittest.skipIf(aio.aiohttp is None, "aiohttp isn't installed")
+    def test_aiohttp_errors_are_classified(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _RateLimitedHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        missing, = self.run_loads(QB.aload("Nobody Atall", YEAR))
+        self.assertIsInstance(missing.error, results.PlayerNotFound)
+
+        url = "http://127.0.0.1:{}/players/D/DaltAn00.htm".format(server.server_address[1])
+        with self.assertRaises(results.RateLimited) as raised:
+            self.run_loads(aio.get_page(url))
+        self.assertEqual(results.RATE_LIMITED, results.classify(raised.exception))
+        self.assertEqual(7.0, results.retry_after(raised.exception))
+
+    def test_load(self):
+        result, = self.run_loads(QB.aload(NAME, YEAR))
+        expected = QB(NAME)
+        expected.set_stats_from_dict(stats_cache.get_cache().get("QB", NAME, YEAR))
+
+        self.assertEqual(results.FOUND, result.status)
+        self.assertEqual(YEAR, result.player.year)
+        self.assertEqual(expected.get_stats(), result.player.get_stats())
+
+    def test_concurrent_loads_share_one_fetch(self):
+        loaded = self.run_loads(*(QB.aload(NAME, YEAR) for _ in range(8)))
+
+        self.assertEqual([results.FOUND] * 8, [result.status for result in loaded])
+        self.assertEqual(1, self.requests())
+
+    def test_misses_are_results(self):
+        missing_season, missing_player = self.run_loads(QB.aload(NAME, str(fixtures.FIRST_YEAR - 1)),
+                                                        QB.aload("Nobody Atall", YEAR))
+
+        self.assertEqual(results.NO_SUCH_SEASON, missing_season.status)
+        self.assertEqual(results.PLAYER_NOT_FOUND, missing_player.status)
+
+        # the miss is known now, loading it again doesn't fetch anything
+        requests = self.requests()
+        memo.get_memo().clear()
+        again, = self.run_loads(QB.aload(NAME, str(fixtures.FIRST_YEAR - 1)))
+        self.assertEqual(results.NO_SUCH_SEASON, again.status)
+        self.assertEqual(requests, self.requests())
@@ -0,0 +1,33 @@
+import math
+import unittest
+
+import numpy as np
+
+from nfl_stats.columnar import SeasonTable
+
+
+class SeasonTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = SeasonTable("QB", {
+            "name": np.array(["a", "b", "c", "d", "e"]),
+            "team": np.array(["CIN", "CIN", "NE", "NE", "PIT"]),
+            "qb_rating": np.array([90.0, np.nan, 110.0, 95.0, np.nan]),
+            "games_played": np.array([16, 4, 16, 16, 2])
+        })
+
+    def test_sort_puts_blanks_last(self):
+        self.assertEqual(["c", "d", "a", "b", "e"], list(self.table.sort("qb_rating")["name"]))
+        self.assertEqual(["a", "d", "c", "b", "e"], list(self.table.sort("qb_rating", descending=False)["name"]))
+
+    def test_sort_keeps_ties_in_order(self):
+        self.assertEqual(["a", "c", "d", "b", "e"], list(self.table.sort("games_played")["name"]))
+
+    def test_group_by_skips_blanks(self):
+        self.assertEqual({"CIN": 90.0, "NE": 205.0, "PIT": 0.0}, self.table.group_by("team", "qb_rating", "sum"))
+        self.assertEqual({"CIN": 1, "NE": 2, "PIT": 0}, self.table.group_by("team", "qb_rating", "count"))
+        for aggregate in ("mean", "min", "max"):
+            grouped = self.table.group_by("team", "qb_rating", aggregate)
+            self.assertEqual(90.0, grouped["CIN"])
+            self.assertTrue(math.isnan(grouped["PIT"]))
+        self.assertEqual(102.5, self.table.group_by("team", "qb_rating", "mean")["NE"])
+        self.assertEqual(110.0, self.table.group_by("team", "qb_rating", "max")["NE"])
@@ -0,0 +1,35 @@
+import unittest
+
+from nfl_stats import fetch
+from nfl_stats.directory import PlayerEntry, PlayerIndex, normalize_name, split_name
+from nfl_stats.player import get_player_url
+
+
+class NameTest(unittest.TestCase):
+    def test_split_name_keeps_punctuation(self):
+        self.assertEqual(("A.J.", "Green"), split_name("A.J. Green"))
+        self.assertEqual(("Odell", "Beckham"), split_name("Odell Beckham Jr."))
+        self.assertEqual(("Ted", "Ginn"), split_name("Ted Ginn, Jr."))
+        self.assertEqual(("Robert", "Griffin"), split_name("Robert Griffin III"))
+
+    def test_guessed_url(self):
+        self.assertEqual(fetch.BASE_URL + "/players/G/GreeA.00.htm", get_player_url("A.J. Green"))
+        self.assertEqual(fetch.BASE_URL + "/players/B/BeckOd00.htm", get_player_url("Odell Beckham Jr."))
+
+    def test_normalize_name(self):
+        self.assertEqual("odell beckham", normalize_name("Odell Beckham Jr."))
+        self.assertEqual("aj green", normalize_name("A.J. Green"))
+
+
+class PlayerIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = PlayerIndex([PlayerEntry("WillMi00", "Mike Williams", ("WR",), 2005, 2010),
+                                  PlayerEntry("WillMi07", "Mike Williams", ("WR",), 2017, 2023)])
+
+    def test_lookup(self):
+        self.assertEqual("WillMi07", self.index.lookup("Mike Williams", "WR").player_id)
+        self.assertEqual("WillMi00", self.index.lookup("Mike Williams", "WR", "2008").player_id)
+
+    def test_lookup_is_exact(self):
+        self.assertIsNone(self.index.lookup("Mike Williamson", "WR"))
+        self.assertEqual({"WillMi00", "WillMi07"}, {entry.player_id for entry in self.index.search("Mike Williamson")})
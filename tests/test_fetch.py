@@ -0,0 +1,80 @@
+import threading
+import time
+
+from benchmarks import fixtures
+from nfl_stats import fetch, kv, metrics
+from nfl_stats.page_cache import KVPageCache
+from nfl_stats.player import get_player_url
+from tests.support import FixtureSiteTestCase
+
+NAME, PLAYER_ID = fixtures.FIXTURE_PLAYERS["QB"]
+
+
+class SharedPageCacheTest(FixtureSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        server = fixtures.serve_kv()
+        self.kv_server = server.__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+
+        self.store = kv.RedisStore(port=self.kv_server.server_address[1])
+        self.page_cache = KVPageCache(self.store)
+        self.page_cache.POLL_INTERVAL = 0.01
+        fetch.set_fetcher(fetch.Fetcher(retries=0, page_cache=self.page_cache))
+        self.url = get_player_url(NAME, PLAYER_ID)
+        self.page = fixtures.player_page("QB")
+
+    def claim_as_another_host(self, delay: float = 0.1) -> threading.Thread:
+        # another host claims the page, downloads it and caches it
+        self.assertTrue(self.page_cache.claim(self.url))
+
+        def download():
+            time.sleep(delay)
+            self.page_cache.put(self.url, self.page)
+            self.page_cache.release(self.url)
+
+        thread = threading.Thread(target=download)
+        thread.start()
+        self.addCleanup(thread.join)
+        return thread
+
+    def shared_hits(self) -> int:
+        return metrics.get_metrics().snapshot()["counters"].get("page_cache.shared_hit", 0)
+
+    def claimed(self) -> bool:
+        return self.store.exists("claim:" + self.page_cache._url_key(self.url))
+
+    def test_get_page_waits_for_the_claim(self):
+        self.claim_as_another_host()
+
+        self.assertEqual(self.page, fetch.get_page(self.url))
+        self.assertEqual(0, self.requests())
+        self.assertEqual(1, self.shared_hits())
+
+    def test_get_table_waits_for_the_claim(self):
+        self.claim_as_another_host()
+        fetch.set_streaming(True)
+
+        self.assertIn(str(fixtures.LAST_YEAR), fetch.get_table(self.url, "passing"))
+        self.assertEqual(0, self.requests())
+        self.assertEqual(1, self.shared_hits())
+
+    def test_get_table_releases_its_claim(self):
+        fetch.set_streaming(True)
+
+        self.assertIn(str(fixtures.LAST_YEAR), fetch.get_table(self.url, "passing"))
+        self.assertEqual(1, self.requests())
+        self.assertFalse(self.claimed())
+
+    def test_claim_reads_a_page_cached_meanwhile(self):
+        self.page_cache.put(self.url, self.page)
+
+        self.assertEqual((False, self.page), fetch.get_fetcher().claim(self.url))
+        self.assertFalse(self.claimed())
+
+    def test_failed_download_releases_its_claim(self):
+        url = get_player_url("Nobody Atall")
+        with self.assertRaises(Exception):
+            fetch.get_page(url)
+
+        self.assertFalse(self.store.exists("claim:" + self.page_cache._url_key(url)))
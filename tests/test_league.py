@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from benchmarks import fixtures
+from nfl_stats import league, memo, results, stats_cache
+from nfl_stats.player import QB
+from tests.support import FixtureSiteTestCase
+
+NAME, PLAYER_ID = fixtures.FIXTURE_PLAYERS["QB"]
+YEAR = str(fixtures.LAST_YEAR)
+
+# a league passing table with just a few of the QB stats
+PASSING = ('<html><body><table id="passing"><tbody><tr><th data-stat="ranker">1</th>'
+           '<td data-stat="player" data-append-csv="{0}"><a href="/players/D/{0}.htm">{1}</a>*</td>'
+           '<td data-stat="team">CIN</td><td data-stat="pos">QB</td><td data-stat="g">16</td>'
+           '<td data-stat="pass_cmp">297</td><td data-stat="pass_yds">3320</td></tr></tbody></table></body></html>')
+
+
+class LoadSeasonTest(FixtureSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        league_file = Path(self.site_directory, "years", YEAR, "passing.htm")
+        league_file.parent.mkdir(parents=True, exist_ok=True)
+        league_file.write_text(PASSING.format(PLAYER_ID, NAME), encoding="utf-8")
+        self.addCleanup(league_file.unlink)
+
+    def test_seeds_missing_stats_as_none(self):
+        season = league.load_season("QB", YEAR)
+
+        self.assertEqual(297, season[PLAYER_ID].passes_completed)
+        self.assertIsNone(season[PLAYER_ID].passes_attempted)
+        self.assertIsNone(stats_cache.get_cache().get("QB", NAME, YEAR)["number"])
+
+    def test_keeps_cached_seasons(self):
+        loaded = QB(NAME)
+        loaded.set_stats(YEAR)
+        league.load_season("QB", YEAR)
+
+        memo.get_memo().clear()
+        player = QB(NAME)
+        self.assertEqual(results.FOUND, player.set_stats(YEAR).status)
+        self.assertEqual(loaded.get_stats(), player.get_stats())
+        self.assertIsNotNone(player.passes_attempted)
@@ -0,0 +1,41 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from nfl_stats.page_cache import PageCache
+
+PAGE = "<html>{}</html>".format("x" * 1000)
+
+
+class PageCacheEvictionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.directory), True)
+        self.page_cache = PageCache(str(self.directory / "pages"))
+        for number in range(4):
+            self.page_cache.put("http://example.com/{}".format(number), PAGE + str(number))
+
+    def vanished_blob(self):
+        # listed, but removed by another process before it's stat'ed
+        blobs = self.page_cache._blobs
+        vanished = self.directory / "pages" / "blobs" / "ab" / "ab.html.gz"
+        return mock.patch.object(self.page_cache, "_blobs", lambda: iter([vanished] + list(blobs())))
+
+    def test_sizing_skips_vanished_blobs(self):
+        self.page_cache._total_bytes = None
+        with self.vanished_blob():
+            self.page_cache.put("http://example.com/new", PAGE + "new")
+
+        self.assertEqual(5, len(list(self.page_cache._blobs())))
+        self.assertEqual(sum(blob.stat().st_size for blob in self.page_cache._blobs()), self.page_cache._total_bytes)
+
+    def test_eviction_skips_vanished_blobs(self):
+        self.page_cache.max_bytes = self.page_cache._total_bytes
+        with self.vanished_blob():
+            self.page_cache.put("http://example.com/new", PAGE + "new")
+
+        self.assertLess(self.page_cache._total_bytes, self.page_cache.max_bytes)
+        self.assertIsNone(self.page_cache.get("http://example.com/0"))
+        self.assertEqual(PAGE + "new", self.page_cache.get("http://example.com/new"))
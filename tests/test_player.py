@@ -0,0 +1,147 @@
+import threading
+import time
+
+from benchmarks import fixtures
+from nfl_stats import fetch, memo, results, stats_cache
+from nfl_stats.player import QB, WR
+from tests.support import FixtureSiteTestCase
+
+NAME = fixtures.FIXTURE_PLAYERS["QB"][0]
+YEAR = str(fixtures.LAST_YEAR)
+
+
+class SetStatsTest(FixtureSiteTestCase):
+    def test_found(self):
+        player = QB(NAME)
+        result = player.set_stats(YEAR)
+
+        self.assertEqual(results.FOUND, result.status)
+        self.assertIs(player, result.player)
+        self.assertIsNone(result.error)
+        self.assertEqual(YEAR, player.year)
+        self.assertIsInstance(player.passes_completed, int)
+
+    def test_no_such_season(self):
+        player = QB(NAME)
+        player.set_stats(YEAR)
+        completed = player.passes_completed
+        result = player.set_stats(str(fixtures.FIRST_YEAR - 1))
+
+        self.assertEqual(results.NO_SUCH_SEASON, result.status)
+        self.assertIsInstance(result.error, results.NoSuchSeason)
+        # a failed load leaves the previous season alone
+        self.assertEqual(YEAR, player.year)
+        self.assertEqual(completed, player.passes_completed)
+
+    def test_player_not_found(self):
+        result = QB("Nobody Atall").set_stats(YEAR)
+
+        self.assertEqual(results.PLAYER_NOT_FOUND, result.status)
+        self.assertIsInstance(result.error, results.PlayerNotFound)
+
+    def test_wrong_position(self):
+        # the guessed url is a QB page without a receiving table
+        result = WR(NAME).set_stats(YEAR)
+
+        self.assertEqual(results.PLAYER_NOT_FOUND, result.status)
+
+    def test_known_miss_isnt_fetched_again(self):
+        QB(NAME).set_stats(str(fixtures.FIRST_YEAR - 1))
+        requests = self.requests()
+        memo.get_memo().clear()
+        result = QB(NAME).set_stats(str(fixtures.FIRST_YEAR - 1))
+
+        self.assertEqual(results.NO_SUCH_SEASON, result.status)
+        self.assertEqual(requests, self.requests())
+
+    def test_current_season_miss_expires_with_the_page_cache(self):
+        player = QB(NAME)
+        player.year = YEAR
+        self.assertEqual(results.MISS_TTL, player.miss_ttl({"fetched_at": time.time()}))
+
+        player.year = "9999"
+        self.assertEqual(self.page_cache.ttl, player.miss_ttl({"fetched_at": time.time()}))
+
+    def test_offline_miss(self):
+        fetch.set_offline(True)
+        result = QB(NAME).set_stats(YEAR)
+
+        self.assertEqual(results.OFFLINE, result.status)
+        self.assertEqual(0, self.requests())
+
+
+class CacheTest(FixtureSiteTestCase):
+    def test_round_trip(self):
+        loaded = QB(NAME)
+        loaded.set_stats(YEAR)
+        cached = stats_cache.get_cache().get("QB", NAME, YEAR)
+        self.assertEqual(loaded.get_stats(), {key: cached[key] for key in loaded.get_stats()})
+
+        # a new process: nothing memoized and no network, the season comes from the stats cache
+        memo.set_memo(memo.MemoCache())
+        fetch.set_offline(True)
+        player = QB(NAME)
+        result = player.set_stats(YEAR)
+
+        self.assertEqual(results.FOUND, result.status)
+        self.assertEqual(loaded.get_stats(), player.get_stats())
+        self.assertEqual(1, self.requests())
+
+    def test_load_career_caches_every_season(self):
+        career = QB(NAME).load_career()
+
+        self.assertEqual([str(year) for year in range(fixtures.FIRST_YEAR, fixtures.LAST_YEAR + 1)], sorted(career))
+        seasons = QB.load_cached_seasons(NAME, career)
+        self.assertEqual({year: player.get_stats() for year, player in career.items()},
+                         {year: player.get_stats() for year, player in seasons.items()})
+
+    def test_load_career_raises(self):
+        self.assertEqual({}, QB("Nobody Atall").load_career())
+        with self.assertRaises(Exception):
+            QB("Nobody Atall").load_career(raise_errors=True)
+
+    def test_refresh_replaces_a_season_taken_off_the_page(self):
+        player = QB(NAME)
+        player.set_stats(YEAR)
+        # cached while a season after the fixture's last one was going on, so it can still change
+        year = str(fixtures.LAST_YEAR + 1)
+        record = dict(stats_cache.get_cache().get("QB", NAME, YEAR), year=year,
+                      fetched_at=time.mktime((fixtures.LAST_YEAR + 1, 10, 1, 0, 0, 0, 0, 0, -1)))
+        stats_cache.get_cache().put("QB", NAME, year, record)
+
+        with self.assertRaises(results.NoSuchSeason):
+            QB(NAME).refresh(year, max_age=0)
+
+        self.assertIsNone(stats_cache.get_cache().get("QB", NAME, year))
+        # the miss was cached, so the page isn't fetched again
+        requests = self.requests()
+        self.assertEqual(results.NO_SUCH_SEASON, QB(NAME).set_stats(year).status)
+        self.assertEqual(requests, self.requests())
+
+
+class MemoTest(FixtureSiteTestCase):
+    def test_concurrent_loads_share_one_fetch(self):
+        statuses = []
+        start = threading.Barrier(8)
+
+        def load():
+            start.wait()
+            statuses.append(QB(NAME).set_stats(YEAR).status)
+
+        threads = [threading.Thread(target=load) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([results.FOUND] * 8, statuses)
+        self.assertEqual(1, self.requests())
+        stats = memo.get_memo().stats()
+        self.assertEqual(7, stats.hits + stats.coalesced)
+
+    def test_memo_hit_skips_the_stats_cache(self):
+        QB(NAME).set_stats(YEAR)
+        stats_cache.set_cache(stats_cache.YamlStatsCache(str(self.directory / "empty")))
+
+        self.assertEqual(results.FOUND, QB(NAME).set_stats(YEAR).status)
+        self.assertEqual(1, self.requests())
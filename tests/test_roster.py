@@ -0,0 +1,69 @@
+from unittest import mock
+
+from benchmarks import fixtures
+from nfl_stats import fetch, results
+from nfl_stats.roster import load_player, load_roster
+from tests.support import FixtureSiteTestCase
+
+SEASONS = [str(fixtures.LAST_YEAR - 1), str(fixtures.LAST_YEAR)]
+
+
+class LoadRosterTest(FixtureSiteTestCase):
+    def test_loads_every_player(self):
+        players = [(position, name, SEASONS) for position, (name, _) in fixtures.FIXTURE_PLAYERS.items()]
+        loaded = {result.name: result for result in load_roster(players, max_workers=3)}
+
+        self.assertEqual({name for _, name, _ in players}, set(loaded))
+        for position, name, _ in players:
+            self.assertIsNone(loaded[name].error)
+            self.assertEqual(position, loaded[name].position)
+            self.assertEqual(SEASONS, sorted(loaded[name].seasons))
+            self.assertEqual(SEASONS, sorted(player.year for player in loaded[name].seasons.values()))
+        # one page per player
+        self.assertEqual(len(players), self.requests())
+
+    def test_cached_players_arent_fetched(self):
+        name = fixtures.FIXTURE_PLAYERS["QB"][0]
+        load_player("QB", name, SEASONS)
+        result = load_player("QB", name, SEASONS)
+
+        self.assertEqual(SEASONS, sorted(result.seasons))
+        self.assertEqual(1, self.requests())
+
+    def test_missing_player_has_an_error(self):
+        results_by_name = {result.name: result for result in load_roster([("QB", "Nobody Atall", SEASONS),
+                                                                          ("QB", fixtures.FIXTURE_PLAYERS["QB"][0],
+                                                                           SEASONS)])}
+
+        missing = results_by_name["Nobody Atall"]
+        self.assertEqual({}, missing.seasons)
+        self.assertEqual(results.PLAYER_NOT_FOUND, results.classify(missing.error))
+        self.assertIsNone(results_by_name[fixtures.FIXTURE_PLAYERS["QB"][0]].error)
+
+    def test_rate_limit_is_per_roster(self):
+        fetch.set_rate_limit(0.5)
+        limiters = []
+        fetcher = fetch.get_fetcher()
+        original = fetch.Fetcher.get_page
+
+        def get_page(self, url, *args):
+            limiters.append(self.rate_limiter)
+            return original(self, url, *args)
+
+        with mock.patch.object(fetch.Fetcher, "get_page", get_page), \
+                mock.patch.object(fetch.rate_limiter, "reserve", return_value=0.0):
+            list(load_roster([("QB", fixtures.FIXTURE_PLAYERS["QB"][0], SEASONS)], requests_per_second=1000))
+
+        self.assertEqual(0.5, fetch.rate_limiter.requests_per_second)
+        self.assertIs(fetch.rate_limiter, fetcher.rate_limiter)
+        self.assertEqual(1, len(limiters))
+        self.assertEqual(1000, limiters[0].requests_per_second)
+        self.assertIs(fetch.rate_limiter, limiters[0].parent)
+
+    def test_stopping_early_cancels_queued_players(self):
+        players = [(position, name, SEASONS) for position, (name, _) in fixtures.FIXTURE_PLAYERS.items()]
+        roster = load_roster(players, max_workers=1)
+        next(roster)
+        roster.close()
+
+        self.assertLess(self.requests(), len(players))
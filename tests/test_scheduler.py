@@ -0,0 +1,62 @@
+from benchmarks import fixtures
+from nfl_stats import results, scheduler, stats_cache
+from nfl_stats.directory import PlayerEntry, PlayerIndex
+from tests.support import FixtureSiteTestCase
+
+
+class SchedulerTest(FixtureSiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index = PlayerIndex(PlayerEntry(player_id, name, (position,), fixtures.FIRST_YEAR, fixtures.LAST_YEAR)
+                                 for position, (name, player_id) in fixtures.FIXTURE_PLAYERS.items())
+        self.queue = scheduler.BackfillQueue(str(self.directory / "queue.db"))
+        self.throttle = scheduler.AdaptiveThrottle(initial_rate=0, max_rate=0)
+
+    def test_one_request_per_player_page(self):
+        self.assertEqual(len(fixtures.FIXTURE_PLAYERS), self.queue.add(scheduler.index_jobs(self.index)))
+        progress = scheduler.Scheduler(self.queue, self.throttle).run()
+
+        self.assertEqual((5, 5, 0, 0), (progress.total, progress.done, progress.failed, progress.pending))
+        self.assertEqual(len(fixtures.FIXTURE_PLAYERS), self.requests())
+        seasons = fixtures.LAST_YEAR - fixtures.FIRST_YEAR + 1
+        for position, (_, player_id) in fixtures.FIXTURE_PLAYERS.items():
+            self.assertEqual(seasons, sum(1 for (player, _), _ in stats_cache.get_cache().all(position)
+                                          if player == player_id))
+
+    def test_most_recent_players_first(self):
+        self.queue.add([("QB", "Old Timer", None, "1950"), ("QB", "Andy Dalton", "DaltAn00", "2017"),
+                        ("QB", "Nobody Atall", None, "2010")])
+
+        self.assertEqual(("QB", "Andy Dalton", "DaltAn00", "2017"), self.queue.next()[0])
+        self.assertEqual(("QB", "Nobody Atall", None, "2010"), self.queue.next()[0])
+
+    def test_players_sharing_a_name(self):
+        self.assertEqual(2, self.queue.add([("WR", "Mike Williams", "WillMi00", "2017"),
+                                            ("WR", "Mike Williams", "WillMi07", "2017")]))
+
+        first, _ = self.queue.next()
+        self.queue.finish(first, results.FOUND)
+        second, _ = self.queue.next()
+        self.assertEqual({"WillMi00", "WillMi07"}, {first[2], second[2]})
+        self.queue.retry(second, "error")
+        self.assertEqual((1, 0, 1), self.queue.counts())
+
+    def test_missing_page_is_done(self):
+        self.queue.add([("QB", "Nobody Atall", None, "2010")])
+        job, _ = self.queue.next()
+
+        self.assertEqual(results.PLAYER_NOT_FOUND, scheduler.Scheduler(self.queue, self.throttle).run_job(job))
+        self.assertEqual((1, 0, 0), self.queue.counts())
+
+    def test_resumes_after_a_stop(self):
+        self.queue.add(scheduler.index_jobs(self.index))
+        scheduler.Scheduler(self.queue, self.throttle).run(limit=2)
+
+        reopened = scheduler.BackfillQueue(str(self.directory / "queue.db"))
+        self.assertEqual((2, 0, 3), reopened.counts())
+        self.assertEqual(5, scheduler.Scheduler(reopened, self.throttle).run().done)
+
+    def test_eta_past_a_day(self):
+        progress = scheduler.Progress(10, 1, 0, 9, 0.5, 2 * 24 * 60 * 60 + 61, 1.0)
+
+        self.assertIn("ETA 48:01:01", str(progress))
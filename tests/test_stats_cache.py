@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from benchmarks import fixtures
+from nfl_stats import kv, refresh, results, stats_cache
+
+RECORDS = {
+    ("DaltAn00", "2016"): {"name": "Andy Dalton", "player_id": "DaltAn00", "passes_completed": 364},
+    ("DaltAn00", "2017"): {"name": "Andy Dalton", "player_id": "DaltAn00", "passes_completed": 297},
+    ("BradTo00", "2017"): {"name": "Tom Brady", "player_id": "BradTo00", "passes_completed": 385}
+}
+
+
+class StatsCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, str(self.directory), True)
+        server = fixtures.serve_kv()
+        self.addCleanup(server.__exit__, None, None, None)
+        store = kv.RedisStore(port=server.__enter__().server_address[1])
+
+        self.caches = {
+            "yaml": stats_cache.YamlStatsCache(str(self.directory / "players")),
+            "sqlite": stats_cache.SqliteStatsCache(str(self.directory / "players.db")),
+            "kv": stats_cache.KVStatsCache(store)
+        }
+        for cache in self.caches.values():
+            cache.put_many("QB", RECORDS)
+
+    def test_round_trip(self):
+        for name, cache in self.caches.items():
+            with self.subTest(name):
+                self.assertEqual(RECORDS, cache.get_many("QB", list(RECORDS) + [("DaltAn00", "2010")]))
+                self.assertEqual(RECORDS[("BradTo00", "2017")], cache.get("QB", "BradTo00", "2017"))
+                self.assertIsNone(cache.get("WR", "BradTo00", "2017"))
+
+    def test_delete(self):
+        for name, cache in self.caches.items():
+            with self.subTest(name):
+                cache.delete("QB", "DaltAn00", "2016")
+                cache.delete("QB", "DaltAn00", "2010")
+                self.assertIsNone(cache.get("QB", "DaltAn00", "2016"))
+                self.assertEqual(RECORDS[("DaltAn00", "2017")], cache.get("QB", "DaltAn00", "2017"))
+
+    def test_season(self):
+        for name, cache in self.caches.items():
+            with self.subTest(name):
+                self.assertEqual([("BradTo00", "2017"), ("DaltAn00", "2017")],
+                                 [key for key, _ in cache.season("QB", "2017")])
+                self.assertEqual([RECORDS[("DaltAn00", "2016")]], [data for _, data in cache.season("QB", 2016)])
+                self.assertEqual([], list(cache.season("WR", "2017")))
+
+    def test_cached_players(self):
+        previous = stats_cache.get_cache()
+        self.addCleanup(stats_cache.set_cache, previous)
+        stats_cache.set_cache(self.caches["yaml"])
+
+        self.assertEqual([("QB", "Tom Brady", "BradTo00"), ("QB", "Andy Dalton", "DaltAn00")],
+                         list(refresh.cached_players("2017")))
+
+    def test_migrate_yaml_tree_skips_misses(self):
+        self.caches["yaml"].put("QB" + results.MISS_SUFFIX, "Nobody Atall", "2017",
+                                {"status": results.PLAYER_NOT_FOUND, "message": "No player page for Nobody Atall"})
+        cache = stats_cache.SqliteStatsCache(str(self.directory / "migrated.db"))
+
+        self.assertEqual(len(RECORDS), stats_cache.migrate_yaml_tree(str(self.directory / "players"), cache))
+        self.assertEqual(RECORDS, dict(cache.all("QB")))
+        self.assertEqual([], list(cache.all("QB" + results.MISS_SUFFIX)))